@@ -1,11 +1,23 @@
 # backend/app.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
-from starlette.staticfiles import StaticFiles
 
+from core.capture import CaptureMiddleware, close_capture_log
 from core.config import settings
-from routers import brain, vision, scribe
+from core.static import CachedStaticFiles
+from routers import brain, vision, scribe, compliance, extractions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load spaCy in the Scribe escalation workers before the first request needs them
+    scribe.start_nlp_pool()
+    yield
+    scribe.stop_nlp_pool()
+    close_capture_log()
 
 
 def create_app() -> FastAPI:
@@ -14,6 +26,7 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS
@@ -26,13 +39,28 @@ def create_app() -> FastAPI:
         expose_headers=["Content-Disposition"],
     )
 
-    # Static files (for overlays)
-    app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
+    # Sampled request capture for tools/replay.py (opt in, added last so it also times CORS)
+    if settings.capture_enabled:
+        app.add_middleware(
+            CaptureMiddleware,
+            sample_rate=settings.capture_sample_rate,
+            max_body_bytes=settings.capture_max_body_bytes,
+            store_responses=settings.capture_responses,
+        )
+
+    # Static files (for overlays); overlay names are unique per image, so they are cached as immutable
+    app.mount(
+        "/static",
+        CachedStaticFiles(directory=settings.static_dir, immutable_prefixes=("overlays",)),
+        name="static",
+    )
 
     # Routers
     app.include_router(brain.router, prefix="", tags=["brain"])
     app.include_router(vision.router, prefix="", tags=["vision"])
     app.include_router(scribe.router, prefix="", tags=["scribe"])
+    app.include_router(compliance.router, prefix="", tags=["compliance"])
+    app.include_router(extractions.router, prefix="", tags=["scribe"])
 
     @app.get("/health")
     async def health():
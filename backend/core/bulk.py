@@ -0,0 +1,219 @@
+# backend/core/bulk.py
+"""
+Bulk document intake for Scribe.
+
+Documents arrive as a zip archive, a multipart set of files or an NDJSON body
+of texts. Each source is an async iterator that loads one document at a time,
+and run_bounded() only pulls the next document when a worker slot is free, so
+at most `limit` documents are held in memory however large the upload is.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import IO, AsyncIterator, Awaitable, Callable, Optional, Tuple, TypeVar, Union
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from core.config import settings
+
+T = TypeVar("T")
+
+PDF_MAGIC = b"%PDF"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class BulkError(ValueError):
+    """Raised when a bulk upload is malformed or over its limits."""
+
+
+@dataclass
+class BulkDocument:
+    index: int
+    name: str
+    data: Union[bytes, str, None]  # PDF/text bytes, or text from NDJSON
+    error: Optional[str] = None  # set when the document could not be loaded
+
+    @property
+    def is_pdf(self) -> bool:
+        if isinstance(self.data, bytes):
+            return self.data.startswith(PDF_MAGIC) or self.name.lower().endswith(".pdf")
+        return False
+
+
+# === Sources ===
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    with archive.open(info) as f:
+        data = f.read(settings.scribe_bulk_max_file_bytes + 1)
+    if len(data) > settings.scribe_bulk_max_file_bytes:
+        raise BulkError("over the per-document size limit")
+    return data
+
+
+async def iter_zip(fileobj: IO[bytes], start: int = 0) -> AsyncIterator[BulkDocument]:
+    """Documents inside a zip archive, read one member at a time."""
+    try:
+        archive = await run_in_threadpool(zipfile.ZipFile, fileobj)
+    except zipfile.BadZipFile as e:
+        raise BulkError(f"Invalid zip archive: {e}")
+
+    with archive:
+        members = [i for i in archive.infolist() if not i.is_dir() and not i.filename.startswith("__MACOSX/")]
+        if start + len(members) > settings.scribe_bulk_max_documents:
+            raise BulkError(f"More than {settings.scribe_bulk_max_documents} documents in one upload")
+
+        for offset, info in enumerate(members):
+            doc = BulkDocument(start + offset, info.filename, None)
+            if info.file_size > settings.scribe_bulk_max_file_bytes:
+                doc.error = "Document is over the per-document size limit"
+            else:
+                try:
+                    doc.data = await run_in_threadpool(_read_member, archive, info)
+                except Exception as e:
+                    doc.error = f"Could not read archive member: {e}"
+            yield doc
+
+
+async def iter_uploads(files: list) -> AsyncIterator[BulkDocument]:
+    """Documents from multipart uploads; zip uploads are expanded in place."""
+    index = 0
+    for upload in files:
+        if not isinstance(upload, UploadFile):
+            continue
+        name = upload.filename or f"document-{index}"
+        head = await upload.read(len(ZIP_MAGIC))
+        await upload.seek(0)
+
+        if head == ZIP_MAGIC or name.lower().endswith(".zip"):
+            # Starlette already spooled the upload to a temp file; zipfile reads it in place
+            async for doc in iter_zip(upload.file, start=index):
+                index = doc.index + 1
+                yield doc
+            continue
+
+        if index >= settings.scribe_bulk_max_documents:
+            raise BulkError(f"More than {settings.scribe_bulk_max_documents} documents in one upload")
+        data = await upload.read(settings.scribe_bulk_max_file_bytes + 1)
+        if len(data) > settings.scribe_bulk_max_file_bytes:
+            yield BulkDocument(index, name, None, error="Document is over the per-document size limit")
+        else:
+            yield BulkDocument(index, name, data)
+        index += 1
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[BulkDocument]:
+    """
+    Documents from an NDJSON body: one {"text": ..., "name": ...} object (or a
+    bare JSON string) per line, parsed as the body streams in.
+    """
+    index = 0
+    buf = bytearray()  # the unfinished line; appended to, so long lines are not re-copied per chunk
+
+    def parse(line: bytes) -> BulkDocument:
+        name = f"document-{index}"
+        try:
+            payload = json.loads(line)
+        except ValueError as e:
+            return BulkDocument(index, name, None, error=f"Invalid JSON line: {e}")
+        if isinstance(payload, dict):
+            name = str(payload.get("name") or payload.get("id") or name)
+            payload = next(
+                (payload[k] for k in ("text", "content", "raw_text") if isinstance(payload.get(k), str)), None
+            )
+        if not isinstance(payload, str):
+            return BulkDocument(index, name, None, error="Line has no 'text' field")
+        return BulkDocument(index, name, payload)
+
+    async for chunk in chunks:
+        pieces = chunk.split(b"\n")
+        buf += pieces[0]
+        if len(buf) > settings.scribe_bulk_max_file_bytes:
+            raise BulkError("NDJSON line is over the per-document size limit")
+        if len(pieces) == 1:
+            continue
+        lines = [bytes(buf), *pieces[1:-1]]
+        buf = bytearray(pieces[-1])
+        for line in lines:
+            if not line.strip():
+                continue
+            if index >= settings.scribe_bulk_max_documents:
+                raise BulkError(f"More than {settings.scribe_bulk_max_documents} documents in one upload")
+            yield parse(line)
+            index += 1
+
+    if buf.strip():
+        if index >= settings.scribe_bulk_max_documents:
+            raise BulkError(f"More than {settings.scribe_bulk_max_documents} documents in one upload")
+        yield parse(bytes(buf))
+
+
+async def iter_file(f: IO[bytes], chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+    """Chunks of a spooled body, read off the event loop."""
+    while True:
+        chunk = await run_in_threadpool(f.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def spool_body(chunks: AsyncIterator[bytes], max_bytes: int) -> IO[bytes]:
+    """Copy a streamed request body to a temp file (deleted on close)."""
+    f = tempfile.TemporaryFile(dir=settings.data_dir)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise BulkError(f"Upload is larger than {max_bytes} bytes")
+            await run_in_threadpool(f.write, chunk)
+        f.seek(0)
+        return f
+    except BaseException:
+        f.close()
+        raise
+
+
+# === Bounded execution ===
+async def run_bounded(
+    docs: AsyncIterator[BulkDocument],
+    worker: Callable[[BulkDocument], Awaitable[T]],
+    limit: int,
+) -> AsyncIterator[Tuple[BulkDocument, Optional[T], Optional[BaseException]]]:
+    """
+    Run worker over docs with at most `limit` in flight, yielding
+    (doc, result, error) in completion order. The source is only advanced
+    when a slot frees up.
+    """
+    limit = max(1, limit)
+    pending = {}
+    source = docs.__aiter__()
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    doc = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(worker(doc))] = doc
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                doc = pending.pop(task)
+                if task.exception() is not None:
+                    yield doc, None, task.exception()
+                else:
+                    yield doc, task.result(), None
+    finally:
+        for task in pending:
+            task.cancel()
+
@@ -0,0 +1,244 @@
+# backend/core/capture.py
+"""
+Sampled request capture for replay.
+
+With CAPTURE_ENABLED=1, CaptureMiddleware records a random sample of API
+requests (CAPTURE_SAMPLE_RATE) so tools/replay.py can re-issue real traffic
+against another build. Each worker process appends to its own session log,
+<CAPTURE_DIR>/sessions/<started>-<pid>.jsonl, one compact JSON line per
+request:
+
+    t         arrival time (epoch seconds)
+    m, p, q   method, path, query string
+    h         headers needed to replay the body (content type, accept)
+    b, bn     request body sha256 and length
+    s         response status
+    r, rn, rt response body sha256, length and content type
+    ms        time to the last response byte
+
+Bodies are content addressed: each is stored once under
+blobs/<sha[:2]>/<sha>, however often it recurs. Bodies over
+CAPTURE_MAX_BODY_BYTES are counted but not stored. Hashing and writing run
+on a background thread; when its queue is full, records are dropped rather
+than slowing requests down. Requests carrying REPLAY_HEADER are never
+captured, so replays against a capturing server do not record themselves.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from core.config import settings
+from core.scribe_cache import sha256_hex
+
+REPLAY_HEADER = "x-pulse-replay"
+EXCLUDED_PREFIXES: Tuple[str, ...] = ("/static", "/overlays", "/health", "/docs", "/redoc", "/openapi.json")
+CAPTURED_HEADERS = (b"content-type", b"accept")
+
+
+def blob_path(root: Path, digest: str) -> Path:
+    return root / "blobs" / digest[:2] / digest
+
+
+class _Body:
+    """Chunks of a streamed body, kept while the total stays under the limit."""
+
+    __slots__ = ("chunks", "size", "limit")
+
+    def __init__(self, limit: int):
+        self.chunks: Optional[List[bytes]] = []
+        self.size = 0
+        self.limit = limit
+
+    def add(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.chunks is not None:
+            if self.size <= self.limit:
+                self.chunks.append(chunk)
+            else:
+                self.chunks = None
+
+    def data(self) -> Optional[bytes]:
+        if not self.size or self.chunks is None:
+            return None
+        return b"".join(self.chunks)
+
+
+class CaptureLog:
+    """Session log plus content-addressed blob store, written by one background thread."""
+
+    def __init__(self, root: Path, queue_size: int = 64):
+        self.root = root
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.path = root / "sessions" / f"{self.session}.jsonl"
+        self.recorded = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._known: set = set()
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict, request_body: Optional[bytes], response_body: Optional[bytes]) -> bool:
+        """Queue a record without blocking; False when it was dropped."""
+        try:
+            self._queue.put_nowait((record, request_body, response_body))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _store(self, data: bytes) -> str:
+        digest = sha256_hex(data)
+        if digest not in self._known:
+            path = blob_path(self.root, digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{digest}.{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)  # other workers may write the same blob
+            self._known.add(digest)
+        return digest
+
+    def _run(self) -> None:
+        out = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                record, request_body, response_body = item
+                try:
+                    if request_body is not None:
+                        record["b"] = self._store(request_body)
+                    if response_body is not None:
+                        record["r"] = self._store(response_body)
+                    if out is None:
+                        self.path.parent.mkdir(parents=True, exist_ok=True)
+                        out = open(self.path, "a", encoding="utf-8")
+                    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    out.flush()
+                    self.recorded += 1
+                except OSError:
+                    self.dropped += 1
+        finally:
+            if out is not None:
+                out.close()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write out queued records and stop the writer."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+_log: Optional[CaptureLog] = None
+_log_lock = threading.Lock()
+
+
+def get_capture_log() -> CaptureLog:
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = CaptureLog(settings.capture_dir, settings.capture_queue)
+    return _log
+
+
+def close_capture_log() -> None:
+    global _log
+    with _log_lock:
+        log, _log = _log, None
+    if log is not None:
+        log.close()
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
+
+
+def _replay_headers(scope) -> dict:
+    headers = {}
+    for name in CAPTURED_HEADERS:
+        value = _header(scope, name)
+        if value is not None:
+            headers[name.decode()] = value.decode("latin-1")
+    return headers
+
+
+class CaptureMiddleware:
+    """
+    ASGI middleware recording sampled requests to the capture log. Bodies
+    are collected as the app reads and streams them, so neither side is
+    buffered or delayed.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.05, max_body_bytes: int = 16 * 1024 * 1024,
+                 store_responses: bool = True, exclude: Tuple[str, ...] = EXCLUDED_PREFIXES):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.store_responses = store_responses
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.exclude)
+            or random.random() >= self.sample_rate
+            or _header(scope, REPLAY_HEADER.encode()) is not None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.time()
+        t0 = time.perf_counter()
+        request_body = _Body(self.max_body_bytes)
+        response_body = _Body(self.max_body_bytes if self.store_responses else 0)
+        response = {"s": 500, "rt": "", "ms": None}
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.add(message.get("body", b""))
+            return message
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["s"] = message["status"]
+                content_type = _header(message, b"content-type")
+                response["rt"] = content_type.decode("latin-1") if content_type else ""
+            elif message["type"] == "http.response.body":
+                response_body.add(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response["ms"] = (time.perf_counter() - t0) * 1000.0
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            elapsed = response["ms"] if response["ms"] is not None else (time.perf_counter() - t0) * 1000.0
+            record = {
+                "t": round(arrived, 4),
+                "m": scope["method"],
+                "p": scope["path"],
+                "q": scope.get("query_string", b"").decode("latin-1"),
+                "h": _replay_headers(scope),
+                "b": None,
+                "bn": request_body.size,
+                "s": response["s"],
+                "r": None,
+                "rn": response_body.size,
+                "rt": response["rt"],
+                "ms": round(elapsed, 2),
+            }
+            get_capture_log().submit(record, request_body.data(), response_body.data())
@@ -29,10 +29,28 @@ class Settings(BaseSettings):
     static_dir: Path = base_dir / "static"
     overlays_dir: Path = static_dir / "overlays"
     exports_dir: Path = base_dir / "exports" / "scribe"
+    data_dir: Path = base_dir / "data"
+    compliance_db_path: Path = data_dir / "compliance.sqlite3"
+    scribe_cache_db_path: Path = data_dir / "scribe_cache.sqlite3"
+    scribe_store_db_path: Path = data_dir / "extractions.sqlite3"
 
     # Vision
     vision_weights: Path = Field(default=Path("../modules/vision/weights/best.pt"), alias="VISION_WEIGHTS")
     vision_class_map_path: Path = Field(default=Path("../modules/vision/class_map.yaml"), alias="VISION_CLASS_MAP")
+    vision_module_dir: Path = Field(default=Path("../modules/vision"), alias="VISION_MODULE_DIR")
+    vision_roi_config: Path = Field(default=Path("../modules/vision/camera_roi.yaml"), alias="VISION_ROI_CONFIG")
+    vision_max_frame_side: int = Field(4096, alias="VISION_MAX_FRAME_SIDE")  # raw frames, pixels per side
+    vision_stub: bool = Field(False, alias="VISION_STUB")  # fake model (core/vision_stub.py) for load tests without weights
+    vision_stub_latency_ms: float = Field(0.0, alias="VISION_STUB_LATENCY_MS")  # simulated forward pass per image
+
+    # Overlay variants (WebP, by max width)
+    overlay_thumb_width: int = Field(320, alias="OVERLAY_THUMB_WIDTH")
+    overlay_medium_width: int = Field(960, alias="OVERLAY_MEDIUM_WIDTH")
+    overlay_variant_workers: int = Field(1, alias="OVERLAY_VARIANT_WORKERS")
+    overlay_variant_queue: int = Field(32, alias="OVERLAY_VARIANT_QUEUE")  # pending encodes before callers encode inline
+
+    # Compliance time series
+    compliance_ring_size: int = Field(512, alias="COMPLIANCE_RING_SIZE")  # recent samples kept per camera
 
     # Brain
     brain_model_path: Path = Field(default=Path("../modules/brain/artifacts/brain_planning_component_model.pkl"), alias="BRAIN_MODEL")
@@ -40,6 +58,34 @@ class Settings(BaseSettings):
 
     # Scribe
     scribe_model_dir: Path = Field(default=Path("../modules/scribe/models"), alias="SCRIBE_MODEL_DIR")
+    scribe_module_dir: Path = Field(default=Path("../modules/scribe"), alias="SCRIBE_MODULE_DIR")
+    scribe_nlp_workers: int = Field(1, alias="SCRIBE_NLP_WORKERS")  # spaCy escalation workers, 0 = rules only
+    scribe_nlp_model: str = Field("en_core_web_sm", alias="SCRIBE_NLP_MODEL")
+    scribe_nlp_fast: bool = Field(False, alias="SCRIBE_NLP_FAST")  # opt-in trimmed pipeline, see DailyLogExtractor(fast=...)
+    scribe_nlp_timeout: float = Field(30.0, alias="SCRIBE_NLP_TIMEOUT")  # seconds
+    scribe_nlp_queue: int = Field(64, alias="SCRIBE_NLP_QUEUE")  # escalations waiting for a worker; beyond it tier 1 is returned
+    scribe_escalate_chars: int = Field(20000, alias="SCRIBE_ESCALATE_CHARS")  # longer texts always go to spaCy
+    scribe_cache_items: int = Field(512, alias="SCRIBE_CACHE_ITEMS")  # in-memory entries per cache level
+    scribe_cache_max_rows: int = Field(50_000, alias="SCRIBE_CACHE_MAX_ROWS")  # on-disk entries per cache level, 0 = unbounded
+    scribe_cache_max_age_days: float = Field(30.0, alias="SCRIBE_CACHE_MAX_AGE_DAYS")  # 0 = keep entries forever
+    scribe_export_max_rows: int = Field(1_000_000, alias="SCRIBE_EXPORT_MAX_ROWS")
+    pdf_workers: int = Field(0, alias="PDF_WORKERS")  # 0 = one per CPU
+    pdf_pages_per_task: int = Field(16, alias="PDF_PAGES_PER_TASK")
+    pdf_inline_max_bytes: int = Field(2 * 1024 * 1024, alias="PDF_INLINE_MAX_BYTES")  # larger PDFs go to workers as files
+    scribe_max_upload_bytes: int = Field(100 * 1024 * 1024, alias="SCRIBE_MAX_UPLOAD_BYTES")  # /extract PDF uploads
+    scribe_max_text_bytes: int = Field(10 * 1024 * 1024, alias="SCRIBE_MAX_TEXT_BYTES")  # /extract JSON and text bodies
+    scribe_bulk_concurrency: int = Field(4, alias="SCRIBE_BULK_CONCURRENCY")  # documents in flight per bulk request
+    scribe_bulk_max_documents: int = Field(1000, alias="SCRIBE_BULK_MAX_DOCUMENTS")
+    scribe_bulk_max_file_bytes: int = Field(25 * 1024 * 1024, alias="SCRIBE_BULK_MAX_FILE_BYTES")
+    scribe_bulk_max_upload_bytes: int = Field(1024 * 1024 * 1024, alias="SCRIBE_BULK_MAX_UPLOAD_BYTES")  # zip and multipart bodies
+
+    # Request capture for tools/replay.py (core/capture.py)
+    capture_enabled: bool = Field(False, alias="CAPTURE_ENABLED")
+    capture_dir: Path = Field(default=data_dir / "capture", alias="CAPTURE_DIR")
+    capture_sample_rate: float = Field(0.05, alias="CAPTURE_SAMPLE_RATE")  # share of requests recorded, 0..1
+    capture_max_body_bytes: int = Field(16 * 1024 * 1024, alias="CAPTURE_MAX_BODY_BYTES")  # larger bodies are not stored
+    capture_responses: bool = Field(True, alias="CAPTURE_RESPONSES")  # store response bodies for equality checks
+    capture_queue: int = Field(64, alias="CAPTURE_QUEUE")  # records waiting for the writer; beyond it they are dropped
 
     class Config:
         # Allow environment variables in either style (alias or field name)
@@ -57,3 +103,4 @@ settings.load_env_overrides()
 settings.static_dir.mkdir(parents=True, exist_ok=True)
 settings.overlays_dir.mkdir(parents=True, exist_ok=True)
 settings.exports_dir.mkdir(parents=True, exist_ok=True)
+settings.data_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,128 @@
+# backend/core/frames.py
+"""
+Raw frame wire format for edge devices.
+
+Edge boxes already hold decoded frames, so instead of JPEG-encoding them they
+send the pixel buffer behind a small fixed header (little-endian):
+
+    offset  size  field
+    0       4     magic b"RPF1"
+    4       2     width (uint16)
+    6       2     height (uint16)
+    8       1     channels (1 = grayscale, 3 = colour)
+    9       1     pixel order (0 = gray, 1 = RGB, 2 = BGR)
+    10      2     camera id length in bytes (uint16)
+    12      n     camera id (UTF-8, may be empty)
+    12 + n  ...   width * height * channels uint8 pixels, row-major
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+FRAME_MAGIC = b"RPF1"
+_HEADER = struct.Struct("<4sHHBBH")
+
+ORDER_GRAY = 0
+ORDER_RGB = 1
+ORDER_BGR = 2
+_ORDER_CHANNELS = {ORDER_GRAY: 1, ORDER_RGB: 3, ORDER_BGR: 3}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class FrameError(ValueError):
+    """Raised when a raw frame header or payload is invalid."""
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    width: int
+    height: int
+    channels: int
+    order: int
+    camera_id: Optional[str]
+    header_size: int
+
+    @property
+    def pixel_bytes(self) -> int:
+        return self.width * self.height * self.channels
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.header_size + self.pixel_bytes
+
+
+def max_frame_bytes(max_side: int) -> int:
+    """Largest valid message: longest camera id plus a max_side x max_side colour frame."""
+    return _HEADER.size + 0xFFFF + max_side * max_side * 3
+
+
+def is_raw_frame(buf: Buffer) -> bool:
+    return bytes(buf[: len(FRAME_MAGIC)]) == FRAME_MAGIC
+
+
+def parse_frame_header(buf: Buffer, max_side: int) -> FrameHeader:
+    """
+    Parse and validate the header at the start of buf.
+    """
+    if len(buf) < _HEADER.size:
+        raise FrameError("Frame is shorter than its header")
+
+    magic, width, height, channels, order, cam_len = _HEADER.unpack_from(buf, 0)
+    if magic != FRAME_MAGIC:
+        raise FrameError("Bad frame magic; expected RPF1")
+    if order not in _ORDER_CHANNELS:
+        raise FrameError(f"Unknown pixel order {order}")
+    if channels != _ORDER_CHANNELS[order]:
+        raise FrameError(f"Pixel order {order} needs {_ORDER_CHANNELS[order]} channel(s), got {channels}")
+    if not (0 < width <= max_side and 0 < height <= max_side):
+        raise FrameError(f"Frame size {width}x{height} outside 1..{max_side}")
+
+    header_size = _HEADER.size + cam_len
+    if len(buf) < header_size:
+        raise FrameError("Frame is shorter than its camera id")
+    camera_id = None
+    if cam_len:
+        try:
+            camera_id = bytes(buf[_HEADER.size:header_size]).decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise FrameError(f"Camera id is not valid UTF-8: {e}")
+
+    return FrameHeader(width, height, channels, order, camera_id, header_size)
+
+
+def frame_array(buf: Buffer, header: FrameHeader) -> np.ndarray:
+    """
+    View the pixels behind the header as an image array, without copying.
+
+    Colour frames are returned in BGR, the channel order Ultralytics expects for
+    array input and the one decoded uploads on /analyze-image are converted
+    to, so BGR and grayscale frames are passed through as they are; only RGB
+    frames need a reordering copy.
+    """
+    if len(buf) != header.frame_bytes:
+        raise FrameError(f"Expected {header.frame_bytes} bytes for this frame, got {len(buf)}")
+
+    pixels = np.frombuffer(buf, dtype=np.uint8, count=header.pixel_bytes, offset=header.header_size)
+    if header.channels == 1:
+        return pixels.reshape(header.height, header.width)
+
+    img = pixels.reshape(header.height, header.width, header.channels)
+    if header.order == ORDER_RGB:
+        img = np.ascontiguousarray(img[..., ::-1])
+    return img
+
+
+def encode_frame(img: np.ndarray, order: int, camera_id: Optional[str] = None) -> bytes:
+    """
+    Pack an image array into the wire format (used by clients and tools).
+    """
+    cam = (camera_id or "").encode("utf-8")
+    height, width = img.shape[:2]
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    header = _HEADER.pack(FRAME_MAGIC, width, height, channels, order, len(cam))
+    return header + cam + np.ascontiguousarray(img, dtype=np.uint8).tobytes()
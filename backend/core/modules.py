@@ -0,0 +1,24 @@
+# backend/core/modules.py
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+from core.config import settings
+
+
+def import_from_modules(module_dir: Path, name: str) -> ModuleType:
+    """
+    Import a module from one of the repo's modules/ folders (e.g. modules/vision).
+
+    Those folders use flat imports (``from schema import ...``), so the folder
+    itself is put on sys.path rather than imported as a package.
+    """
+    path = (settings.base_dir / module_dir).resolve()
+    if not path.is_dir():
+        raise RuntimeError(f"Module directory not found at {path}")
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+    return importlib.import_module(name)
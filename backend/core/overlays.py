@@ -0,0 +1,124 @@
+# backend/core/overlays.py
+"""
+Responsive overlay variants.
+
+Next to the full-resolution JPEG, every overlay gets a small thumbnail and a
+medium-size WebP for dashboard list views. Their URLs (/overlays/<name>) are
+derived from the overlay name and returned with every result. Encoding runs
+on a background worker right after the overlay is saved; a variant
+requested before that worker got to it is encoded on demand, so the URLs
+always resolve.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+
+from core.config import settings
+
+# name -> (max width, WebP quality)
+VARIANTS: Dict[str, tuple] = {
+    "thumb": (settings.overlay_thumb_width, 70),
+    "medium": (settings.overlay_medium_width, 80),
+}
+
+_VARIANT_FILE = re.compile(rf"(?P<stem>[0-9A-Za-z_-]+)_(?P<variant>{'|'.join(VARIANTS)})\.webp")
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots = threading.BoundedSemaphore(settings.overlay_variant_queue)
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.overlay_variant_workers, thread_name_prefix="overlay-variants"
+                )
+    return _executor
+
+
+def variant_name(overlay_name: str, variant: str) -> str:
+    return f"{Path(overlay_name).stem}_{variant}.webp"
+
+
+def variant_urls(overlay_name: str, url_prefix: str = "/overlays") -> Dict[str, str]:
+    return {variant: f"{url_prefix}/{variant_name(overlay_name, variant)}" for variant in VARIANTS}
+
+
+def _encode_variant(img, overlay_name: str, variant: str, out_dir: Path) -> Path:
+    max_width, quality = VARIANTS[variant]
+    scaled = img.copy()
+    scaled.thumbnail((max_width, max_width * 4))  # bound by width, keep aspect
+    target = out_dir / variant_name(overlay_name, variant)
+    # Private temp name: the background worker and an on-demand request may race
+    tmp = out_dir / f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    scaled.save(tmp, format="WEBP", quality=quality, method=4)
+    tmp.replace(target)  # never serve a half-written file
+    return target
+
+
+def _encode_variants(img, overlay_name: str, out_dir: Path) -> None:
+    for variant in VARIANTS:
+        if not (out_dir / variant_name(overlay_name, variant)).exists():
+            _encode_variant(img, overlay_name, variant, out_dir)
+
+
+def _encode_and_release(img, overlay_name: str, out_dir: Path) -> None:
+    try:
+        _encode_variants(img, overlay_name, out_dir)
+    except Exception:
+        # Variants are best effort here; a failed one is encoded on demand
+        logger.exception("Encoding overlay variants for %s failed", overlay_name)
+    finally:
+        _slots.release()
+
+
+def schedule_variants(img, overlay_name: str) -> Dict[str, str]:
+    """
+    Encode WebP variants of a saved overlay (a PIL image) and return their
+    URLs by variant. Encoding is queued on the background worker; when its
+    queue is full it runs in the calling thread, which bounds the memory
+    held by pending images.
+    """
+    out_dir = settings.overlays_dir
+    if _slots.acquire(blocking=False):
+        _get_executor().submit(_encode_and_release, img, overlay_name, out_dir)
+    else:
+        try:
+            _encode_variants(img, overlay_name, out_dir)
+        except Exception:
+            logger.exception("Encoding overlay variants for %s failed", overlay_name)
+    return variant_urls(overlay_name)
+
+
+def resolve_variant(file_name: str) -> Optional[Path]:
+    """
+    Path of a variant file, encoding it from its overlay first if it is not
+    written yet. None when the name is not a variant of an existing overlay.
+    """
+    match = _VARIANT_FILE.fullmatch(file_name)
+    if match is None:
+        return None
+    out_dir = settings.overlays_dir
+    target = out_dir / file_name
+    if target.exists():
+        return target
+    overlay_name = f"{match['stem']}.jpg"
+    source = out_dir / overlay_name
+    if not source.exists():
+        return None
+    with Image.open(source) as img:
+        img.load()
+        return _encode_variant(img, overlay_name, match["variant"], out_dir)
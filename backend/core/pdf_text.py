@@ -0,0 +1,142 @@
+# backend/core/pdf_text.py
+"""
+PDF text extraction engine.
+
+Parsing runs in a process pool so it never blocks the event loop. Large
+documents are split into page ranges that are extracted in parallel; within
+a range PyPDF2 handles every page and pdfminer.six is only run for the pages
+PyPDF2 returned empty, instead of re-parsing the whole document.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+
+from core.config import settings
+
+PdfSource = Union[bytes, str]  # raw bytes, or a path to a file workers can open
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded server process is not safe
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.pdf_workers or os.cpu_count() or 1,
+                    mp_context=mp.get_context("spawn"),
+                )
+    return _pool
+
+
+def _open(source: PdfSource):
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+
+# === Worker functions (run in the pool) ===
+def _page_count(source: PdfSource) -> Optional[int]:
+    """Number of pages, or None when PyPDF2 cannot read the document."""
+    try:
+        import PyPDF2  # type: ignore
+
+        with _open(source) as f:
+            return len(PyPDF2.PdfReader(f).pages)
+    except Exception:
+        return None
+
+
+def _pdfminer_pages(f, page_numbers: List[int]) -> List[str]:
+    """Text of the given pages (ascending, 0-based) in one pdfminer pass."""
+    from pdfminer.high_level import extract_text  # type: ignore
+
+    text = extract_text(f, page_numbers=page_numbers)
+    # pdfminer terminates every page with a form feed
+    pages = text.split("\f")
+    return [pages[i] if i < len(pages) else "" for i in range(len(page_numbers))]
+
+
+def _extract_pages(source: PdfSource, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop), with pdfminer filling in pages PyPDF2 left empty."""
+    import PyPDF2  # type: ignore
+
+    with _open(source) as f:
+        texts: List[str] = []
+        try:
+            reader = PyPDF2.PdfReader(f)
+            for i in range(start, stop):
+                try:
+                    texts.append(reader.pages[i].extract_text() or "")
+                except Exception:
+                    texts.append("")
+        except Exception:
+            texts = [""] * (stop - start)
+
+        empty = [start + i for i, t in enumerate(texts) if not t.strip()]
+        if empty:
+            try:
+                f.seek(0)
+                for page_no, text in zip(empty, _pdfminer_pages(f, empty)):
+                    texts[page_no - start] = text
+            except Exception:
+                pass
+    return texts
+
+
+def _extract_all_pdfminer(source: PdfSource) -> str:
+    """Whole-document pdfminer fallback for files PyPDF2 cannot open."""
+    try:
+        from pdfminer.high_level import extract_text  # type: ignore
+
+        with _open(source) as f:
+            return extract_text(f) or ""
+    except Exception:
+        return ""
+
+
+# === Async API ===
+async def extract_pdf_text(source: PdfSource) -> str:
+    """
+    Extract the text of a PDF given as bytes or as a file path.
+    Returns "" when no text could be extracted.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+
+    tmp_path: Optional[Path] = None
+    if isinstance(source, (bytes, bytearray)) and len(source) > settings.pdf_inline_max_bytes:
+        # Hand large documents to the workers as a file instead of pickling the bytes per task
+        fd, name = tempfile.mkstemp(suffix=".pdf", dir=settings.data_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        tmp_path = Path(name)
+        source = name
+
+    try:
+        count = await loop.run_in_executor(pool, _page_count, source)
+        if count is None:
+            text = await loop.run_in_executor(pool, _extract_all_pdfminer, source)
+            return text if text.strip() else ""
+
+        step = max(1, settings.pdf_pages_per_task)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, _extract_pages, source, start, min(start + step, count))
+            for start in range(0, count, step)
+        ))
+        text = "\n".join(page for part in parts for page in part)
+        return text if text.strip() else ""
+    finally:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
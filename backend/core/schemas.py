@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional, Dict, Tuple
 from pydantic import BaseModel, Field
 
@@ -47,6 +48,46 @@ class VisionOut(BaseModel):
     helmeted_persons: int
     compliance_rate: float = Field(ge=0.0, le=1.0)
     overlay_url: Optional[str] = None
+    overlay_variants: Dict[str, str] = Field(default_factory=dict)  # "thumb" / "medium" WebP URLs (/overlays/...)
+
+
+# === Compliance time series ===
+class CompliancePoint(BaseModel):
+    bucket_start: datetime
+    frames: int
+    rated_frames: int  # frames with at least one helmet / no-helmet detection
+    persons: int
+    helmeted_persons: int
+    no_helmet: int
+    # helmeted / (helmeted + no_helmet); None when the bucket has no rated frames
+    mean_compliance: Optional[float] = Field(None, ge=0.0, le=1.0)
+    min_compliance: Optional[float] = Field(None, ge=0.0, le=1.0)
+    max_compliance: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class ComplianceSeriesOut(BaseModel):
+    site_id: str
+    camera_id: Optional[str] = None
+    resolution: str  # "minute" | "hour" | "day"
+    start: datetime
+    end: datetime
+    frames: int
+    mean_compliance: Optional[float] = None  # from the summed counts over the whole range
+    points: List[CompliancePoint]
+
+
+class ComplianceSample(BaseModel):
+    ts: datetime
+    persons: int
+    helmeted_persons: int
+    no_helmet: int
+    compliance_rate: Optional[float] = Field(None, ge=0.0, le=1.0)  # None without head-gear detections
+
+
+class ComplianceRecentOut(BaseModel):
+    site_id: str
+    camera_id: str
+    samples: List[ComplianceSample]
 
 
 # === Scribe ===
@@ -67,3 +108,32 @@ class ScribeOut(BaseModel):
     low_confidence: bool = False
     confidence: Dict[str, float] = Field(default_factory=dict)
     export_csv_url: Optional[str] = None
+
+
+# === Scribe extraction store ===
+class ExtractionItem(BaseModel):
+    extraction_id: int
+    log_date: Optional[str] = None
+    site: Optional[str] = None
+    location: Optional[str] = None
+    kind: str  # "task" | "issue" | "safety"
+    cause: Optional[str] = None
+    incident_type: Optional[str] = None
+    severity: Optional[str] = None
+    text: str
+
+
+class ExtractionSearchOut(BaseModel):
+    total: int
+    items: List[ExtractionItem]
+
+
+class ExtractionStatsBucket(BaseModel):
+    key: Optional[str] = None
+    count: int
+
+
+class ExtractionStatsOut(BaseModel):
+    group_by: str
+    total: int
+    buckets: List[ExtractionStatsBucket]
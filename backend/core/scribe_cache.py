@@ -0,0 +1,175 @@
+# backend/core/scribe_cache.py
+"""
+Content-hash cache for Scribe.
+
+Two levels, both keyed by SHA-256:
+  - PDF bytes -> extracted text
+  - text + extractor version -> ScribeOut (as JSON)
+
+Each level is a bounded in-memory LRU in front of a SQLite table, so repeat
+uploads skip PDF parsing and extraction entirely, across restarts too.
+Extraction entries carry the extractor version they were produced with;
+entries from any other version are purged when the store opens and never
+returned. The SQLite tables are pruned to max_rows entries each, and of
+entries older than max_age seconds, when the store opens and every
+PRUNE_EVERY writes after that.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_text (
+    digest TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS extractions (
+    digest TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pdf_text_created ON pdf_text (created);
+CREATE INDEX IF NOT EXISTS extractions_created ON extractions (created);
+"""
+_TABLES = ("pdf_text", "extractions")
+PRUNE_EVERY = 256
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class _LRU:
+    def __init__(self, max_items: int):
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._max = max(0, max_items)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        if not self._max:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self._max:
+            self._items.popitem(last=False)
+
+
+class ScribeCache:
+    def __init__(self, db_path: Path, version: str, memory_items: int = 256,
+                 max_rows: int = 0, max_age: float = 0.0):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        self.max_rows = max(0, max_rows)
+        self.max_age = max(0.0, max_age)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            # Results of other extractor versions can never be served again
+            self._conn.execute("DELETE FROM extractions WHERE version != ?", (version,))
+        self._lock = threading.Lock()
+        self._texts = _LRU(memory_items)
+        self._results = _LRU(memory_items)
+        self._writes = 0
+        with self._lock:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Drop entries past max_age, then the oldest beyond max_rows. Caller holds the lock."""
+        with self._conn:
+            for table in _TABLES:
+                if self.max_age:
+                    self._conn.execute(f"DELETE FROM {table} WHERE created < ?", (time.time() - self.max_age,))
+                if self.max_rows:
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE digest IN "
+                        f"(SELECT digest FROM {table} ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,),
+                    )
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self._prune()
+
+    # --- Level 1: PDF bytes -> text ---
+    def get_text(self, digest: str) -> Optional[str]:
+        with self._lock:
+            text = self._texts.get(digest)
+            if text is None:
+                row = self._conn.execute("SELECT text FROM pdf_text WHERE digest = ?", (digest,)).fetchone()
+                if row is not None:
+                    text = row[0]
+                    self._texts.put(digest, text)
+        return text
+
+    def put_text(self, digest: str, text: str) -> None:
+        with self._lock:
+            self._texts.put(digest, text)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pdf_text (digest, text, created) VALUES (?, ?, ?)",
+                    (digest, text, time.time()),
+                )
+            self._wrote()
+
+    # --- Level 2: text -> extraction result ---
+    def get_result(self, digest: str) -> Optional[str]:
+        with self._lock:
+            payload = self._results.get(digest)
+            if payload is None:
+                row = self._conn.execute(
+                    "SELECT payload FROM extractions WHERE digest = ? AND version = ?",
+                    (digest, self.version),
+                ).fetchone()
+                if row is not None:
+                    payload = row[0]
+                    self._results.put(digest, payload)
+        return payload
+
+    def put_result(self, digest: str, payload: str) -> None:
+        with self._lock:
+            self._results.put(digest, payload)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extractions (digest, version, payload, created) VALUES (?, ?, ?, ?)",
+                    (digest, self.version, payload, time.time()),
+                )
+            self._wrote()
+
+
+_cache: Optional[ScribeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(version: str) -> ScribeCache:
+    global _cache
+    if _cache is None or _cache.version != version:
+        with _cache_lock:
+            if _cache is None or _cache.version != version:
+                _cache = ScribeCache(
+                    settings.scribe_cache_db_path,
+                    version,
+                    settings.scribe_cache_items,
+                    max_rows=settings.scribe_cache_max_rows,
+                    max_age=settings.scribe_cache_max_age_days * 86400.0,
+                )
+    return _cache
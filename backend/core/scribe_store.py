@@ -0,0 +1,289 @@
+# backend/core/scribe_store.py
+"""
+Indexed store of Scribe extractions.
+
+Every extraction is kept in SQLite: one row per document (date, site,
+location, the full ScribeOut) and one row per extracted item (task, issue or
+safety observation) carrying its cause, incident type and severity. Items
+are indexed on those columns and full-text indexed with FTS5, so questions
+like "all material_delay issues at SEDRA last month" are answered from the
+index without re-parsing any document. CSV exports are generated on demand
+from query results.
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL,
+    log_date TEXT,
+    site TEXT,
+    location TEXT,
+    personnel_count INTEGER,
+    low_confidence INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_date ON extractions (log_date);
+CREATE INDEX IF NOT EXISTS extractions_site_date ON extractions (site, log_date);
+
+CREATE TABLE IF NOT EXISTS extraction_items (
+    id INTEGER PRIMARY KEY,
+    extraction_id INTEGER NOT NULL REFERENCES extractions (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    cause TEXT,
+    incident_type TEXT,
+    severity TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_extraction ON extraction_items (extraction_id);
+CREATE INDEX IF NOT EXISTS items_kind_cause ON extraction_items (kind, cause);
+CREATE INDEX IF NOT EXISTS items_kind_incident ON extraction_items (kind, incident_type, severity);
+
+CREATE TABLE IF NOT EXISTS extraction_batches (
+    batch_id TEXT NOT NULL,
+    extraction_id INTEGER NOT NULL REFERENCES extractions (id) ON DELETE CASCADE,
+    PRIMARY KEY (batch_id, extraction_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS batches_extraction ON extraction_batches (extraction_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS extraction_fts USING fts5 (
+    text, content='extraction_items', content_rowid='id'
+);
+"""
+
+ITEM_KINDS = ("task", "issue", "safety")
+GROUP_COLUMNS: Dict[str, str] = {
+    "kind": "i.kind",
+    "cause": "i.cause",
+    "incident_type": "i.incident_type",
+    "severity": "i.severity",
+    "site": "e.site",
+    "month": "substr(e.log_date, 1, 7)",
+    "date": "e.log_date",
+}
+EXPORT_COLUMNS = [
+    "extraction_id", "log_date", "site", "location", "kind", "cause", "incident_type", "severity", "text",
+]
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+Item = Tuple[str, Optional[str], Optional[str], Optional[str], str]  # (kind, cause, incident_type, severity, text)
+
+
+def _fts_query(q: str) -> str:
+    """Quote every term so user input can never be parsed as FTS5 syntax."""
+    terms = [t.replace('"', '""') for t in q.split() if t.strip()]
+    return " ".join(f'"{t}"' for t in terms)
+
+
+class Filters:
+    """WHERE clause over extraction_items i JOIN extractions e."""
+
+    def __init__(
+        self,
+        q: Optional[str] = None,
+        site: Optional[str] = None,
+        kind: Optional[str] = None,
+        cause: Optional[str] = None,
+        incident_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        extraction_id: Optional[int] = None,
+    ):
+        self.joins = ""
+        self.clauses: List[str] = []
+        self.params: list = []
+        if q and _fts_query(q):
+            self.joins = " JOIN extraction_fts f ON f.rowid = i.id"
+            self.clauses.append("extraction_fts MATCH ?")
+            self.params.append(_fts_query(q))
+        for column, value in (
+            ("e.site", site), ("i.kind", kind), ("i.cause", cause),
+            ("i.incident_type", incident_type), ("i.severity", severity),
+            ("e.id", extraction_id),
+        ):
+            if value is not None:
+                self.clauses.append(f"{column} = ?")
+                self.params.append(value)
+        if batch_id is not None:
+            self.clauses.append("e.id IN (SELECT extraction_id FROM extraction_batches WHERE batch_id = ?)")
+            self.params.append(batch_id)
+        if start:
+            self.clauses.append("e.log_date >= ?")
+            self.params.append(start)
+        if end:
+            self.clauses.append("e.log_date < ?")
+            self.params.append(end)
+
+    def sql(self) -> str:
+        where = f" WHERE {' AND '.join(self.clauses)}" if self.clauses else ""
+        return f"FROM extraction_items i JOIN extractions e ON e.id = i.extraction_id{self.joins}{where}"
+
+
+class ExtractionStore:
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        digest: str,
+        payload: str,
+        log_date: Optional[str],
+        site: Optional[str],
+        location: Optional[str],
+        personnel_count: Optional[int],
+        low_confidence: bool,
+        items: Sequence[Item],
+        batch_id: Optional[str] = None,
+    ) -> int:
+        """
+        Store one extraction and its items. A document stored before keeps
+        its id (and so its export URL) and the batches it was part of; its
+        fields and items are replaced. Returns the extraction id.
+        """
+        log_date = log_date if log_date and _ISO_DATE.match(log_date) else None
+        fields = (time.time(), log_date, site, location, personnel_count, int(low_confidence), payload)
+        with self._lock:
+            with self._conn:
+                old = self._conn.execute("SELECT id FROM extractions WHERE digest = ?", (digest,)).fetchone()
+                if old is not None:
+                    extraction_id = old[0]
+                    self._delete_items(extraction_id)
+                    self._conn.execute(
+                        """
+                        UPDATE extractions
+                        SET created = ?, log_date = ?, site = ?, location = ?, personnel_count = ?,
+                            low_confidence = ?, payload = ?
+                        WHERE id = ?
+                        """,
+                        (*fields, extraction_id),
+                    )
+                else:
+                    cur = self._conn.execute(
+                        """
+                        INSERT INTO extractions
+                            (digest, created, log_date, site, location, personnel_count, low_confidence, payload)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (digest, *fields),
+                    )
+                    extraction_id = cur.lastrowid
+                if batch_id is not None:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO extraction_batches (batch_id, extraction_id) VALUES (?, ?)",
+                        (batch_id, extraction_id),
+                    )
+                for kind, cause, incident_type, severity, text in items:
+                    cur = self._conn.execute(
+                        """
+                        INSERT INTO extraction_items (extraction_id, kind, cause, incident_type, severity, text)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (extraction_id, kind, cause, incident_type, severity, text),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO extraction_fts (rowid, text) VALUES (?, ?)", (cur.lastrowid, text)
+                    )
+        return extraction_id
+
+    def _delete_items(self, extraction_id: int) -> None:
+        # External-content FTS rows must be removed with the original text
+        rows = self._conn.execute(
+            "SELECT id, text FROM extraction_items WHERE extraction_id = ?", (extraction_id,)
+        ).fetchall()
+        self._conn.executemany(
+            "INSERT INTO extraction_fts (extraction_fts, rowid, text) VALUES ('delete', ?, ?)", rows
+        )
+        self._conn.execute("DELETE FROM extraction_items WHERE extraction_id = ?", (extraction_id,))
+
+    def get(self, extraction_id: int) -> Optional[str]:
+        """Stored ScribeOut JSON of one extraction."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM extractions WHERE id = ?", (extraction_id,)).fetchone()
+        return row[0] if row else None
+
+    def search(self, filters: Filters, limit: int = 100, offset: int = 0) -> Tuple[int, List[dict]]:
+        """Matching items, newest log first, plus the total match count."""
+        base = filters.sql()
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) {base}", filters.params).fetchone()[0]
+            rows = self._conn.execute(
+                f"""
+                SELECT e.id, e.log_date, e.site, e.location, i.kind, i.cause, i.incident_type, i.severity, i.text
+                {base}
+                ORDER BY e.log_date DESC, i.id
+                LIMIT ? OFFSET ?
+                """,
+                [*filters.params, limit, offset],
+            ).fetchall()
+        return total, [dict(zip(EXPORT_COLUMNS, r)) for r in rows]
+
+    def stats(self, filters: Filters, group_by: str) -> List[Tuple[Optional[str], int]]:
+        """Item counts per value of a GROUP_COLUMNS key."""
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unknown group_by '{group_by}'. Use one of: {', '.join(GROUP_COLUMNS)}")
+        column = GROUP_COLUMNS[group_by]
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {column} AS key, COUNT(*) {filters.sql()} GROUP BY key ORDER BY COUNT(*) DESC, key",
+                filters.params,
+            ).fetchall()
+
+    def iter_rows(self, filters: Filters, limit: Optional[int] = None, chunk: int = 1000) -> Iterator[tuple]:
+        """
+        Stream matching rows (EXPORT_COLUMNS order) on a dedicated read
+        connection, so long exports do not hold the writer lock. A
+        StreamingResponse advances the generator on whichever threadpool
+        thread is free, so the connection may not be tied to one thread;
+        it is only ever used by one at a time.
+        """
+        conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        try:
+            sql = f"""
+                SELECT e.id, e.log_date, e.site, e.location, i.kind, i.cause, i.incident_type, i.severity, i.text
+                {filters.sql()}
+                ORDER BY e.log_date, e.id, i.id
+            """
+            params = list(filters.params)
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            cur = conn.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+
+_store: Optional[ExtractionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_extraction_store() -> ExtractionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ExtractionStore(settings.scribe_store_db_path)
+    return _store
@@ -0,0 +1,26 @@
+# backend/core/static.py
+from __future__ import annotations
+
+from typing import Tuple
+
+from starlette.staticfiles import StaticFiles
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that marks files under the given prefixes as immutable, so
+    browsers and proxies cache them for a year. Only use it for paths whose
+    names change whenever their content does (e.g. uuid-named overlays).
+    """
+
+    def __init__(self, *args, immutable_prefixes: Tuple[str, ...] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefixes = tuple(p.strip("/") + "/" for p in immutable_prefixes)
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304) and path.replace("\\", "/").startswith(self.immutable_prefixes):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
@@ -0,0 +1,172 @@
+# backend/core/timeseries.py
+"""
+Compliance time-series store.
+
+Every analysed frame that carries a camera id is folded into minute, hour and
+day rollups in SQLite as it arrives (one upsert per resolution), so range
+queries read a few hundred pre-aggregated rows instead of raw detections.
+Compliance is helmeted / (helmeted + no-helmet) over the summed counts, so
+frames in which nobody's head gear was detected do not pull the rate down.
+The most recent samples per site/camera are also kept in a fixed-size
+in-process ring buffer for live views.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+RESOLUTIONS: Dict[str, int] = {"minute": 60, "hour": 3600, "day": 86400}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS compliance_rollups (
+    site TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    rated_frames INTEGER NOT NULL,
+    persons INTEGER NOT NULL,
+    helmeted INTEGER NOT NULL,
+    no_helmet INTEGER NOT NULL,
+    compliance_min REAL,
+    compliance_max REAL,
+    PRIMARY KEY (site, camera, resolution, bucket_start)
+) WITHOUT ROWID;
+"""
+
+# compliance_min/max are NULL until the bucket sees a frame with a rate
+_UPSERT = """
+INSERT INTO compliance_rollups
+    (site, camera, resolution, bucket_start, frames, rated_frames, persons, helmeted, no_helmet,
+     compliance_min, compliance_max)
+VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (site, camera, resolution, bucket_start) DO UPDATE SET
+    frames = frames + 1,
+    rated_frames = rated_frames + excluded.rated_frames,
+    persons = persons + excluded.persons,
+    helmeted = helmeted + excluded.helmeted,
+    no_helmet = no_helmet + excluded.no_helmet,
+    compliance_min = COALESCE(MIN(compliance_min, excluded.compliance_min), compliance_min, excluded.compliance_min),
+    compliance_max = COALESCE(MAX(compliance_max, excluded.compliance_max), compliance_max, excluded.compliance_max)
+"""
+
+Sample = Tuple[float, int, int, int]  # (ts, persons, helmeted, no_helmet)
+
+
+def compliance_rate(helmeted: int, no_helmet: int) -> Optional[float]:
+    """Share of head-gear detections with a helmet; None when there are none."""
+    rated = helmeted + no_helmet
+    return round(helmeted / rated, 4) if rated else None
+
+
+class ComplianceStore:
+    def __init__(self, db_path: Path, ring_size: int = 512):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._ring_size = ring_size
+        self._recent: Dict[Tuple[str, str], Deque[Sample]] = {}
+
+    def record(
+        self,
+        site: str,
+        camera: str,
+        persons: int,
+        helmeted: int,
+        no_helmet: int,
+        ts: Optional[float] = None,
+    ) -> None:
+        """Fold one frame's counts into every rollup resolution."""
+        ts = time.time() if ts is None else ts
+        rate = compliance_rate(helmeted, no_helmet)
+        rows = [
+            (site, camera, name, int(ts) // width * width, int(rate is not None), persons, helmeted,
+             no_helmet, rate, rate)
+            for name, width in RESOLUTIONS.items()
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(_UPSERT, rows)
+            ring = self._recent.get((site, camera))
+            if ring is None:
+                ring = self._recent[(site, camera)] = deque(maxlen=self._ring_size)
+            ring.append((ts, persons, helmeted, no_helmet))
+
+    def recent(self, site: str, camera: str, limit: Optional[int] = None) -> List[Sample]:
+        with self._lock:
+            samples = list(self._recent.get((site, camera), ()))
+        return samples[-limit:] if limit else samples
+
+    def series(
+        self,
+        site: str,
+        resolution: str,
+        start: float,
+        end: float,
+        camera: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Rollup buckets in [start, end). Without a camera, the site's cameras
+        are combined per bucket.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}'. Use one of: {', '.join(RESOLUTIONS)}")
+        width = RESOLUTIONS[resolution]
+        query = """
+            SELECT bucket_start, SUM(frames), SUM(rated_frames), SUM(persons), SUM(helmeted),
+                   SUM(no_helmet), MIN(compliance_min), MAX(compliance_max)
+            FROM compliance_rollups
+            WHERE site = ? AND resolution = ? AND bucket_start >= ? AND bucket_start < ?
+        """
+        params: list = [site, resolution, int(start) // width * width, int(end)]
+        if camera is not None:
+            query += " AND camera = ?"
+            params.append(camera)
+        query += " GROUP BY bucket_start ORDER BY bucket_start"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "bucket_start": bucket,
+                "frames": frames,
+                "rated_frames": rated,
+                "persons": persons,
+                "helmeted_persons": helmeted,
+                "no_helmet": no_helmet,
+                "mean_compliance": compliance_rate(helmeted, no_helmet),
+                "min_compliance": c_min,
+                "max_compliance": c_max,
+            }
+            for bucket, frames, rated, persons, helmeted, no_helmet, c_min, c_max in rows
+        ]
+
+    def cameras(self, site: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT camera FROM compliance_rollups WHERE site = ? AND resolution = 'day'",
+                (site,),
+            ).fetchall()
+        return sorted(r[0] for r in rows)
+
+
+_store: Optional[ComplianceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ComplianceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ComplianceStore(settings.compliance_db_path, settings.compliance_ring_size)
+    return _store
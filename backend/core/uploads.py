@@ -0,0 +1,172 @@
+# backend/core/uploads.py
+"""
+Streaming, memory-capped request ingestion.
+
+Bodies are read chunk by chunk with their size limits enforced as they
+arrive. Multipart uploads go through python-multipart's streaming
+FormParser, which keeps a file part in memory up to a threshold and spills it
+to a temp file beyond it, so no request holds more than the threshold plus
+one chunk of raw file bytes. Spilled PDFs are handed to the parsing workers
+by path instead of as a bytes copy.
+"""
+from __future__ import annotations
+
+import codecs
+import hashlib
+import os
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartParser
+from starlette.requests import Request
+
+from core.config import settings
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import Field, File, FormParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import Field, File, FormParser, parse_options_header
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds its size limit while streaming."""
+
+
+class SpooledUpload:
+    """
+    A file part parsed by python-multipart: held in memory while small and in
+    a temp file beyond settings.pdf_inline_max_bytes, with its digest.
+    """
+
+    def __init__(self, file: File, digest: str):
+        self._file = file
+        self.digest = digest
+        self.size = file.size
+        name = file.actual_file_name
+        self.path: Optional[Path] = None if file.in_memory else Path(os.fsdecode(name))
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """Bytes for small uploads, a file path for spilled ones (see core.pdf_text)."""
+        return str(self.path) if self.path is not None else self._file.file_object.getvalue()
+
+    def close(self) -> None:
+        # The temp file is created with delete=True, so closing it removes it
+        self._file.close()
+        self.path = None
+
+
+def _sha256_file(fileobj: BinaryIO) -> str:
+    fileobj.seek(0)
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+async def read_text(chunks: AsyncIterator[bytes], max_bytes: int, errors: str = "ignore") -> str:
+    """
+    Decode a UTF-8 body incrementally: only the decoded text and one raw
+    chunk are held at a time, never the whole body twice.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors=errors)
+    parts: List[str] = []
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Body is larger than {max_bytes} bytes")
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def check_content_length(request: Request, max_bytes: int) -> None:
+    """Reject a body whose declared length is already over the limit, before reading it."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise UploadTooLarge(f"Upload is larger than {max_bytes} bytes")
+
+
+async def limit_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, failing with UploadTooLarge once more than max_bytes have arrived."""
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload is larger than {max_bytes} bytes")
+        yield chunk
+
+
+async def parse_form(request: Request, max_bytes: int, max_files: int) -> FormData:
+    """
+    request.form() with a bound on the whole body: Starlette only limits
+    non-file parts, so the raw stream is counted while its parser spools it.
+    """
+    check_content_length(request, max_bytes)
+    parser = MultiPartParser(request.headers, limit_stream(request.stream(), max_bytes), max_files=max_files)
+    return await parser.parse()
+
+
+async def read_upload_form(
+    request: Request, file_field: str, max_bytes: int, max_field_bytes: int
+) -> Tuple[Optional[SpooledUpload], Dict[str, str]]:
+    """
+    Stream a multipart body through python-multipart's FormParser, without
+    Starlette spooling it first. Returns the first upload under file_field
+    (None when absent) and the text fields. The whole body is bounded by
+    max_bytes and each text field by max_field_bytes (UploadTooLarge); a
+    malformed body raises ValueError.
+    """
+    check_content_length(request, max_bytes)
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Missing boundary in multipart body")
+    fields: Dict[str, str] = {}
+    files: List[File] = []
+
+    def on_field(field: Field) -> None:
+        value = field.value or b""
+        if len(value) > max_field_bytes:
+            raise UploadTooLarge(f"Form field is larger than {max_field_bytes} bytes")
+        name = field.field_name.decode("utf-8", errors="replace")
+        fields.setdefault(name, value.decode("utf-8", errors="ignore"))
+
+    def on_file(file: File) -> None:
+        files.append(file)
+
+    try:
+        parser = FormParser(
+            "multipart/form-data",
+            on_field,
+            on_file,
+            boundary=boundary,
+            config={
+                "MAX_MEMORY_FILE_SIZE": settings.pdf_inline_max_bytes,
+                "UPLOAD_DIR": str(settings.data_dir),
+            },
+        )
+        # Parts past the memory threshold are written to disk by the parser
+        async for chunk in limit_stream(request.stream(), max_bytes):
+            await run_in_threadpool(parser.write, chunk)
+        parser.finalize()
+    except BaseException as exc:
+        for file in files:
+            file.close()
+        if isinstance(exc, FormParserError):
+            raise ValueError("Invalid multipart body") from exc
+        raise
+
+    upload: Optional[SpooledUpload] = None
+    for file in files:
+        if upload is None and file.field_name == file_field.encode("utf-8"):
+            digest = await run_in_threadpool(_sha256_file, file.file_object)
+            upload = SpooledUpload(file, digest)
+        else:
+            file.close()
+    return upload, fields
@@ -0,0 +1,120 @@
+# backend/core/vision_stub.py
+"""
+Stand-in for the YOLO model, for load tests and local runs without weights.
+
+StubYOLO.predict returns objects shaped like Ultralytics Results (boxes with
+xyxy/conf/cls/data tensors, names, speed, plot()), so the vision router runs
+its normal decode, counting and overlay path. Detections are derived from
+the image content, so the same image always gives the same answer, and an
+optional fixed delay stands in for the model's forward pass.
+"""
+from __future__ import annotations
+
+import time
+from typing import Dict, List
+
+import numpy as np
+
+NAMES: Dict[int, str] = {0: "person", 1: "hardhat", 2: "no-hardhat"}
+
+
+class _Array:
+    """numpy array with the torch-style .cpu().numpy() accessors the router uses."""
+
+    def __init__(self, data: np.ndarray):
+        self._data = data
+
+    def cpu(self) -> "_Array":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class StubBoxes:
+    def __init__(self, data: np.ndarray):
+        self.data = _Array(data)
+        self.xyxy = _Array(data[:, :4])
+        self.conf = _Array(data[:, 4])
+        self.cls = _Array(data[:, 5])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class StubResult:
+    def __init__(self, orig_img: np.ndarray, data: np.ndarray, speed: Dict[str, float], path: str = ""):
+        self.orig_img = orig_img
+        self.boxes = StubBoxes(data)
+        self.names = NAMES
+        self.speed = speed
+        self.path = path
+
+    def plot(self) -> np.ndarray:
+        """Image (BGR, like Ultralytics) with box outlines drawn in."""
+        img = self.orig_img
+        img = np.repeat(img[..., None], 3, axis=2) if img.ndim == 2 else img.copy()
+        h, w = img.shape[:2]
+        for x1, y1, x2, y2, _, cls in self.boxes.data.numpy():
+            x1, x2 = (int(np.clip(v, 0, w - 1)) for v in (x1, x2))
+            y1, y2 = (int(np.clip(v, 0, h - 1)) for v in (y1, y2))
+            color = (0, 255, 0) if int(cls) == 1 else (0, 0, 255)
+            img[y1:y2 + 1, [x1, x2]] = color
+            img[[y1, y2], x1:x2 + 1] = color
+        return img
+
+
+class StubYOLO:
+    """predict()-compatible fake model with deterministic, content-derived detections."""
+
+    names = NAMES
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def _detect(self, img: np.ndarray) -> np.ndarray:
+        h, w = img.shape[:2]
+        # Seed from a coarse sample of the pixels: cheap, and stable per image
+        sample = img[:: max(1, h // 16), :: max(1, w // 16)]
+        rng = np.random.default_rng(int(sample.sum()) & 0xFFFFFFFF)
+        rows: List[List[float]] = []
+        for _ in range(int(rng.integers(1, 6))):
+            bw, bh = float(rng.uniform(0.05, 0.2) * w), float(rng.uniform(0.15, 0.5) * h)
+            x1, y1 = float(rng.uniform(0, w - bw)), float(rng.uniform(0, h - bh))
+            rows.append([x1, y1, x1 + bw, y1 + bh, float(rng.uniform(0.3, 0.95)), 0.0])
+            # Head gear box on top of each person
+            helmet = 1.0 if rng.random() < 0.8 else 2.0
+            rows.append([x1 + bw * 0.3, y1, x1 + bw * 0.7, y1 + bh * 0.15, float(rng.uniform(0.3, 0.95)), helmet])
+        return np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+    def remap_result(self, roi, result: StubResult, offset, frame: np.ndarray) -> StubResult:
+        """CameraROI.remap_result for stub results, without torch or Ultralytics."""
+        boxes, keep = roi.map_boxes(result.boxes.data.numpy()[:, :4], offset)
+        data = np.concatenate([boxes, result.boxes.data.numpy()[:, 4:]], axis=1)[keep]
+        return StubResult(frame, data, result.speed, result.path)
+
+    def predict(self, source, conf: float = 0.25, iou: float = 0.7, verbose: bool = False, **kwargs):
+        path = ""
+        if isinstance(source, str) or hasattr(source, "__fspath__"):
+            from PIL import Image
+
+            path = str(source)
+            # Loaded as BGR, like Ultralytics' cv2.imread
+            source = np.ascontiguousarray(np.asarray(Image.open(path).convert("RGB"))[..., ::-1])
+        frames = source if isinstance(source, list) else [source]
+
+        results = []
+        for img in frames:
+            start = time.perf_counter()
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000.0)
+            data = self._detect(img)
+            data = data[data[:, 4] >= conf]
+            forward_ms = (time.perf_counter() - start) * 1000.0
+            results.append(
+                StubResult(img, data, {"preprocess": 0.0, "inference": forward_ms, "postprocess": 0.0}, path)
+            )
+        return results
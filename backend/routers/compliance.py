@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from core.schemas import (
+    ComplianceRecentOut, ComplianceSample, ComplianceSeriesOut, CompliancePoint
+)
+from core.timeseries import RESOLUTIONS, compliance_rate, get_store
+
+router = APIRouter()
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive datetimes are taken as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@router.get("/compliance/series", response_model=ComplianceSeriesOut)
+async def compliance_series(
+    site_id: str,
+    camera_id: Optional[str] = None,
+    resolution: str = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Compliance over [start, end) from the pre-computed rollups.
+    Defaults to the last 24 hours. Without camera_id, the site's cameras are combined.
+    """
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown resolution '{resolution}'. Use one of: {', '.join(RESOLUTIONS)}",
+        )
+    end = _utc(end) if end else datetime.now(timezone.utc)
+    start = _utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    rows = await run_in_threadpool(
+        get_store().series, site_id, resolution, start.timestamp(), end.timestamp(), camera_id
+    )
+    frames = sum(r["frames"] for r in rows)
+    helmeted = sum(r["helmeted_persons"] for r in rows)
+    no_helmet = sum(r["no_helmet"] for r in rows)
+
+    return ComplianceSeriesOut(
+        site_id=site_id,
+        camera_id=camera_id,
+        resolution=resolution,
+        start=start,
+        end=end,
+        frames=frames,
+        mean_compliance=compliance_rate(helmeted, no_helmet),
+        points=[
+            CompliancePoint(
+                **{**r, "bucket_start": datetime.fromtimestamp(r["bucket_start"], tz=timezone.utc)}
+            )
+            for r in rows
+        ],
+    )
+
+
+@router.get("/compliance/recent", response_model=ComplianceRecentOut)
+async def compliance_recent(
+    site_id: str,
+    camera_id: str,
+    limit: int = Query(100, ge=1, le=10000),
+):
+    """
+    Most recent per-frame samples for one camera, served from memory.
+    """
+    samples = get_store().recent(site_id, camera_id, limit)
+    return ComplianceRecentOut(
+        site_id=site_id,
+        camera_id=camera_id,
+        samples=[
+            ComplianceSample(
+                ts=datetime.fromtimestamp(ts, tz=timezone.utc),
+                persons=persons,
+                helmeted_persons=helmeted,
+                no_helmet=no_helmet,
+                compliance_rate=compliance_rate(helmeted, no_helmet),
+            )
+            for ts, persons, helmeted, no_helmet in samples
+        ],
+    )
+
+
+@router.get("/compliance/cameras")
+async def compliance_cameras(site_id: str):
+    cameras = await run_in_threadpool(get_store().cameras, site_id)
+    return {"site_id": site_id, "cameras": cameras}
@@ -0,0 +1,162 @@
+import csv
+import io
+from datetime import date
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.schemas import (
+    ExtractionItem, ExtractionSearchOut, ExtractionStatsBucket, ExtractionStatsOut, ScribeOut
+)
+from core.scribe_store import EXPORT_COLUMNS, GROUP_COLUMNS, ITEM_KINDS, Filters, get_extraction_store
+
+router = APIRouter()
+
+
+def _filters(
+    q: Optional[str] = None,
+    site: Optional[str] = None,
+    kind: Optional[str] = None,
+    cause: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_id: Optional[str] = None,
+) -> Filters:
+    if kind is not None and kind not in ITEM_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}'. Use one of: {', '.join(ITEM_KINDS)}")
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return Filters(
+        q=q, site=site, kind=kind, cause=cause, incident_type=incident_type, severity=severity,
+        start=start.isoformat() if start else None,
+        end=end.isoformat() if end else None,
+        batch_id=batch_id,
+    )
+
+
+def _csv_lines(rows, header) -> Iterator[str]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(header)
+    for row in rows:
+        w.writerow(row)
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+@router.get("/extractions/search", response_model=ExtractionSearchOut)
+async def search_extractions(
+    q: Optional[str] = None,
+    site: Optional[str] = None,
+    kind: Optional[str] = None,
+    cause: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Extracted tasks, issues and safety observations across all stored logs.
+    q is a full-text query; the other filters are exact matches, with
+    start/end bounding the log date as [start, end).
+    """
+    filters = _filters(q, site, kind, cause, incident_type, severity, start, end, batch_id)
+    total, rows = await run_in_threadpool(get_extraction_store().search, filters, limit, offset)
+    return ExtractionSearchOut(total=total, items=[ExtractionItem(**r) for r in rows])
+
+
+@router.get("/extractions/stats", response_model=ExtractionStatsOut)
+async def extraction_stats(
+    group_by: str = "cause",
+    q: Optional[str] = None,
+    site: Optional[str] = None,
+    kind: Optional[str] = None,
+    cause: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_id: Optional[str] = None,
+):
+    """
+    Item counts grouped by kind, cause, incident_type, severity, site, month or date.
+    """
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by '{group_by}'. Use one of: {', '.join(GROUP_COLUMNS)}",
+        )
+    filters = _filters(q, site, kind, cause, incident_type, severity, start, end, batch_id)
+    rows = await run_in_threadpool(get_extraction_store().stats, filters, group_by)
+    return ExtractionStatsOut(
+        group_by=group_by,
+        total=sum(count for _, count in rows),
+        buckets=[ExtractionStatsBucket(key=key, count=count) for key, count in rows],
+    )
+
+
+@router.get("/extractions/export.csv")
+async def export_extractions(
+    q: Optional[str] = None,
+    site: Optional[str] = None,
+    kind: Optional[str] = None,
+    cause: Optional[str] = None,
+    incident_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_id: Optional[str] = None,
+):
+    """
+    CSV of every item matching the filters, generated from the index on demand.
+    """
+    filters = _filters(q, site, kind, cause, incident_type, severity, start, end, batch_id)
+    rows = get_extraction_store().iter_rows(filters, limit=settings.scribe_export_max_rows)
+    return StreamingResponse(
+        _csv_lines(rows, EXPORT_COLUMNS),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="extractions.csv"'},
+    )
+
+
+@router.get("/extractions/{extraction_id}", response_model=ScribeOut)
+async def get_extraction(extraction_id: int):
+    payload = await run_in_threadpool(get_extraction_store().get, extraction_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Extraction not found")
+    return ScribeOut.model_validate_json(payload)
+
+
+@router.get("/extractions/{extraction_id}/export.csv")
+async def export_extraction(extraction_id: int):
+    """
+    Compact field/value CSV snapshot of one extraction.
+    """
+    payload = await run_in_threadpool(get_extraction_store().get, extraction_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Extraction not found")
+    out = ScribeOut.model_validate_json(payload)
+    rows = [
+        ["date", out.date or ""],
+        ["personnel_count", out.personnel_count or ""],
+        ["subcontractors", "; ".join(out.subcontractors)],
+        ["completed_tasks", " | ".join(out.completed_tasks)],
+        ["issues", " | ".join([i.summary for i in out.issues])],
+        ["safety_observations", " | ".join(out.safety_observations)],
+    ]
+    return StreamingResponse(
+        _csv_lines(rows, ["field", "value"]),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="extraction-{extraction_id}.csv"'},
+    )
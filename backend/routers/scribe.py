@@ -1,56 +1,56 @@
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
 from uuid import uuid4
+import asyncio
 import datetime as dt
-import csv
-import io
+import hashlib
+import json
 import re
-
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
-
+import threading
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from core.bulk import (
+    BulkDocument,
+    BulkError,
+    iter_file,
+    iter_ndjson,
+    iter_uploads,
+    iter_zip,
+    run_bounded,
+    spool_body,
+)
 from core.config import settings
+from core.modules import import_from_modules
+from core.pdf_text import extract_pdf_text
 from core.schemas import Issue, ScribeOut
+from core.scribe_cache import get_cache, sha256_hex
+from core.scribe_store import get_extraction_store
+from core.uploads import UploadTooLarge, check_content_length, parse_form, read_text, read_upload_form
 
 router = APIRouter()
 
-
-# === Helpers ===
-def _extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
-    """
-    Try PyPDF2 first (fast), fall back to pdfminer.six if needed.
-    """
-    # PyPDF2
-    try:
-        import PyPDF2  # type: ignore
-
-        text_parts: List[str] = []
-        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-        for page in reader.pages:
-            text_parts.append(page.extract_text() or "")
-        text = "\n".join(text_parts)
-        if text.strip():
-            return text
-    except Exception:
-        pass
-
-    # pdfminer.six fallback
-    try:
-        from pdfminer.high_level import extract_text  # type: ignore
-
-        with io.BytesIO(pdf_bytes) as f:
-            text = extract_text(f)
-            if text and text.strip():
-                return text
-    except Exception:
-        pass
-
-    return ""
+_lexicon = import_from_modules(settings.scribe_module_dir, "lexicon")
 
 
+# === Helpers ===
 DATE_RX = re.compile(
     r"\b(20\d{2}[-/](0?[1-9]|1[0-2])[-/](0?[1-9]|[12]\d|3[01])|"
     r"(0?[1-9]|[12]\d|3[01])[-/](0?[1-9]|1[0-2])[-/](20\d{2}))\b"
 )
 INT_RX = re.compile(r"\b(\d{1,5})\b", re.MULTILINE)
+PARAGRAPH_RX = re.compile(r"\n\s*\n")
+
+# Paragraph categories, matched in one pass per paragraph
+PARAGRAPH_MATCHER = _lexicon.KeywordMatcher({
+    "completed": ["completed", "finished", "achieved", "done"],
+    "issue": ["delay", "blocked", "issue", "problem", "shortage"],
+    "delay": ["delay"],
+    "safety": ["safety", "ppe", "incident", "hazard", "near miss", "near-miss"],
+})
 
 
 def _basic_extract(text: str) -> ScribeOut:
@@ -111,13 +111,13 @@ def _basic_extract(text: str) -> ScribeOut:
     issues: List[Issue] = []
     safety: List[str] = []
 
-    for para in re.split(r"\n\s*\n", text):
-        pl = para.lower()
-        if any(k in pl for k in ["completed", "finished", "achieved", "done"]):
+    for para in PARAGRAPH_RX.split(text):
+        hits = PARAGRAPH_MATCHER.scan(para.lower())
+        if "completed" in hits:
             completed_tasks.append(para.strip())
-        if any(k in pl for k in ["delay", "blocked", "issue", "problem", "shortage"]):
-            issues.append(Issue(type="delay" if "delay" in pl else "issue", summary=para.strip()))
-        if any(k in pl for k in ["safety", "ppe", "incident", "hazard", "near miss", "near-miss"]):
+        if "issue" in hits:
+            issues.append(Issue(type="delay" if "delay" in hits else "issue", summary=para.strip()))
+        if "safety" in hits:
             safety.append(para.strip())
 
     fields_conf["completed_tasks"] = 0.6 if completed_tasks else 0.2
@@ -140,86 +140,453 @@ def _basic_extract(text: str) -> ScribeOut:
     )
 
 
-def _write_csv(out: ScribeOut) -> str:
+# === Tiered extraction ===
+# Tier 1 is _basic_extract. Documents it is unsure about, or long ones, are
+# escalated to tier 2: DailyLogExtractor (spaCy) in a pre-warmed process pool.
+_nlp_pool = None
+_nlp_lock = threading.Lock()
+
+
+def start_nlp_pool() -> None:
+    """
+    Start the spaCy worker pool. Workers load the model in the background,
+    so app start-up is not blocked. No-op when disabled.
+    """
+    global _nlp_pool
+    if settings.scribe_nlp_workers <= 0:
+        return
+    with _nlp_lock:
+        if _nlp_pool is not None:
+            return
+        try:
+            pool_mod = import_from_modules(settings.scribe_module_dir, "pool")
+            _nlp_pool = pool_mod.ExtractorPool(
+                workers=settings.scribe_nlp_workers,
+                model_name=settings.scribe_nlp_model,
+                fast=settings.scribe_nlp_fast,
+                max_pending=settings.scribe_nlp_queue,
+                task_timeout=settings.scribe_nlp_timeout,
+            )
+        except Exception:
+            _nlp_pool = None
+
+
+def stop_nlp_pool() -> None:
+    global _nlp_pool
+    with _nlp_lock:
+        if _nlp_pool is not None:
+            _nlp_pool.shutdown(wait=False)
+        _nlp_pool = None
+
+
+def _nlp_ready() -> bool:
+    """Whether a tier-2 worker has its model loaded right now (re-checked per request)."""
+    pool = _nlp_pool
+    return pool is not None and pool.health()["ready"] > 0
+
+
+# Fields whose tier-1 guess decides escalation. A log without a contractor
+# line or safety notes is common and not worth a spaCy pass on its own.
+ESCALATION_FIELDS = ("date", "completed_tasks", "issues")
+
+
+def _needs_escalation(out: ScribeOut, text: str) -> bool:
+    if len(text) > settings.scribe_escalate_chars:
+        return True
+    return any(out.confidence.get(f, 0.0) <= 0.25 for f in ESCALATION_FIELDS)
+
+
+def _merge_nlp(out: ScribeOut, rich) -> ScribeOut:
+    """
+    Fold a DailyLogExtraction (tier 2) into the tier-1 ScribeOut. NLP results
+    replace the keyword-paragraph guesses where they found something; fields
+    only tier 1 knows about (personnel count) are kept.
+    """
+    conf = dict(out.confidence)
+    merged = out.model_copy(deep=True)
+
+    if rich.log_date and (merged.date is None or conf.get("date", 0.0) <= 0.25):
+        merged.date = rich.log_date.isoformat()
+        conf["date"] = 0.8
+    if rich.site_name:
+        merged.project = rich.site_name
+        conf["project"] = 0.7
+    locations = [t.location for t in rich.completed_tasks if t.location]
+    if locations:
+        merged.location = locations[0]
+        conf["location"] = 0.6
+
+    crews = list(dict.fromkeys(t.crew for t in rich.completed_tasks if t.crew))
+    if crews:
+        merged.subcontractors = list(dict.fromkeys(merged.subcontractors + crews))[:5]
+        conf["subcontractors"] = max(conf.get("subcontractors", 0.0), 0.7)
+    if rich.completed_tasks:
+        merged.completed_tasks = [t.task_name for t in rich.completed_tasks][:5]
+        conf["completed_tasks"] = 0.8
+    if rich.blockers:
+        # Issue.type is limited to the locked contract; the blocker cause is
+        # re-derived from the summary when the extraction is indexed.
+        merged.issues = [
+            Issue(type="delay" if (b.cause or "").endswith("delay") or "delay" in b.issue.lower() else "issue",
+                  summary=b.issue)
+            for b in rich.blockers
+        ][:5]
+        conf["issues"] = 0.8
+    if rich.incidents:
+        merged.safety_observations = [i.description for i in rich.incidents][:5]
+        conf["safety_observations"] = 0.8
+
+    merged.confidence = conf
+    merged.low_confidence = any(v <= 0.25 for v in conf.values())
+    return merged
+
+
+async def _run_tiers(text: str) -> Tuple[ScribeOut, bool]:
+    """
+    Rule-based extraction, escalated to the spaCy pool when needed. If the
+    document needed tier 2 but no worker is ready (still loading, restarting
+    or failed) or the pool fails, the tier-1 result is returned and the flag
+    is False: such partial results must not be cached. With tier 2 disabled
+    (SCRIBE_NLP_WORKERS=0), tier 1 is final.
+    """
+    out = await run_in_threadpool(_basic_extract, text)
+    if not _needs_escalation(out, text) or settings.scribe_nlp_workers <= 0:
+        return out, True
+    if not _nlp_ready():
+        return out, False
+    try:
+        rich = await asyncio.wait_for(
+            asyncio.wrap_future(_nlp_pool.submit(text)), timeout=settings.scribe_nlp_timeout
+        )
+    except Exception:
+        return out, False
+    return _merge_nlp(out, rich), True
+
+
+# === Content-hash cache ===
+def _extractor_version() -> str:
     """
-    Save a compact CSV snapshot and return a relative URL to download it.
+    Fingerprint of everything that shapes an extraction result: the rule and
+    NLP extractor sources, the output schema and the tier-2 settings.
     """
-    name = f"{uuid4().hex}.csv"
-    path = (settings.exports_dir / name).resolve()
-    path.parent.mkdir(parents=True, exist_ok=True)
+    module_dir = (settings.base_dir / settings.scribe_module_dir).resolve()
+    sources = [
+        Path(__file__),
+        settings.base_dir / "core" / "schemas.py",
+        module_dir / "lexicon.py",
+        module_dir / "extractor.py",
+        module_dir / "schema.py",
+    ]
+    h = hashlib.sha256()
+    for path in sources:
+        if path.is_file():
+            h.update(path.read_bytes())
+    h.update(
+        f"{settings.scribe_nlp_workers > 0}|{settings.scribe_nlp_model}|"
+        f"{settings.scribe_nlp_fast}|{settings.scribe_escalate_chars}".encode("utf-8")
+    )
+    return h.hexdigest()[:16]
+
+
+EXTRACTOR_VERSION = _extractor_version()
 
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["field", "value"])
-        w.writerow(["date", out.date or ""])
-        w.writerow(["personnel_count", out.personnel_count or ""])
-        w.writerow(["subcontractors", "; ".join(out.subcontractors)])
-        w.writerow(["completed_tasks", " | ".join(out.completed_tasks)])
-        w.writerow(["issues", " | ".join([i.summary for i in out.issues])])
-        w.writerow(["safety_observations", " | ".join(out.safety_observations)])
 
-    rel = f"/exports/scribe/{name}"
-    return rel
+async def _extract_tiered(text: str) -> ScribeOut:
+    """Tiered extraction, served from the cache for texts seen before."""
+    cache = get_cache(EXTRACTOR_VERSION)
+    digest = sha256_hex(text)
+    cached = await run_in_threadpool(cache.get_result, digest)
+    if cached is not None:
+        return ScribeOut.model_validate_json(cached)
+
+    out, complete = await _run_tiers(text)
+    if complete:
+        await run_in_threadpool(cache.put_result, digest, out.model_dump_json(exclude={"export_csv_url"}))
+    return out
+
+
+async def _pdf_to_text(digest: str, source) -> str:
+    """
+    PDF text extraction, served from the cache for files seen before.
+    source is the PDF as bytes or a file path; digest is its SHA-256.
+    """
+    cache = get_cache(EXTRACTOR_VERSION)
+    text = await run_in_threadpool(cache.get_text, digest)
+    if text is None:
+        text = await extract_pdf_text(source)
+        if text:
+            await run_in_threadpool(cache.put_text, digest, text)
+    return text
 
 
-@router.post("/extract", response_model=ScribeOut)
-async def extract(
-    request: Request,
-    file: Optional[UploadFile] = File(None),
-    text_form: Optional[str] = Form(None),
-):
+# === Extraction store ===
+def _index_items(out: ScribeOut) -> List[tuple]:
+    """
+    Items to index for one extraction, as (kind, cause, incident_type,
+    severity, text). Causes, incident types and severities come from the
+    lexicon, so tier-1 and tier-2 results are classified the same way.
+    """
+    items = [("task", None, None, None, task) for task in out.completed_tasks]
+    for issue in out.issues:
+        cause = _lexicon.cause_from_hits(_lexicon.SENTENCE_MATCHER.scan(issue.summary.lower()))
+        items.append(("issue", cause, None, None, issue.summary))
+    for observation in out.safety_observations:
+        hits = _lexicon.SENTENCE_MATCHER.scan(observation.lower())
+        items.append((
+            "safety", None,
+            _lexicon.incident_type_from_hits(hits) or "safety",
+            _lexicon.severity_from_hits(hits),
+            observation,
+        ))
+    return items
+
+
+async def _store_extraction(out: ScribeOut, digest: str, batch_id: Optional[str] = None) -> str:
+    """
+    Index the extraction (replacing earlier runs on the same document) and
+    return the URL of its on-demand CSV export.
+    """
+    extraction_id = await run_in_threadpool(
+        get_extraction_store().record,
+        digest,
+        out.model_dump_json(exclude={"export_csv_url"}),
+        out.date,
+        out.project,
+        out.location,
+        out.personnel_count,
+        out.low_confidence,
+        _index_items(out),
+        batch_id,
+    )
+    return f"/extractions/{extraction_id}/export.csv"
+
+
+def _form_text(fields: Dict[str, str]) -> Optional[str]:
+    """Case 3: form field 'text' ('text_form' is the older name)."""
+    for key in ("text", "text_form"):
+        value = fields.get(key)
+        if value and value.strip():
+            return value
+    return None
+
+
+# /extract reads the raw request itself, so its accepted bodies are declared for the OpenAPI schema here
+_TEXT_FORM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "text": {"type": "string", "description": "Raw daily log text"},
+        "text_form": {"type": "string", "description": "Older name of 'text'"},
+    },
+}
+EXTRACT_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary", "description": "Daily log PDF"},
+                    **_TEXT_FORM_SCHEMA["properties"],
+                },
+            },
+        },
+        "application/x-www-form-urlencoded": {"schema": _TEXT_FORM_SCHEMA},
+        "application/json": {
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "description": "Raw daily log text"},
+                    "content": {"type": "string", "description": "Alias of 'text'"},
+                    "raw_text": {"type": "string", "description": "Alias of 'text'"},
+                },
+            },
+        },
+        "text/plain": {"schema": {"type": "string"}},
+    },
+}
+
+
+@router.post("/extract", response_model=ScribeOut, openapi_extra={"requestBody": EXTRACT_REQUEST_BODY})
+async def extract(request: Request):
     """
     Accepts:
       1) multipart/form-data with 'file' (PDF)
       2) JSON: {"text": "..."}     (application/json)
-      3) multipart/form-data with 'text' field
+      3) multipart/form-data or url-encoded form with 'text' field
       4) text/plain raw body
+
+    Multipart bodies are parsed here as they stream in rather than by
+    FastAPI, so a PDF is hashed and spooled once and the body size is
+    bounded by SCRIBE_MAX_UPLOAD_BYTES.
     """
     extracted_text: Optional[str] = None
+    digest: Optional[str] = None  # identifies the source document in the store
+    ct = (request.headers.get("content-type") or "").lower()
 
     try:
-        # Case 1: PDF file upload
-        if file is not None:
-            content = await file.read()
-            extracted_text = _extract_text_from_pdf_bytes(content)
-        else:
-            # Case 2: multipart form field 'text'
-            if text_form and text_form.strip():
-                extracted_text = text_form
-
-            ct = (request.headers.get("content-type") or "").lower()
-
-            # Case 3: JSON body field 'text' (plus a few aliases)
-            if extracted_text is None and "application/json" in ct:
+        if ct.startswith("multipart/form-data"):
+            upload, fields = await read_upload_form(
+                request, "file", settings.scribe_max_upload_bytes, settings.scribe_max_text_bytes
+            )
+            # Case 1: PDF file upload, spooled to disk past a threshold and parsed from there
+            if upload is not None:
                 try:
-                    payload = await request.json()
-                except Exception:
-                    payload = None
-
-                if isinstance(payload, dict):
-                    for key in ("text", "content", "raw_text"):
-                        value = payload.get(key)
-                        if isinstance(value, str) and value.strip():
-                            extracted_text = value
-                            break
-                elif isinstance(payload, str) and payload.strip():
-                    extracted_text = payload
-
-            # Case 4: raw text/plain
-            if extracted_text is None and ct.startswith("text/plain"):
-                raw = await request.body()
-                candidate = raw.decode("utf-8", errors="ignore")
-                if candidate.strip():
-                    extracted_text = candidate
+                    digest = upload.digest
+                    extracted_text = await _pdf_to_text(upload.digest, upload.source)
+                finally:
+                    upload.close()
+            else:
+                extracted_text = _form_text(fields)
+
+        # Case 3: url-encoded form field 'text'
+        elif ct.startswith("application/x-www-form-urlencoded"):
+            body = await read_text(request.stream(), settings.scribe_max_text_bytes)
+            extracted_text = _form_text(dict(parse_qsl(body)))
+            del body
+
+        # Case 2: JSON body field 'text' (plus a few aliases)
+        elif "application/json" in ct:
+            body = await read_text(request.stream(), settings.scribe_max_text_bytes, errors="strict")
+            try:
+                payload = json.loads(body)
+            except Exception:
+                payload = None
+            del body
+
+            if isinstance(payload, dict):
+                for key in ("text", "content", "raw_text"):
+                    value = payload.get(key)
+                    if isinstance(value, str) and value.strip():
+                        extracted_text = value
+                        break
+            elif isinstance(payload, str) and payload.strip():
+                extracted_text = payload
+
+        # Case 4: raw text/plain
+        elif ct.startswith("text/plain"):
+            candidate = await read_text(request.stream(), settings.scribe_max_text_bytes)
+            if candidate.strip():
+                extracted_text = candidate
 
         if not extracted_text or not extracted_text.strip():
             raise HTTPException(status_code=400, detail="Provide a PDF file or raw text.")
 
-        out = _basic_extract(extracted_text)
-        out.export_csv_url = _write_csv(out)
+        out = await _extract_tiered(extracted_text)
+        out.export_csv_url = await _store_extraction(out, digest or sha256_hex(extracted_text))
         return out
 
     except HTTPException:
         raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Extraction failed: {e}")
+
+
+# === Bulk extraction ===
+async def _extract_document(doc: BulkDocument, batch_id: str) -> ScribeOut:
+    """Text extraction, field extraction and indexing for one bulk document."""
+    if doc.error:
+        raise BulkError(doc.error)
+    digest = sha256_hex(doc.data)
+    if doc.is_pdf:
+        text = await _pdf_to_text(digest, doc.data)
+    elif isinstance(doc.data, bytes):
+        text = doc.data.decode("utf-8", errors="ignore")
+    else:
+        text = doc.data
+    if not text or not text.strip():
+        raise BulkError("No text could be extracted")
+    out = await _extract_tiered(text)
+    out.export_csv_url = await _store_extraction(out, digest, batch_id)
+    return out
+
+
+@router.post("/extract/bulk")
+async def extract_bulk(request: Request):
+    """
+    Accepts:
+      1) multipart/form-data with any number of files (PDF, TXT, or ZIP archives of them)
+      2) application/zip raw body
+      3) application/x-ndjson body, one {"text": "...", "name": "..."} object per line
+
+    Streams NDJSON: one {"index", "name", "result" | "error"} line per document
+    in completion order, then a final {"summary": {...}} line with the URL of a
+    consolidated CSV export of every extracted item in the batch.
+    """
+    ct = (request.headers.get("content-type") or "").lower()
+    cleanup = []
+
+    try:
+        if ct.startswith("multipart/form-data"):
+            form = await parse_form(
+                request, settings.scribe_bulk_max_upload_bytes, settings.scribe_bulk_max_documents
+            )
+            cleanup.append(form.close)
+            files = [v for _, v in form.multi_items() if not isinstance(v, str)]
+            if not files:
+                raise HTTPException(status_code=400, detail="Upload one or more files.")
+            docs = iter_uploads(files)
+        elif "zip" in ct:
+            check_content_length(request, settings.scribe_bulk_max_upload_bytes)
+            body = await spool_body(request.stream(), settings.scribe_bulk_max_upload_bytes)
+            cleanup.append(lambda: run_in_threadpool(body.close))
+            docs = iter_zip(body)
+        elif "ndjson" in ct or "jsonl" in ct:
+            # Read in full before responding: once the StreamingResponse starts,
+            # Starlette's disconnect listener consumes the remaining body messages.
+            check_content_length(request, settings.scribe_bulk_max_upload_bytes)
+            body = await spool_body(request.stream(), settings.scribe_bulk_max_upload_bytes)
+            cleanup.append(lambda: run_in_threadpool(body.close))
+            docs = iter_ndjson(iter_file(body))
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Send multipart files, an application/zip body or an application/x-ndjson body.",
+            )
+    except BulkError as e:
+        for close in cleanup:
+            await close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadTooLarge as e:
+        for close in cleanup:
+            await close()
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        for close in cleanup:
+            await close()
+        raise
+
+    batch_id = uuid4().hex
+
+    async def worker(doc: BulkDocument) -> ScribeOut:
+        return await _extract_document(doc, batch_id)
+
+    async def stream():
+        documents = failed = 0
+        aborted: Optional[str] = None
+        try:
+            try:
+                async for doc, out, err in run_bounded(docs, worker, settings.scribe_bulk_concurrency):
+                    documents += 1
+                    record = {"index": doc.index, "name": doc.name}
+                    if err is None:
+                        record["result"] = out.model_dump()
+                    else:
+                        failed += 1
+                        record["error"] = str(err) or err.__class__.__name__
+                    yield json.dumps(record) + "\n"
+            except BulkError as e:
+                # Upload-level problem found mid-stream (e.g. too many documents)
+                aborted = str(e)
+
+            export_url = f"/extractions/export.csv?batch_id={batch_id}"
+            summary = {"documents": documents, "failed": failed, "export_csv_url": export_url}
+            if aborted:
+                summary["error"] = aborted
+            yield json.dumps({"summary": summary}) + "\n"
+        finally:
+            for close in cleanup:
+                await close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
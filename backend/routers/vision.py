@@ -1,24 +1,52 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 from pathlib import Path
+import asyncio
 import io
 
 import numpy as np
 
 from core.config import settings
+from core.frames import FrameError, frame_array, is_raw_frame, max_frame_bytes, parse_frame_header
+from core.modules import import_from_modules
+from core.overlays import resolve_variant, schedule_variants
 from core.schemas import VisionOut, VisionDetection
+from core.timeseries import get_store
+
+# Adjust these label strings if your model uses different naming
+HARDHAT_LABELS = {"hardhat", "helmet", "helmet-on", "helmet_on"}
+NO_HARDHAT_LABELS = {"no-hardhat", "no_helmet", "no-helmet"}
 
 # Try to import ultralytics lazily
 _yolo = None
 _ultra_ok = None
 
+# One model instance serves every request and stream; Ultralytics predictors
+# are not safe to call concurrently, so calls are serialized on this lock.
+# It is awaited on the event loop, so callers queue without holding a
+# threadpool thread, and only the holder runs the model in the threadpool.
+_infer_lock = asyncio.Lock()
+
+
+async def _run_model(fn, *args):
+    """Run a blocking model call (_predict_array/_predict_path) once the model is free."""
+    async with _infer_lock:
+        return await run_in_threadpool(fn, *args)
+
 
 def _lazy_yolo():
     global _yolo, _ultra_ok
     if _ultra_ok is not None:
         return
+    if settings.vision_stub:
+        from core.vision_stub import StubYOLO
+
+        _yolo = StubYOLO(latency_ms=settings.vision_stub_latency_ms)
+        _ultra_ok = True
+        return
     try:
         from ultralytics import YOLO  # type: ignore
         weights_path = (settings.base_dir / settings.vision_weights).resolve()
@@ -30,12 +58,24 @@ def _lazy_yolo():
         raise RuntimeError(f"Failed to load YOLO weights: {e}")
 
 
+_rois: Optional[Dict[str, object]] = None  # camera_id -> CameraROI (modules/vision/roi.py)
+
+
+def _lazy_rois() -> Dict[str, object]:
+    global _rois
+    if _rois is None:
+        roi = import_from_modules(settings.vision_module_dir, "roi")
+        _rois = roi.load_roi_config((settings.base_dir / settings.vision_roi_config).resolve())
+    return _rois
+
+
 router = APIRouter()
 
 
 def _save_overlay_image(result, out_path: Path):
     """
     Uses Ultralytics built-in plotting to produce an annotated image.
+    Returns the saved PIL image so variants can be derived without re-decoding.
     """
     try:
         plotted = result.plot()  # returns a numpy array (H, W, 3) BGR
@@ -44,12 +84,127 @@ def _save_overlay_image(result, out_path: Path):
         img = Image.fromarray(plotted[..., ::-1])  # BGR->RGB
         out_path.parent.mkdir(parents=True, exist_ok=True)
         img.save(out_path, format="JPEG", quality=90)
+        return img
     except Exception as e:
         raise RuntimeError(f"Failed to save overlay: {e}")
 
 
+def _decode_image(content: bytes) -> Optional[np.ndarray]:
+    """
+    Decode an encoded image with Pillow into the BGR (or grayscale) array
+    Ultralytics expects; None if Pillow cannot read it.
+    """
+    try:
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(content))
+        # Some formats may be RGBA/LA; convert to RGB
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        arr = np.asarray(img)
+        if arr.ndim == 3:
+            # Ultralytics reads colour arrays as BGR, like cv2.imread
+            arr = arr[..., ::-1]
+        return np.ascontiguousarray(arr)
+    except Exception:
+        return None
+
+
+def _predict_array(img_np: np.ndarray, camera_id: Optional[str] = None):
+    """
+    Run YOLO on a decoded image, cropping to the camera's ROI when one is configured.
+    Blocking; call through _run_model from async code.
+    """
+    roi = _lazy_rois().get(camera_id) if camera_id else None
+    if roi is None:
+        return _yolo.predict(source=img_np, conf=0.2, iou=0.45, verbose=False)
+
+    # Crop to the camera's ROI before letterboxing, then map back
+    crop, offset = roi.crop(img_np)
+    results = _yolo.predict(source=crop, conf=0.2, iou=0.45, verbose=False)
+    if settings.vision_stub:
+        # Stub results are not Ultralytics Results, and the stub must not need torch
+        return [_yolo.remap_result(roi, r, offset, img_np) for r in results]
+    return [roi.remap_result(r, offset, img_np) for r in results]
+
+
+def _predict_path(path: Path):
+    return _yolo.predict(source=str(path), conf=0.25, iou=0.45, verbose=False)
+
+
+def _vision_out(result, save_overlay: bool = True) -> VisionOut:
+    """
+    Count PPE classes, save the overlay and build the response for one result.
+    """
+    names = result.names  # class index -> name
+    det_list: List[VisionDetection] = []
+
+    persons = 0
+    hardhat = 0
+    no_hardhat = 0
+
+    if result.boxes is not None and len(result.boxes) > 0:
+        xyxy = result.boxes.xyxy.cpu().numpy()
+        confs = result.boxes.conf.cpu().numpy()
+        clss = result.boxes.cls.cpu().numpy().astype(int)
+
+        for i in range(len(clss)):
+            cls_name = names.get(int(clss[i]), str(clss[i]))
+            x1, y1, x2, y2 = xyxy[i]
+            det_list.append(
+                VisionDetection(
+                    cls=cls_name,
+                    bbox=(float(x1), float(y1), float(x2 - x1), float(y2 - y1)),
+                    conf=float(confs[i]),
+                )
+            )
+            if cls_name.lower() == "person":
+                persons += 1
+            elif cls_name.lower() in HARDHAT_LABELS:
+                hardhat += 1
+            elif cls_name.lower() in NO_HARDHAT_LABELS:
+                no_hardhat += 1
+
+    denom = max(1, hardhat + no_hardhat)
+    compliance_rate = float(hardhat / denom)
+
+    # Save overlay image
+    overlay_rel = None
+    variants: Dict[str, str] = {}
+    if save_overlay:
+        overlay_name = f"{uuid4().hex}.jpg"
+        overlay_path = (settings.overlays_dir / overlay_name).resolve()
+        overlay_img = _save_overlay_image(result, overlay_path)
+        overlay_rel = f"/static/overlays/{overlay_name}"
+        variants = schedule_variants(overlay_img, overlay_name)
+
+    return VisionOut(
+        detections=det_list,
+        persons=persons,
+        helmeted_persons=hardhat,
+        compliance_rate=round(compliance_rate, 4),
+        overlay_url=overlay_rel,
+        overlay_variants=variants,
+    )
+
+
+def _record_compliance(out: VisionOut, site_id: Optional[str], camera_id: Optional[str]) -> None:
+    """
+    Fold the result into the compliance time series. Only frames that name a
+    camera are recorded, so ad-hoc uploads do not pollute site trends.
+    """
+    if not camera_id:
+        return
+    no_helmet = sum(1 for d in out.detections if d.cls.lower() in NO_HARDHAT_LABELS)
+    get_store().record(site_id or "default", camera_id, out.persons, out.helmeted_persons, no_helmet)
+
+
 @router.post("/analyze-image", response_model=VisionOut)
-async def analyze_image(file: UploadFile = File(...)):
+async def analyze_image(
+    file: UploadFile = File(...),
+    camera_id: Optional[str] = Form(None),
+    site_id: Optional[str] = Form(None),
+):
     _lazy_yolo()
 
     if not _ultra_ok or _yolo is None:
@@ -68,23 +223,12 @@ async def analyze_image(file: UploadFile = File(...)):
         content = await file.read()
 
         # 2) Try Pillow → NumPy array first
-        img_np = None
-        try:
-            from PIL import Image
-            import numpy as np
-
-            img = Image.open(io.BytesIO(content))
-            # Some formats may be RGBA/LA; convert to RGB
-            if img.mode not in ("RGB", "L"):
-                img = img.convert("RGB")
-            img_np = np.array(img)
-        except Exception as e:
-            img_np = None  # will try fallback
-            # (do not raise yet, we’ll try a path-based fallback)
+        # (if it fails, do not raise yet, we’ll try a path-based fallback)
+        img_np = _decode_image(content)
 
         # 3) Run YOLO either on NumPy array or a temp file with extension
         if img_np is not None:
-            results = _yolo.predict(source=img_np, conf=0.2, iou=0.45, verbose=False)
+            results = await _run_model(_predict_array, img_np, camera_id)
         else:
             # Fallback: write a temp file with the right extension (or .jpg)
             suffix = ".jpg"
@@ -96,7 +240,7 @@ async def analyze_image(file: UploadFile = File(...)):
             with open(tmp_path, "wb") as f:
                 f.write(content)
             try:
-                results = _yolo.predict(source=str(tmp_path), conf=0.25, iou=0.45, verbose=False)
+                results = await _run_model(_predict_path, tmp_path)
             finally:
                 # Best effort cleanup
                 try:
@@ -107,53 +251,9 @@ async def analyze_image(file: UploadFile = File(...)):
         if not results:
             raise HTTPException(status_code=400, detail="No results returned by model")
 
-        result = results[0]
-        names = result.names  # class index -> name
-        det_list: List[VisionDetection] = []
-
-        persons = 0
-        hardhat = 0
-        no_hardhat = 0
-
-        if result.boxes is not None and len(result.boxes) > 0:
-            xyxy = result.boxes.xyxy.cpu().numpy()
-            confs = result.boxes.conf.cpu().numpy()
-            clss = result.boxes.cls.cpu().numpy().astype(int)
-
-            for i in range(len(clss)):
-                cls_name = names.get(int(clss[i]), str(clss[i]))
-                x1, y1, x2, y2 = xyxy[i]
-                det_list.append(
-                    VisionDetection(
-                        cls=cls_name,
-                        bbox=(float(x1), float(y1), float(x2 - x1), float(y2 - y1)),
-                        conf=float(confs[i]),
-                    )
-                )
-                # Adjust these label strings if your model uses different naming
-                if cls_name.lower() == "person":
-                    persons += 1
-                elif cls_name.lower() in {"hardhat", "helmet", "helmet-on", "helmet_on"}:
-                    hardhat += 1
-                elif cls_name.lower() in {"no-hardhat", "no_helmet", "no-helmet"}:
-                    no_hardhat += 1
-
-        denom = max(1, hardhat + no_hardhat)
-        compliance_rate = float(hardhat / denom)
-
-        # Save overlay image
-        overlay_name = f"{uuid4().hex}.jpg"
-        overlay_path = (settings.overlays_dir / overlay_name).resolve()
-        _save_overlay_image(result, overlay_path)
-        overlay_rel = f"/static/overlays/{overlay_name}"
-
-        return VisionOut(
-            detections=det_list,
-            persons=persons,
-            helmeted_persons=hardhat,
-            compliance_rate=round(compliance_rate, 4),
-            overlay_url=overlay_rel,
-        )
+        out = await run_in_threadpool(_vision_out, results[0])
+        await run_in_threadpool(_record_compliance, out, site_id, camera_id)
+        return out
 
     except HTTPException:
         raise
@@ -163,3 +263,223 @@ async def analyze_image(file: UploadFile = File(...)):
             status_code=400,
             detail=f"Vision inference failed: {e}"
         )
+
+
+async def _read_body_limited(request: Request, limit: int) -> bytearray:
+    """
+    Read the request body into one buffer, rejecting it as soon as it exceeds limit.
+    With a Content-Length the buffer is allocated once and filled in place.
+    """
+    length = request.headers.get("content-length")
+    if length is not None:
+        try:
+            length = int(length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if length > limit:
+            raise HTTPException(status_code=413, detail=f"Frame exceeds {limit} bytes")
+
+        buf = bytearray(length)
+        view = memoryview(buf)
+        pos = 0
+        async for chunk in request.stream():
+            if pos + len(chunk) > length:
+                raise HTTPException(status_code=400, detail="Body longer than Content-Length")
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        view.release()
+        if pos != length:
+            raise HTTPException(status_code=400, detail="Body shorter than Content-Length")
+        return buf
+
+    buf = bytearray()
+    async for chunk in request.stream():
+        buf += chunk
+        if len(buf) > limit:
+            raise HTTPException(status_code=413, detail=f"Frame exceeds {limit} bytes")
+    return buf
+
+
+@router.get("/overlays/{file_name}")
+async def overlay_variant(file_name: str):
+    """
+    A WebP overlay variant (see VisionOut.overlay_variants). Variants the
+    background encoder has not written yet are encoded on demand.
+    """
+    path = await run_in_threadpool(resolve_variant, file_name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Overlay variant not found")
+    # The name is unique per overlay, so the content never changes
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+
+@router.post("/analyze-frame", response_model=VisionOut)
+async def analyze_frame(request: Request, site_id: Optional[str] = None):
+    """
+    Accepts a raw pixel buffer behind the RPF1 header (see core/frames.py) as
+    application/octet-stream. The pixels are wrapped in place and fed straight
+    to the model, skipping the JPEG encode/decode round trip.
+    """
+    _lazy_yolo()
+
+    if not _ultra_ok or _yolo is None:
+        raise HTTPException(status_code=500, detail="Vision model not available")
+
+    body = await _read_body_limited(request, max_frame_bytes(settings.vision_max_frame_side))
+
+    try:
+        header = parse_frame_header(body, settings.vision_max_frame_side)
+        img_np = frame_array(body, header)
+    except FrameError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid frame: {e}")
+
+    try:
+        results = await _run_model(_predict_array, img_np, header.camera_id)
+        if not results:
+            raise HTTPException(status_code=400, detail="No results returned by model")
+        out = await run_in_threadpool(_vision_out, results[0])
+        await run_in_threadpool(_record_compliance, out, site_id, header.camera_id)
+        return out
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Vision inference failed: {e}")
+
+
+class _LatestFrame:
+    """
+    One-slot mailbox: a new frame replaces one that has not been picked up yet,
+    so a slow consumer always sees the freshest frame and memory stays flat.
+    """
+
+    def __init__(self):
+        self._frame: Optional[bytes] = None
+        self._event = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self.received += 1
+        self._event.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._event.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next frame; None once the sender has gone away."""
+        while self._frame is None and not self._closed:
+            self._event.clear()
+            await self._event.wait()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+async def _send_json(websocket: WebSocket, send_lock: asyncio.Lock, payload: dict) -> None:
+    """Send one JSON message; the receiver and the inference loop share the socket."""
+    async with send_lock:
+        await websocket.send_json(payload)
+
+
+async def _receive_frames(websocket: WebSocket, mailbox: _LatestFrame, send_lock: asyncio.Lock) -> None:
+    limit = max_frame_bytes(settings.vision_max_frame_side)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                continue  # text messages are ignored
+            if len(data) > limit:
+                await _send_json(websocket, send_lock, {"error": f"Frame exceeds {limit} bytes"})
+                continue
+            mailbox.put(data)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        mailbox.close()
+
+
+def _decode_message(data: bytes, camera_id: Optional[str]) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Decode one stream message (RPF1 raw frame or encoded image) into the
+    model's input and the camera it came from.
+    """
+    if is_raw_frame(data):
+        header = parse_frame_header(data, settings.vision_max_frame_side)
+        return frame_array(data, header), header.camera_id or camera_id
+    img_np = _decode_image(data)
+    if img_np is None:
+        raise FrameError("Message is neither an RPF1 frame nor a decodable image")
+    return img_np, camera_id
+
+
+async def _analyze_message(data: bytes, camera_id: Optional[str], site_id: Optional[str]) -> VisionOut:
+    """
+    Decode one stream message and run inference on it.
+    Overlays are not written for stream frames.
+    """
+    img_np, camera_id = await run_in_threadpool(_decode_message, data, camera_id)
+    results = await _run_model(_predict_array, img_np, camera_id)
+    if not results:
+        raise FrameError("No results returned by model")
+    out = await run_in_threadpool(_vision_out, results[0], False)
+    await run_in_threadpool(_record_compliance, out, site_id, camera_id)
+    return out
+
+
+@router.websocket("/ws/analyze")
+async def analyze_stream(
+    websocket: WebSocket,
+    camera_id: Optional[str] = None,
+    site_id: Optional[str] = None,
+):
+    """
+    Live-stream vision. The client sends binary messages, each an RPF1 raw
+    frame (see core/frames.py) or an encoded image; the server answers each
+    processed frame with a JSON VisionOut plus frame counters. Frames that
+    arrive while inference is busy replace the pending one instead of queueing.
+    """
+    await websocket.accept()
+    try:
+        _lazy_yolo()
+    except RuntimeError as e:
+        await websocket.close(code=1011, reason=str(e)[:120])
+        return
+    if not _ultra_ok or _yolo is None:
+        await websocket.close(code=1011, reason="Vision model not available")
+        return
+
+    mailbox = _LatestFrame()
+    send_lock = asyncio.Lock()
+    receiver = asyncio.create_task(_receive_frames(websocket, mailbox, send_lock))
+    processed = 0
+    try:
+        while True:
+            data = await mailbox.get()
+            if data is None:
+                break
+            try:
+                out = await _analyze_message(data, camera_id, site_id)
+            except FrameError as e:
+                await _send_json(websocket, send_lock, {"error": str(e)})
+                continue
+            except Exception as e:
+                await _send_json(websocket, send_lock, {"error": f"Vision inference failed: {e}"})
+                continue
+
+            processed += 1
+            payload = out.model_dump()
+            payload.update(
+                {"processed": processed, "received": mailbox.received, "dropped": mailbox.dropped}
+            )
+            await _send_json(websocket, send_lock, payload)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
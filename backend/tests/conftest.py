@@ -0,0 +1,42 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests import the backend the way uvicorn does, from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Rules-only Scribe and the stub detector: no spaCy or YOLO start-up in tests
+os.environ["SCRIBE_NLP_WORKERS"] = "0"
+os.environ["VISION_STUB"] = "1"
+os.environ["CAPTURE_ENABLED"] = "0"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point every on-disk store at a fresh directory."""
+    import core.scribe_cache as scribe_cache
+    import core.scribe_store as scribe_store
+    import core.timeseries as timeseries
+    from core.config import settings
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "overlays_dir", tmp_path / "overlays")
+    (tmp_path / "overlays").mkdir()
+    monkeypatch.setattr(settings, "compliance_db_path", tmp_path / "compliance.sqlite3")
+    monkeypatch.setattr(settings, "scribe_cache_db_path", tmp_path / "scribe_cache.sqlite3")
+    monkeypatch.setattr(settings, "scribe_store_db_path", tmp_path / "extractions.sqlite3")
+    monkeypatch.setattr(scribe_cache, "_cache", None)
+    monkeypatch.setattr(scribe_store, "_store", None)
+    monkeypatch.setattr(timeseries, "_store", None)
+    return tmp_path
+
+
+@pytest.fixture
+def client(data_dir):
+    from fastapi.testclient import TestClient
+
+    from app import app
+
+    with TestClient(app) as c:
+        yield c
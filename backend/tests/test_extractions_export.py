@@ -0,0 +1,70 @@
+"""
+/extractions/export.csv streamed through the ASGI app. Run from backend/
+with `python -m pytest tests` (needs pytest and httpx).
+"""
+import asyncio
+import csv
+import io
+import json
+
+import httpx
+
+import core.scribe_store as scribe_store
+from app import app
+from core.scribe_store import EXPORT_COLUMNS, ExtractionStore
+
+EXTRACTIONS = 300
+TASKS_PER_EXTRACTION = 10
+
+
+def _fill(store: ExtractionStore) -> None:
+    for n in range(EXTRACTIONS):
+        items = [
+            ("task", None, None, None, f"Blockwork completed at zone {n}-{t}, levels 1 to 3, north elevation")
+            for t in range(TASKS_PER_EXTRACTION)
+        ]
+        store.record(f"digest-{n}", "{}", "2025-11-04", "NE-Cluster", None, None, False, items)
+
+
+async def _export(clients: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get("/extractions/export.csv") for _ in range(clients)))
+
+
+def test_concurrent_multi_chunk_exports(tmp_path, monkeypatch):
+    store = ExtractionStore(tmp_path / "extractions.sqlite3")
+    _fill(store)
+    monkeypatch.setattr(scribe_store, "_store", store)
+
+    responses = asyncio.run(_export(4))
+
+    for response in responses:
+        assert response.status_code == 200
+        # Well past one 64 KB CSV chunk and one 1000-row fetch
+        assert len(response.content) > 3 * 64 * 1024
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == list(EXPORT_COLUMNS)
+        assert len(rows) - 1 == EXTRACTIONS * TASKS_PER_EXTRACTION
+
+
+def test_reupload_keeps_id_and_batches(client):
+    text = "Date: 2025-11-04\nBlockwork completed at Zone B.\n\nDelay due to rebar shortage."
+    first = client.post("/extract", json={"text": text}).json()["export_csv_url"]
+    again = client.post("/extract", json={"text": text}).json()["export_csv_url"]
+    assert first == again
+    assert client.get(first).status_code == 200
+
+    # The same document in two bulk batches belongs to both
+    batch_exports = []
+    for _ in range(2):
+        response = client.post(
+            "/extract/bulk",
+            content=json.dumps({"text": text}) + "\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+        batch_exports.append(summary["export_csv_url"])
+    assert batch_exports[0] != batch_exports[1]
+    for url in batch_exports:
+        assert client.get(url).text.count("Blockwork completed") == 1
@@ -0,0 +1,31 @@
+import io
+
+from PIL import Image
+
+
+def _jpeg(width=1280, height=720) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (90, 120, 150)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_variant_urls_always_resolve(client, data_dir):
+    out = client.post("/analyze-image", files={"file": ("site.jpg", _jpeg(), "image/jpeg")}).json()
+
+    assert set(out["overlay_variants"]) == {"thumb", "medium"}
+    for variant, width in (("thumb", 320), ("medium", 960)):
+        # Served whether or not the background encoder got there first
+        response = client.get(out["overlay_variants"][variant])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert Image.open(io.BytesIO(response.content)).width == width
+
+    # A variant that is missing (e.g. its encode failed) is encoded on demand
+    for path in (data_dir / "overlays").glob("*_thumb.webp"):
+        path.unlink()
+    assert client.get(out["overlay_variants"]["thumb"]).status_code == 200
+
+
+def test_unknown_variant_is_404(client):
+    assert client.get("/overlays/0123abcd_thumb.webp").status_code == 404
+    assert client.get("/overlays/..%2Fapp.py").status_code == 404
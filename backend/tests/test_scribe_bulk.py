@@ -0,0 +1,60 @@
+import io
+import json
+import zipfile
+
+LOG = "Date: 2025-11-04\nBlockwork completed at Zone B.\n\nDelay due to rebar shortage at level 2."
+
+
+def _lines(response):
+    records = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+    return records[:-1], records[-1]["summary"]
+
+
+def _ndjson(count):
+    lines = [json.dumps({"name": f"log-{i}", "text": f"{LOG}\nRef {i}"}) for i in range(count)]
+    lines.insert(1, "{not json")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_ndjson_bulk(client):
+    response = client.post("/extract/bulk", content=_ndjson(5), headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    documents, summary = _lines(response)
+    assert summary["documents"] == 6 and summary["failed"] == 1
+    assert sorted(d["index"] for d in documents) == list(range(6))
+    failed = [d for d in documents if "error" in d]
+    assert [d["index"] for d in failed] == [1]
+    assert all(d["result"]["date"] == "2025-11-04" for d in documents if "result" in d)
+
+
+def test_ndjson_bulk_chunked(client):
+    body = _ndjson(5)
+
+    def chunks():
+        for i in range(0, len(body), 37):
+            yield body[i:i + 37]
+
+    response = client.post("/extract/bulk", content=chunks(), headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    documents, summary = _lines(response)
+    assert summary["documents"] == len(documents) == 6
+
+
+def test_zip_bulk(client):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for i in range(3):
+            archive.writestr(f"logs/day-{i}.txt", f"{LOG}\nDay {i}")
+        archive.writestr("logs/empty.txt", "")
+    response = client.post("/extract/bulk", content=buf.getvalue(), headers={"content-type": "application/zip"})
+
+    assert response.status_code == 200
+    documents, summary = _lines(response)
+    assert summary["documents"] == 4 and summary["failed"] == 1
+    assert {d["name"] for d in documents if "result" in d} == {f"logs/day-{i}.txt" for i in range(3)}
+
+    export = client.get(summary["export_csv_url"])
+    assert export.status_code == 200
+    assert export.text.count("Blockwork completed") == 3
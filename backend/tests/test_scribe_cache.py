@@ -0,0 +1,58 @@
+import routers.scribe as scribe
+from core.scribe_cache import ScribeCache
+
+LOG = "Date: 04/11/2025\nBlockwork completed at Tower B Level 4 by Al-Rashid crew.\nDelay due to rebar shortage."
+
+
+def test_repeat_text_is_served_from_cache(client, monkeypatch):
+    first = client.post("/extract", json={"text": LOG})
+    assert first.status_code == 200
+
+    async def fail(text):
+        raise AssertionError("extraction ran for a cached text")
+
+    monkeypatch.setattr(scribe, "_run_tiers", fail)
+    second = client.post("/extract", json={"text": LOG})
+    assert second.status_code == 200
+    assert second.json()["completed_tasks"] == first.json()["completed_tasks"]
+
+
+def test_repeat_pdf_is_parsed_once(client, monkeypatch):
+    calls = []
+
+    async def fake_pdf_text(source):
+        calls.append(source)
+        return LOG
+
+    monkeypatch.setattr(scribe, "extract_pdf_text", fake_pdf_text)
+    for _ in range(2):
+        response = client.post("/extract", files={"file": ("log.pdf", b"%PDF-1.4 same bytes", "application/pdf")})
+        assert response.status_code == 200
+    assert len(calls) == 1
+
+
+def test_new_extractor_version_misses_and_purges(client, monkeypatch):
+    assert client.post("/extract", json={"text": LOG}).status_code == 200
+
+    runs = []
+    run_tiers = scribe._run_tiers
+
+    async def counting(text):
+        runs.append(text)
+        return await run_tiers(text)
+
+    monkeypatch.setattr(scribe, "_run_tiers", counting)
+    monkeypatch.setattr(scribe, "EXTRACTOR_VERSION", "next-version")
+    assert client.post("/extract", json={"text": LOG}).status_code == 200
+    assert client.post("/extract", json={"text": LOG}).status_code == 200
+    assert len(runs) == 1
+
+
+def test_cache_drops_results_of_other_versions(tmp_path):
+    db_path = tmp_path / "cache.sqlite3"
+    ScribeCache(db_path, "v1").put_result("digest", '{"ok": true}')
+    assert ScribeCache(db_path, "v1").get_result("digest") == '{"ok": true}'
+
+    assert ScribeCache(db_path, "v2").get_result("digest") is None
+    # Opening under v2 purged the v1 row, so going back does not revive it
+    assert ScribeCache(db_path, "v1").get_result("digest") is None
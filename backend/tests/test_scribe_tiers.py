@@ -0,0 +1,61 @@
+import asyncio
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+import routers.scribe as scribe
+from core.config import settings
+from core.scribe_cache import get_cache, sha256_hex
+
+# No date: tier 1 is unsure, so the document is escalated
+UNDATED = "Blockwork completed at Zone B.\n\nDelay due to rebar shortage at level 2."
+
+
+class FakePool:
+    def __init__(self, ready: int):
+        self.ready = ready
+        self.submitted = 0
+
+    def health(self) -> dict:
+        return {"ready": self.ready}
+
+    def submit(self, text: str) -> Future:
+        self.submitted += 1
+        future = Future()
+        future.set_result(SimpleNamespace(
+            log_date=None, site_name="NE-Cluster", completed_tasks=[], incidents=[],
+            blockers=[SimpleNamespace(cause="material_delay", issue="Rebar shortage at level 2")],
+        ))
+        return future
+
+
+@pytest.fixture
+def tier2(data_dir, monkeypatch):
+    monkeypatch.setattr(settings, "scribe_nlp_workers", 1)
+    pool = FakePool(ready=0)
+    monkeypatch.setattr(scribe, "_nlp_pool", pool)
+    return pool
+
+
+def _cached(text):
+    return get_cache(scribe.EXTRACTOR_VERSION).get_result(sha256_hex(text))
+
+
+def test_partial_result_is_not_cached(tier2):
+    out = asyncio.run(scribe._extract_tiered(UNDATED))
+
+    assert out.project is None
+    assert tier2.submitted == 0
+    assert _cached(UNDATED) is None
+
+
+def test_pool_readiness_is_rechecked(tier2):
+    asyncio.run(scribe._extract_tiered(UNDATED))
+    tier2.ready = 1  # e.g. the model finished loading after a slow start
+    out = asyncio.run(scribe._extract_tiered(UNDATED))
+
+    assert tier2.submitted == 1
+    assert out.project == "NE-Cluster"
+    assert [i.type for i in out.issues] == ["delay"]
+    assert _cached(UNDATED) is not None
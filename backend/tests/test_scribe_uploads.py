@@ -0,0 +1,35 @@
+from core.config import settings
+
+
+def _multipart(size: int):
+    yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="log.pdf"\r\n\r\n'
+    for _ in range(size // 1000):
+        yield b"x" * 1000
+    yield b"\r\n--b--\r\n"
+
+
+def test_upload_over_limit_is_413(client, monkeypatch):
+    monkeypatch.setattr(settings, "scribe_max_upload_bytes", 10_000)
+
+    response = client.post("/extract", files={"file": ("log.pdf", b"x" * 20_000, "application/pdf")})
+    assert response.status_code == 413
+
+    # No Content-Length: the limit is enforced while the body streams in
+    response = client.post(
+        "/extract", content=_multipart(20_000), headers={"content-type": "multipart/form-data; boundary=b"}
+    )
+    assert response.status_code == 413
+
+
+def test_text_field_over_limit_is_413(client, monkeypatch):
+    monkeypatch.setattr(settings, "scribe_max_text_bytes", 100)
+
+    response = client.post("/extract", files={"text": (None, "Blockwork completed. " * 20)})
+    assert response.status_code == 413
+
+
+def test_upload_under_limit_is_accepted(client, monkeypatch):
+    monkeypatch.setattr(settings, "scribe_max_upload_bytes", 10_000)
+
+    response = client.post("/extract", files={"text": (None, "Blockwork completed at Tower B Level 4 by Al-Rashid crew.")})
+    assert response.status_code == 200
@@ -0,0 +1,24 @@
+import io
+
+from PIL import Image
+
+
+def test_stub_applies_camera_roi(client, monkeypatch):
+    import routers.vision as vision
+    from core.config import settings
+    from core.modules import import_from_modules
+
+    roi = import_from_modules(settings.vision_module_dir, "roi")
+    monkeypatch.setattr(vision, "_rois", {"cam1": roi.CameraROI.from_config({"rects": [[0, 0, 320, 480]]})})
+
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 40, 40)).save(buf, format="JPEG")
+    response = client.post(
+        "/analyze-image", files={"file": ("cam.jpg", buf.getvalue(), "image/jpeg")}, data={"camera_id": "cam1"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["detections"]
+    for det in response.json()["detections"]:
+        x, y, w, h = det["bbox"]
+        assert x + w / 2 <= 320
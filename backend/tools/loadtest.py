@@ -0,0 +1,486 @@
+# backend/tools/loadtest.py
+"""
+Load-generation harness for the backend API.
+
+Drives /predict-delay, /what-if, /analyze-image and /extract with a weighted
+request mix from N concurrent closed-loop clients, against one of:
+
+  --in-process   the app served through httpx's ASGI transport (lifespan included)
+  --launch       a local uvicorn server started for the run
+  --url URL      an already running server (pass --server-pid to sample its RSS)
+
+Reports throughput, per-endpoint latency percentiles, status codes and error
+rates, the latency of a /health probe running alongside the load (it does no
+work, so its latency shows event-loop blocking), and the RSS of the server
+process tree over time. --stub-vision serves /analyze-image from
+core/vision_stub.py, so no weights are needed.
+
+Run from backend/:
+    python -m tools.loadtest --in-process --stub-vision --duration 30 --concurrency 16
+    python -m tools.loadtest --launch --workers 2 --stub-vision --mix predict-delay=5,extract=1
+    python -m tools.loadtest --url http://localhost:8000 --server-pid 12345 --out load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+ENDPOINTS = ("predict-delay", "what-if", "analyze-image", "extract")
+DEFAULT_MIX = "predict-delay=4,what-if=2,analyze-image=2,extract=2"
+DEFAULT_FEATURES = ["resource", "site_env", "schedule", "cost"]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'predict-delay=4,extract=1' -> {endpoint: weight}"""
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().lstrip("/")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}'. Use: {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    if not mix or not any(mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one endpoint with a positive weight")
+    return mix
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+# === Payloads ===
+class Payloads:
+    """Pre-built request bodies; building them is kept out of the timed path."""
+
+    def __init__(self, seed: int, image_sizes: List[Tuple[int, int]], extract_size: str,
+                 pdf_ratio: float, unique_extract: bool):
+        from core.config import settings
+
+        rng = random.Random(seed)
+        self.pdf_ratio = pdf_ratio
+        self.unique_extract = unique_extract
+        self._counter = 0
+
+        self.features = DEFAULT_FEATURES
+        if settings.brain_schema_path.exists():
+            schema = json.loads(settings.brain_schema_path.read_text(encoding="utf-8"))
+            self.features = [f["name"] for f in schema.get("features", [])] or DEFAULT_FEATURES
+
+        self.images = [self._jpeg(w, h, rng.randrange(1 << 30)) for w, h in image_sizes for _ in range(4)]
+
+        from core.modules import import_from_modules
+
+        synthetic = import_from_modules(settings.scribe_module_dir, "synthetic")
+        self.texts = [log.text for log in synthetic.SyntheticLogGenerator(seed).corpus(32, extract_size)]
+        self._text_to_pdf = synthetic.text_to_pdf
+
+    @staticmethod
+    def _jpeg(width: int, height: int, seed: int) -> bytes:
+        import numpy as np
+        from PIL import Image
+
+        noise = np.random.default_rng(seed).integers(40, 220, size=(height // 8, width // 8, 3), dtype=np.uint8)
+        img = Image.fromarray(noise).resize((width, height))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        return buf.getvalue()
+
+    def _features(self, rng: random.Random) -> Dict[str, float]:
+        return {name: round(rng.gauss(0.0, 1.0), 4) for name in self.features}
+
+    def build(self, endpoint: str, rng: random.Random) -> dict:
+        """httpx request arguments for one call"""
+        if endpoint == "predict-delay":
+            return {"method": "POST", "url": "/predict-delay", "json": {"features": self._features(rng)}}
+        if endpoint == "what-if":
+            changed = rng.sample(self.features, k=min(len(self.features), rng.randint(1, 2)))
+            return {
+                "method": "POST",
+                "url": "/what-if",
+                "json": {
+                    "features": self._features(rng),
+                    "deltas": {name: round(rng.uniform(-1.0, 1.0), 3) for name in changed},
+                },
+            }
+        if endpoint == "analyze-image":
+            return {
+                "method": "POST",
+                "url": "/analyze-image",
+                "files": {"file": ("frame.jpg", rng.choice(self.images), "image/jpeg")},
+            }
+
+        text = rng.choice(self.texts)
+        if self.unique_extract:
+            # A unique reference line keeps the content-hash cache from answering
+            self._counter += 1
+            text += f"Ref: LT-{self._counter:08d}\n"
+        if rng.random() < self.pdf_ratio:
+            return {
+                "method": "POST",
+                "url": "/extract",
+                "files": {"file": ("log.pdf", self._text_to_pdf(text), "application/pdf")},
+            }
+        return {"method": "POST", "url": "/extract", "json": {"text": text}}
+
+
+# === Process memory ===
+def _rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _descendants(pid: int) -> List[int]:
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        for task in Path(f"/proc/{current}/task").glob("*"):
+            try:
+                stack.extend(int(c) for c in (task / "children").read_text().split())
+            except (OSError, ValueError):
+                pass
+    return pids
+
+
+def tree_rss_mb(pid: int) -> Tuple[Optional[float], int]:
+    """RSS of a process and all its descendants (Linux /proc), and the process count"""
+    sizes = [kb for kb in (_rss_kb(p) for p in _descendants(pid)) if kb is not None]
+    if not sizes:
+        return None, 0
+    return round(sum(sizes) / 1024, 1), len(sizes)
+
+
+# === Targets ===
+@asynccontextmanager
+async def in_process_client(timeout: float):
+    import httpx
+
+    from app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            yield client, os.getpid()
+
+
+@asynccontextmanager
+async def url_client(url: str, concurrency: int, timeout: float, server_pid: Optional[int]):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        yield client, server_pid
+
+
+@asynccontextmanager
+async def launched_client(port: int, workers: int, concurrency: int, timeout: float, env: Dict[str, str],
+                          backend_dir: Path = BACKEND_DIR):
+    import httpx
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(backend_dir),
+        env={**os.environ, **env},
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=2.0) as probe:
+            deadline = time.monotonic() + 120
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {proc.returncode} during start-up")
+                try:
+                    if (await probe.get("/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Server did not answer /health within 120s")
+                await asyncio.sleep(0.25)
+        async with url_client(url, concurrency, timeout, proc.pid) as target:
+            yield target
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# === Load generation ===
+class Recorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.samples: List[Tuple[float, str, int, float, Optional[str]]] = []  # (t, endpoint, status, ms, error)
+        self.probe_ms: List[float] = []
+        self.rss: List[dict] = []
+        self.elapsed: Optional[float] = None
+
+
+async def _client_loop(client, payloads: Payloads, mix: Dict[str, float], rng: random.Random,
+                       rec: Recorder, deadline: float, budget: List[int], think_s: float):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        if budget[0] <= 0:
+            return
+        budget[0] -= 1
+        endpoint = rng.choices(names, weights)[0]
+        request = payloads.build(endpoint, rng)
+        t0 = time.perf_counter()
+        status, error = 0, None
+        try:
+            response = await client.request(**request)
+            status = response.status_code
+            if status >= 400:
+                error = response.text[:200]
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        rec.samples.append((t0 - rec.start, endpoint, status, (time.perf_counter() - t0) * 1000, error))
+        if think_s:
+            await asyncio.sleep(think_s)
+
+
+async def _probe_loop(client, rec: Recorder, deadline: float, interval: float):
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            await client.get("/health")
+            rec.probe_ms.append((time.perf_counter() - t0) * 1000)
+        except Exception:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def _rss_loop(pid: Optional[int], rec: Recorder, deadline: float, interval: float):
+    if pid is None:
+        return
+    while True:
+        rss, processes = tree_rss_mb(pid)
+        if rss is not None:
+            rec.rss.append({"t": round(time.perf_counter() - rec.start, 2), "rss_mb": rss, "processes": processes})
+        if time.perf_counter() >= deadline:
+            return
+        await asyncio.sleep(interval)
+
+
+async def run_load(target, payloads: Payloads, mix: Dict[str, float], concurrency: int, duration: float,
+                   max_requests: Optional[int], seed: int, think_ms: float = 0.0,
+                   probe_interval: float = 0.1, rss_interval: float = 1.0) -> Recorder:
+    async with target as (client, pid):
+        # Warm-up: one call per endpoint so lazy model loading is not measured
+        rng = random.Random(seed)
+        for endpoint in mix:
+            try:
+                response = await client.request(**payloads.build(endpoint, rng))
+                if response.status_code >= 400:
+                    print(f"[WARN] warm-up {endpoint}: HTTP {response.status_code} {response.text[:120]}")
+            except Exception as e:
+                print(f"[WARN] warm-up {endpoint}: {e}")
+
+        rec = Recorder()
+        deadline = rec.start + duration
+        budget = [max_requests if max_requests else 1 << 62]
+        tasks = [
+            _client_loop(client, payloads, mix, random.Random(seed + 1 + i), rec, deadline, budget,
+                         think_ms / 1000.0)
+            for i in range(concurrency)
+        ]
+        monitors = [
+            asyncio.create_task(_probe_loop(client, rec, deadline, probe_interval)),
+            asyncio.create_task(_rss_loop(pid, rec, deadline, rss_interval)),
+        ]
+        await asyncio.gather(*tasks)
+        rec.elapsed = time.perf_counter() - rec.start
+        for task in monitors:
+            task.cancel()
+        await asyncio.gather(*monitors, return_exceptions=True)
+        if pid is not None:
+            rss, processes = tree_rss_mb(pid)
+            if rss is not None:
+                rec.rss.append({"t": round(rec.elapsed, 2), "rss_mb": rss, "processes": processes})
+    return rec
+
+
+def _latency(values: List[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(values, 50), 2),
+        "p90_ms": round(percentile(values, 90), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def build_report(rec: Recorder, meta: dict) -> dict:
+    elapsed = rec.elapsed or time.perf_counter() - rec.start
+    endpoints = {}
+    for name in sorted({s[1] for s in rec.samples}):
+        rows = [s for s in rec.samples if s[1] == name]
+        errors = [s for s in rows if s[4] is not None]
+        statuses: Dict[str, int] = {}
+        for s in rows:
+            statuses[str(s[2])] = statuses.get(str(s[2]), 0) + 1
+        endpoints[name] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(rows), 4),
+            "statuses": statuses,
+            **_latency([s[3] for s in rows]),
+            "sample_errors": sorted({s[4] for s in errors})[:3],
+        }
+
+    total_errors = sum(e["errors"] for e in endpoints.values())
+    rss_values = [r["rss_mb"] for r in rec.rss]
+    return {
+        "meta": meta,
+        "elapsed_s": round(elapsed, 2),
+        "requests": len(rec.samples),
+        "throughput_rps": round(len(rec.samples) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(total_errors / len(rec.samples), 4) if rec.samples else 0.0,
+        "endpoints": endpoints,
+        "health_probe": {"requests": len(rec.probe_ms), **_latency(rec.probe_ms)},
+        "rss": {
+            "start_mb": rss_values[0] if rss_values else None,
+            "peak_mb": max(rss_values) if rss_values else None,
+            "end_mb": rss_values[-1] if rss_values else None,
+            "timeline": rec.rss,
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "=" * 96)
+    print(f"{report['requests']} requests in {report['elapsed_s']}s: {report['throughput_rps']} req/s, "
+          f"error rate {report['error_rate']:.2%}")
+    print("=" * 96)
+    print(f"{'endpoint':<16}{'requests':>10}{'req/s':>10}{'errors':>9}{'p50 ms':>11}{'p90 ms':>11}"
+          f"{'p99 ms':>11}{'max ms':>11}")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<16}{e['requests']:>10}{e['rps']:>10}{e['errors']:>9}{e['p50_ms']:>11}{e['p90_ms']:>11}"
+              f"{e['p99_ms']:>11}{e['max_ms']:>11}")
+        for error in e["sample_errors"]:
+            print(f"    ! {error}")
+    probe = report["health_probe"]
+    print(f"{'/health probe':<16}{probe['requests']:>10}{'':>10}{'':>9}{probe['p50_ms']:>11}{probe['p90_ms']:>11}"
+          f"{probe['p99_ms']:>11}{probe['max_ms']:>11}")
+    rss = report["rss"]
+    if rss["peak_mb"] is not None:
+        print(f"\nRSS: start {rss['start_mb']} MB, peak {rss['peak_mb']} MB, end {rss['end_mb']} MB "
+              f"({len(rss['timeline'])} samples)")
+
+
+def _size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backend API load test")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--in-process", action="store_true", help="Serve the app in this process (ASGI transport)")
+    mode.add_argument("--launch", action="store_true", help="Start a local uvicorn server for the run")
+    mode.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--server-pid", type=int, help="PID whose process tree RSS is sampled (--url mode)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --launch")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --launch")
+    parser.add_argument("--stub-vision", action="store_true", help="Serve /analyze-image from the stub model")
+    parser.add_argument("--stub-latency-ms", type=float, default=20.0, help="Simulated forward pass of the stub")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="endpoint=weight,...")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a client's requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--image-sizes", default="1280x720", help="Comma-separated WIDTHxHEIGHT of uploaded images")
+    parser.add_argument("--extract-size", choices=["small", "medium", "large", "mixed"], default="mixed")
+    parser.add_argument("--extract-pdf-ratio", type=float, default=0.0, help="Share of /extract calls sent as PDF")
+    parser.add_argument("--extract-cache-hits", action="store_true",
+                        help="Reuse identical /extract bodies (by default each one is made unique)")
+    parser.add_argument("--rss-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the report JSON here")
+    args = parser.parse_args(argv)
+
+    stub_env = {}
+    if args.stub_vision:
+        stub_env = {"VISION_STUB": "1", "VISION_STUB_LATENCY_MS": str(args.stub_latency_ms)}
+        if args.url:
+            print("[WARN] --stub-vision has no effect on an external server; start it with VISION_STUB=1")
+        # Settings are read at import, so this must happen before the app is loaded
+        os.environ.update(stub_env)
+
+    payloads = Payloads(
+        seed=args.seed,
+        image_sizes=[_size(s) for s in args.image_sizes.split(",") if s.strip()],
+        extract_size=args.extract_size,
+        pdf_ratio=args.extract_pdf_ratio,
+        unique_extract=not args.extract_cache_hits,
+    )
+
+    if args.in_process:
+        target = in_process_client(args.timeout)
+        target_name = "in-process"
+    elif args.launch:
+        target = launched_client(args.port, args.workers, args.concurrency, args.timeout, stub_env)
+        target_name = f"launched uvicorn :{args.port} x{args.workers}"
+    else:
+        target = url_client(args.url.rstrip("/"), args.concurrency, args.timeout, args.server_pid)
+        target_name = args.url
+
+    print(f"Load test against {target_name}: {args.concurrency} clients, {args.duration}s, mix {args.mix}")
+    rec = asyncio.run(run_load(
+        target, payloads, args.mix, args.concurrency, args.duration, args.requests, args.seed,
+        think_ms=args.think_ms, rss_interval=args.rss_interval,
+    ))
+
+    report = build_report(rec, {
+        "target": target_name,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "stub_vision": args.stub_vision,
+        "image_sizes": args.image_sizes,
+        "extract_size": args.extract_size,
+        "extract_pdf_ratio": args.extract_pdf_ratio,
+        "seed": args.seed,
+    })
+    print_report(report)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,513 @@
+# backend/tools/replay.py
+"""
+Replay captured traffic against one or two builds of the backend.
+
+Reads the sessions recorded by core/capture.py (CAPTURE_ENABLED=1) and
+re-issues every request, body included, against each --target: the URL of a
+running server, or a backend directory that is started with uvicorn for the
+run (so another checkout can be replayed next to this one). Targets are
+replayed one after the other, so they never compete for the CPU.
+
+Timing: --speed 1 keeps the captured arrival times, 2 replays twice as fast
+and 0 sends the requests back to back from --concurrency clients. With
+--speed above 0, --concurrency caps the open connections, and the report
+shows how late requests left compared with their schedule.
+
+Responses are compared per request on status and body. JSON bodies are
+normalised first: volatile fields (overlay URLs, extraction ids, ...) are
+dropped, floats rounded to --float-digits, and NDJSON lines sorted. With two
+targets the second is compared with the first, latency included (p50/p90/p99
+per endpoint); with one, its responses are checked against those stored at
+capture time, or against a saved report with --baseline. Endpoints that read
+server state (extraction search, compliance series) answer from each
+server's own database, so differences there may be expected.
+
+Exits with 1 on response mismatches or on latency regressions beyond
+--tolerance.
+
+Run from backend/:
+    python -m tools.replay --target http://127.0.0.1:8000
+    python -m tools.replay --target ../../pulse-main/backend --target . --speed 2 --out replay.json
+    python -m tools.replay --target . --baseline replay.json --env VISION_STUB=1
+    python -m tools.replay --compare before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.capture import REPLAY_HEADER, blob_path  # noqa: E402
+from core.scribe_cache import sha256_hex  # noqa: E402
+from tools.loadtest import launched_client, percentile, url_client  # noqa: E402
+
+VOLATILE_KEYS = ("overlay_url", "overlay_variants", "export_csv_url", "extraction_id", "batch_id", "job_id")
+
+
+# === Captured sessions ===
+def endpoint_key(method: str, path: str) -> str:
+    """'GET /extractions/42' -> 'GET /extractions/{id}'"""
+    parts = []
+    for part in path.split("/"):
+        is_hex_id = len(part) >= 16 and all(c in string.hexdigits for c in part)
+        parts.append("{id}" if part.isdigit() or is_hex_id else part)
+    return f"{method} {'/'.join(parts)}"
+
+
+def load_capture(root: Path, sessions: Optional[List[str]] = None, prefixes: Tuple[str, ...] = (),
+                 limit: Optional[int] = None) -> Tuple[List[dict], int]:
+    """
+    Read captured requests in arrival order
+
+    Args:
+        root: CAPTURE_DIR
+        sessions: Session names to read (all by default)
+        prefixes: Only keep requests whose path starts with one of these
+        limit: Keep the first N requests
+
+    Returns:
+        Records with an "id" ("<session>:<line>"), and the number skipped
+        because their body was not stored
+    """
+    files = sorted((root / "sessions").glob("*.jsonl"))
+    if sessions:
+        files = [f for f in files if f.stem in sessions]
+    records, skipped = [], 0
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            for n, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short when the server stopped
+                if prefixes and not record["p"].startswith(prefixes):
+                    continue
+                if record.get("bn") and not (record.get("b") and blob_path(root, record["b"]).exists()):
+                    skipped += 1  # body over CAPTURE_MAX_BODY_BYTES
+                    continue
+                record["id"] = f"{path.stem}:{n}"
+                records.append(record)
+    records.sort(key=lambda r: r["t"])
+    return (records[:limit] if limit else records), skipped
+
+
+def load_bodies(root: Path, records: List[dict]) -> Dict[str, bytes]:
+    """Request bodies by digest, read before replaying so disk reads stay out of the timings"""
+    return {r["b"]: blob_path(root, r["b"]).read_bytes() for r in records if r.get("b")}
+
+
+# === Response comparison ===
+def normalize(value, ignore: Tuple[str, ...], digits: int):
+    if isinstance(value, dict):
+        return {k: normalize(v, ignore, digits) for k, v in value.items() if k not in ignore}
+    if isinstance(value, list):
+        return [normalize(v, ignore, digits) for v in value]
+    if isinstance(value, float):
+        return round(value, digits) + 0.0  # also folds -0.0 into 0.0
+    return value
+
+
+def comparable(body: bytes, content_type: str, ignore: Tuple[str, ...], digits: int):
+    """Normalised response body: parsed JSON, sorted NDJSON lines, or the raw bytes"""
+    try:
+        if "ndjson" in content_type:
+            lines = [normalize(json.loads(line), ignore, digits) for line in body.splitlines() if line.strip()]
+            return sorted(lines, key=lambda v: json.dumps(v, sort_keys=True))
+        if "json" in content_type:
+            return normalize(json.loads(body), ignore, digits)
+    except ValueError:
+        pass
+    return body
+
+
+def response_digest(status: int, value) -> str:
+    payload = value if isinstance(value, bytes) else json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return sha256_hex(f"{status}\n".encode() + payload)
+
+
+def _short(value) -> str:
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def first_difference(a, b, path: str = "$") -> Optional[str]:
+    """Where two normalised bodies first differ, e.g. '$.issues[2].type: 'delay' != 'safety''"""
+    if isinstance(a, bytes) or isinstance(b, bytes):
+        if a == b:
+            return None
+        sizes = [len(v) if isinstance(v, bytes) else "JSON" for v in (a, b)]
+        return f"{path}: body differs ({sizes[0]} vs {sizes[1]} bytes)"
+    if type(a) is not type(b):
+        return f"{path}: {_short(a)} != {_short(b)}"
+    if isinstance(a, dict):
+        for key in sorted(set(a) | set(b)):
+            if key not in a or key not in b:
+                return f"{path}.{key}: only in {'first' if key in a else 'second'}"
+            diff = first_difference(a[key], b[key], f"{path}.{key}")
+            if diff:
+                return diff
+        return None
+    if isinstance(a, list):
+        if len(a) != len(b):
+            return f"{path}: {len(a)} items != {len(b)}"
+        for n, (x, y) in enumerate(zip(a, b)):
+            diff = first_difference(x, y, f"{path}[{n}]")
+            if diff:
+                return diff
+        return None
+    return None if a == b else f"{path}: {_short(a)} != {_short(b)}"
+
+
+# === Replay ===
+class Run:
+    def __init__(self, target: str):
+        self.target = target
+        self.results: Dict[str, dict] = {}
+        self.values: Dict[str, object] = {}  # normalised bodies, kept in memory for mismatch details
+        self.elapsed = 0.0
+
+
+def _request_args(record: dict, bodies: Dict[str, bytes]) -> dict:
+    url = record["p"] + (f"?{record['q']}" if record.get("q") else "")
+    return {
+        "method": record["m"],
+        "url": url,
+        "content": bodies.get(record.get("b")) if record.get("b") else None,
+        "headers": {**record.get("h", {}), REPLAY_HEADER: "1"},
+    }
+
+
+async def _issue(client, record: dict, bodies: Dict[str, bytes], run: Run, ignore: Tuple[str, ...],
+                 digits: int, lag_ms: float) -> None:
+    request = _request_args(record, bodies)
+    status, error, value = 0, None, None
+    t0 = time.perf_counter()
+    try:
+        response = await client.request(**request)
+        elapsed = (time.perf_counter() - t0) * 1000
+        status = response.status_code
+        value = comparable(response.content, response.headers.get("content-type", ""), ignore, digits)
+    except Exception as e:
+        elapsed = (time.perf_counter() - t0) * 1000
+        error = f"{e.__class__.__name__}: {e}"
+    run.results[record["id"]] = {
+        "key": endpoint_key(record["m"], record["p"]),
+        "status": status,
+        "ms": round(elapsed, 2),
+        "lag_ms": round(lag_ms, 2),
+        "digest": response_digest(status, value) if error is None else None,
+        "error": error,
+    }
+    run.values[record["id"]] = value
+
+
+async def replay(target, name: str, records: List[dict], bodies: Dict[str, bytes], speed: float,
+                 concurrency: int, warmup: bool, ignore: Tuple[str, ...], digits: int) -> Run:
+    """
+    Re-issue the records against one target
+
+    Args:
+        target: Async context manager yielding (client, server pid), as in tools/loadtest.py
+        speed: Time scale for the captured arrival times; 0 sends back to back
+        concurrency: Clients for speed 0, open connections otherwise
+        warmup: Send one untimed request per endpoint first, so lazy model loading is not measured
+    """
+    run = Run(name)
+    async with target as (client, _pid):
+        if warmup:
+            seen = set()
+            for record in records:
+                key = endpoint_key(record["m"], record["p"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                try:
+                    await client.request(**_request_args(record, bodies))
+                except Exception as e:
+                    print(f"[WARN] warm-up {key}: {e}")
+
+        start = time.perf_counter()
+        if speed > 0:
+            first = records[0]["t"]
+            tasks = []
+            for record in records:
+                due = start + (record["t"] - first) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lag_ms = max(0.0, time.perf_counter() - due) * 1000
+                tasks.append(asyncio.create_task(_issue(client, record, bodies, run, ignore, digits, lag_ms)))
+            await asyncio.gather(*tasks)
+        else:
+            pending = iter(records)
+
+            async def worker():
+                for record in pending:
+                    await _issue(client, record, bodies, run, ignore, digits, 0.0)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        run.elapsed = time.perf_counter() - start
+    return run
+
+
+def _latency(values: List[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(values, 50), 2),
+        "p90_ms": round(percentile(values, 90), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def build_report(run: Run, meta: dict) -> dict:
+    results = run.results
+    endpoints = {}
+    for key in sorted({r["key"] for r in results.values()}):
+        rows = [r for r in results.values() if r["key"] == key]
+        endpoints[key] = {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if r["error"] or r["status"] >= 500),
+            **_latency([r["ms"] for r in rows]),
+        }
+    return {
+        "meta": {**meta, "target": run.target},
+        "elapsed_s": round(run.elapsed, 2),
+        "requests": len(results),
+        "endpoints": endpoints,
+        "schedule_lag": _latency([r["lag_ms"] for r in results.values()]),
+        "results": results,
+    }
+
+
+def captured_report(root: Path, records: List[dict], ignore: Tuple[str, ...], digits: int) -> Tuple[dict, dict]:
+    """The responses stored at capture time, shaped like a replay report"""
+    results, values = {}, {}
+    for record in records:
+        value = None
+        if record.get("r") and blob_path(root, record["r"]).exists():
+            value = comparable(blob_path(root, record["r"]).read_bytes(), record.get("rt", ""), ignore, digits)
+        elif not record.get("rn"):
+            value = b""
+        results[record["id"]] = {
+            "key": endpoint_key(record["m"], record["p"]),
+            "status": record["s"],
+            "ms": record["ms"],
+            "digest": response_digest(record["s"], value) if value is not None else None,
+            "error": None,
+        }
+        values[record["id"]] = value
+    return {"meta": {"target": "capture"}, "results": results}, values
+
+
+def compare(base: dict, new: dict, tolerance: float = 0.15, min_requests: int = 5, latency: bool = True,
+            base_values: Optional[dict] = None, new_values: Optional[dict] = None) -> dict:
+    """
+    Compare two reports request by request
+
+    Args:
+        base, new: Reports (build_report or captured_report)
+        tolerance: Allowed relative latency increase before it counts as a regression
+        min_requests: Endpoints with fewer matched requests are not checked for regressions
+        latency: Compare latency as well as responses
+        base_values, new_values: Normalised bodies by request id, for mismatch details
+
+    Returns:
+        Mismatched requests, per-endpoint latency and the list of regressions
+    """
+    common = [i for i in base["results"] if i in new["results"]]
+    mismatches, unchecked = [], 0
+    for i in common:
+        a, b = base["results"][i], new["results"][i]
+        if a["digest"] is None or b["digest"] is None:
+            unchecked += 1
+            continue
+        if a["digest"] == b["digest"]:
+            continue
+        if a["status"] != b["status"]:
+            detail = f"status {a['status']} != {b['status']}"
+        elif base_values is not None and new_values is not None:
+            detail = first_difference(base_values.get(i), new_values.get(i)) or "bodies differ"
+        else:
+            detail = "bodies differ"
+        mismatches.append({"id": i, "key": a["key"], "detail": detail})
+
+    endpoints, regressions = {}, []
+    for key in sorted({base["results"][i]["key"] for i in common}):
+        ids = [i for i in common if base["results"][i]["key"] == key]
+        entry = {"requests": len(ids), "mismatches": sum(1 for m in mismatches if m["key"] == key)}
+        if latency:
+            before = _latency([base["results"][i]["ms"] for i in ids])
+            after = _latency([new["results"][i]["ms"] for i in ids])
+            for metric in ("p50_ms", "p90_ms", "p99_ms"):
+                old, current = before[metric], after[metric]
+                change = (current - old) / old if old else 0.0
+                entry[metric] = {"base": old, "new": current, "change": round(change, 4)}
+                if metric != "p90_ms" and len(ids) >= min_requests and change > tolerance:
+                    regressions.append(f"{key} {metric}: {old} -> {current} ({change:+.1%})")
+        endpoints[key] = entry
+
+    return {
+        "base": base["meta"].get("target"),
+        "new": new["meta"].get("target"),
+        "compared": len(common),
+        "unchecked": unchecked,
+        "mismatches": mismatches,
+        "endpoints": endpoints,
+        "regressions": regressions,
+    }
+
+
+def print_run(report: dict) -> None:
+    print("\n" + "=" * 80)
+    print(f"{report['meta']['target']}: {report['requests']} requests in {report['elapsed_s']}s")
+    print("=" * 80)
+    print(f"{'endpoint':<36}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for key, e in report["endpoints"].items():
+        print(f"{key:<36}{e['requests']:>9}{e['errors']:>8}{e['p50_ms']:>9}{e['p90_ms']:>9}{e['p99_ms']:>9}")
+    lag = report["schedule_lag"]
+    if lag["max_ms"]:
+        print(f"schedule lag: p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+
+
+def print_comparison(result: dict) -> None:
+    print("\n" + "=" * 80)
+    print(f"{result['base']} -> {result['new']}: {result['compared']} requests matched, "
+          f"{len(result['mismatches'])} responses differ, {result['unchecked']} not comparable")
+    print("=" * 80)
+    with_latency = any("p50_ms" in e for e in result["endpoints"].values())
+    for key, e in result["endpoints"].items():
+        line = f"{key:<36}{e['requests']:>6} req {e['mismatches']:>5} differ"
+        if with_latency:
+            line += "".join(
+                f"  {m[:3]} {e[m]['base']}->{e[m]['new']} ms ({e[m]['change']:+.0%})" for m in ("p50_ms", "p99_ms")
+            )
+        print(line)
+    for m in result["mismatches"][:10]:
+        print(f"  ! {m['id']} {m['key']}: {m['detail']}")
+    if len(result["mismatches"]) > 10:
+        print(f"  ... {len(result['mismatches']) - 10} more")
+    for line in result["regressions"]:
+        print(f"  - regression: {line}")
+
+
+def _load_report(path: str) -> dict:
+    """A run report, or the last run of a file written with --out"""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data["runs"][-1] if "runs" in data else data
+
+
+def _target(spec: str, index: int, args, env: Dict[str, str]):
+    if spec.startswith(("http://", "https://")):
+        return url_client(spec.rstrip("/"), args.concurrency, args.timeout, None), spec
+    backend_dir = Path(spec).resolve()
+    if not (backend_dir / "app.py").exists():
+        raise SystemExit(f"[ERROR] {spec} is neither a URL nor a backend directory (no app.py)")
+    port = args.port + index
+    return (
+        launched_client(port, args.workers, args.concurrency, args.timeout, env, backend_dir=backend_dir),
+        f"{backend_dir} :{port}",
+    )
+
+
+def _env_pair(value: str) -> Tuple[str, str]:
+    key, sep, val = value.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got '{value}'")
+    return key, val
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured API traffic and compare builds")
+    parser.add_argument("--target", action="append", default=[],
+                        help="Server URL or backend directory to launch; give two to compare builds")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two saved reports and exit")
+    parser.add_argument("--capture", help="Capture directory (default: CAPTURE_DIR)")
+    parser.add_argument("--session", action="append", help="Replay only these sessions (file names without .jsonl)")
+    parser.add_argument("--paths", default="", help="Comma-separated path prefixes to replay")
+    parser.add_argument("--limit", type=int, help="Replay the first N requests")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale; 1 = as captured, 0 = back to back")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients (speed 0) or open connections")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--no-warmup", action="store_true", help="Do not send untimed warm-up requests")
+    parser.add_argument("--port", type=int, default=8770, help="First port for launched targets")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for launched targets")
+    parser.add_argument("--env", action="append", type=_env_pair, default=[],
+                        help="KEY=VALUE set for launched targets, e.g. VISION_STUB=1")
+    parser.add_argument("--ignore-keys", default=",".join(VOLATILE_KEYS), help="JSON keys left out of comparisons")
+    parser.add_argument("--float-digits", type=int, default=6, help="Decimals floats are rounded to before comparing")
+    parser.add_argument("--baseline", help="Saved report to compare a single target with")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative latency regression")
+    parser.add_argument("--min-requests", type=int, default=5, help="Fewest requests for an endpoint's latency check")
+    parser.add_argument("--out", help="Write the run reports and comparison as JSON")
+    args = parser.parse_args(argv)
+
+    ignore = tuple(k.strip() for k in args.ignore_keys.split(",") if k.strip())
+
+    if args.compare:
+        result = compare(_load_report(args.compare[0]), _load_report(args.compare[1]),
+                         args.tolerance, args.min_requests)
+        print_comparison(result)
+        return 1 if result["mismatches"] or result["regressions"] else 0
+
+    if not 1 <= len(args.target) <= 2:
+        parser.error("give one or two --target values (or --compare BASE NEW)")
+
+    from core.config import settings
+
+    root = Path(args.capture) if args.capture else settings.capture_dir
+    prefixes = tuple(p.strip() for p in args.paths.split(",") if p.strip())
+    records, skipped = load_capture(root, args.session, prefixes, args.limit)
+    if not records:
+        print(f"[ERROR] No captured requests under {root}")
+        return 1
+    span = records[-1]["t"] - records[0]["t"]
+    print(f"Replaying {len(records)} requests ({span:.1f}s captured) from {root}"
+          + (f"; {skipped} skipped, body not stored" if skipped else ""))
+    bodies = load_bodies(root, records)
+
+    # Launched servers must not capture the replay itself
+    env = {"CAPTURE_ENABLED": "0", **dict(args.env)}
+    meta = {"capture": str(root), "requests": len(records), "speed": args.speed, "concurrency": args.concurrency,
+            "ignore_keys": list(ignore), "float_digits": args.float_digits}
+
+    runs: List[Run] = []
+    reports: List[dict] = []
+    for index, spec in enumerate(args.target):
+        target, name = _target(spec, index, args, env)
+        print(f"\n[RUN] {name}")
+        run = asyncio.run(replay(target, name, records, bodies, args.speed, args.concurrency,
+                                 not args.no_warmup, ignore, args.float_digits))
+        runs.append(run)
+        reports.append(build_report(run, meta))
+        print_run(reports[-1])
+
+    if len(runs) == 2:
+        result = compare(reports[0], reports[1], args.tolerance, args.min_requests,
+                         base_values=runs[0].values, new_values=runs[1].values)
+    elif args.baseline:
+        result = compare(_load_report(args.baseline), reports[0], args.tolerance, args.min_requests,
+                         new_values=runs[0].values)
+    else:
+        captured, captured_values = captured_report(root, records, ignore, args.float_digits)
+        result = compare(captured, reports[0], latency=False, base_values=captured_values,
+                         new_values=runs[0].values)
+    print_comparison(result)
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps({"runs": reports, "comparison": result}, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.out}")
+    return 1 if result["mismatches"] or result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,7 @@ type VisionResponse = {
   helmeted_persons: number;
   compliance_rate: number;
   overlay_url?: string;
+  overlay_variants?: { thumb?: string; medium?: string };
 };
 
 type ScribeIssue = { type: string; summary: string };
@@ -51,6 +52,27 @@ const BRAND = {
 const API_BASE =
   import.meta.env.VITE_API_BASE?.toString() || "http://localhost:8000";
 
+// The card shows the WebP variants; the full-size JPEG only opens on click
+const OVERLAY_WIDTHS = { thumb: 320, medium: 960 } as const;
+
+function overlayVariant(
+  result: VisionResponse | null,
+  variant: keyof typeof OVERLAY_WIDTHS
+): string | undefined {
+  const url = result?.overlay_variants?.[variant];
+  return url ? `${API_BASE}${url}` : undefined;
+}
+
+function overlaySrcSet(result: VisionResponse | null): string | undefined {
+  const entries = (Object.keys(OVERLAY_WIDTHS) as (keyof typeof OVERLAY_WIDTHS)[])
+    .map((variant) => {
+      const url = overlayVariant(result, variant);
+      return url ? `${url} ${OVERLAY_WIDTHS[variant]}w` : null;
+    })
+    .filter(Boolean);
+  return entries.length ? entries.join(", ") : undefined;
+}
+
 const SectionHeader: React.FC<{ title: string; subtitle: string }> = ({
   title,
   subtitle,
@@ -729,11 +751,16 @@ export default function App() {
                         style={{ background: BRAND.surfaceAlt }}
                       >
                         {visionOverlay ? (
-                          <img
-                            src={visionOverlay}
-                            alt="PPE overlay"
-                            className="block w-full"
-                          />
+                          <a href={visionOverlay} target="_blank" rel="noreferrer">
+                            <img
+                              src={overlayVariant(visionResult, "medium") ?? visionOverlay}
+                              srcSet={overlaySrcSet(visionResult)}
+                              sizes="(min-width: 768px) 50vw, 100vw"
+                              alt="PPE overlay"
+                              className="block w-full"
+                              loading="lazy"
+                            />
+                          </a>
                         ) : (
                           <div className="flex h-56 items-center justify-center text-xs text-roshn-muted">
                             No overlay yet
@@ -6,28 +6,62 @@ REST API for the Auto-Report Scribe service
 Endpoints:
 - POST /extract - Extract from text
 - POST /upload - Upload file (txt/pdf/docx) and extract
-- POST /generate-report - Generate PDF report
+- GET /jobs/{job_id} - Status of a queued PDF report
+- GET /reports/{filename} - Download a generated PDF report
 """
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager
+import asyncio
 import os
 import tempfile
 import shutil
 from datetime import datetime
 
-from extractor import DailyLogExtractor
-from report_generator import ReportGenerator
+from jobs import DONE, ReportJobQueue
+from pool import ExtractorPool, PoolFull
 from schema import DailyLogExtraction
 
+# Services are created on startup, not at import: spawned worker processes
+# re-import the main module and must not start pools of their own
+extractor_pool: Optional[ExtractorPool] = None
+report_jobs: Optional[ReportJobQueue] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global extractor_pool, report_jobs
+    extractor_pool = ExtractorPool(
+        workers=int(os.getenv("SCRIBE_EXTRACT_WORKERS", str(os.cpu_count() or 2))),
+        model_name=os.getenv("SCRIBE_MODEL", "en_core_web_sm"),
+        max_pending=int(os.getenv("SCRIBE_EXTRACT_QUEUE", "64")),
+    )
+    report_jobs = ReportJobQueue(
+        db_path="data/report_jobs.sqlite3",
+        reports_dir="data/reports",
+        workers=int(os.getenv("SCRIBE_REPORT_WORKERS", "2")),
+    )
+    report_jobs.start()
+    # Load spaCy in every worker before serving; the event loop stays free meanwhile
+    await run_in_threadpool(extractor_pool.warm, extractor_pool.start_timeout)
+    try:
+        yield
+    finally:
+        extractor_pool.shutdown(wait=False)
+        await run_in_threadpool(report_jobs.stop)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="ROSHN PULSE - Auto-Report Scribe API",
     description="Module 3: NLP-powered extraction service for construction daily logs",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware for frontend integration
@@ -39,9 +73,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-extractor = DailyLogExtractor()
-report_generator = ReportGenerator()
 
 # Request/Response models
 class TextExtractionRequest(BaseModel):
@@ -54,8 +85,16 @@ class ExtractionResponse(BaseModel):
     success: bool
     message: str
     data: Optional[dict] = None
+    job_id: Optional[str] = None
     pdf_url: Optional[str] = None
 
+class ReportJobResponse(BaseModel):
+    """Response model for report job status"""
+    job_id: str
+    status: str
+    pdf_url: Optional[str] = None
+    error: Optional[str] = None
+
 
 # Health check endpoint
 @app.get("/")
@@ -71,11 +110,12 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check, including every extractor worker"""
+    pool = extractor_pool.health()
     return {
-        "status": "healthy",
-        "extractor": "loaded",
-        "report_generator": "ready",
+        "status": "healthy" if pool["ready"] == len(pool["workers"]) else "degraded" if pool["ready"] else "unavailable",
+        "extractor_pool": pool,
+        "report_workers": await run_in_threadpool(report_jobs.health),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -93,8 +133,12 @@ async def extract_from_text(request: TextExtractionRequest):
         ExtractionResponse with extracted data
     """
     try:
-        # Perform extraction
-        result = extractor.extract_from_text(request.text)
+        # Perform extraction on a pool worker; the event loop only awaits it
+        try:
+            future = extractor_pool.submit(request.text)
+        except PoolFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        result = await asyncio.wrap_future(future)
 
         # Convert to dict
         data = {
@@ -135,27 +179,25 @@ async def extract_from_text(request: TextExtractionRequest):
             ]
         }
 
-        # Generate PDF if requested
+        # Queue PDF if requested; poll /jobs/{job_id} until it is done
+        job_id = None
         pdf_url = None
         if request.generate_pdf:
-            # Create reports directory
-            os.makedirs("data/reports", exist_ok=True)
-
-            # Generate PDF
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            pdf_filename = f"report_{timestamp}.pdf"
-            pdf_path = f"data/reports/{pdf_filename}"
-
-            report_generator.generate_pdf(result, pdf_path)
-            pdf_url = f"/reports/{pdf_filename}"
+            job = await run_in_threadpool(report_jobs.submit, result)
+            job_id = job["job_id"]
+            if job["status"] == DONE:
+                pdf_url = f"/reports/{job['pdf_name']}"
 
         return ExtractionResponse(
             success=True,
             message="Extraction completed successfully",
             data=data,
+            job_id=job_id,
             pdf_url=pdf_url
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
 
@@ -191,18 +233,44 @@ async def upload_and_extract(file: UploadFile = File(...), generate_pdf: bool =
         if filename.endswith('.txt'):
             text = content.decode('utf-8')
         elif filename.endswith('.pdf'):
-            text = extract_text_from_pdf(content)
+            text = await run_in_threadpool(extract_text_from_pdf, content)
         elif filename.endswith('.docx'):
-            text = extract_text_from_docx(content)
+            text = await run_in_threadpool(extract_text_from_docx, content)
 
         # Process extraction
         request = TextExtractionRequest(text=text, generate_pdf=generate_pdf)
         return await extract_from_text(request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File processing failed: {str(e)}")
 
 
+# Report job status endpoint
+@app.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def report_job_status(job_id: str):
+    """
+    Status of a queued PDF report
+
+    Args:
+        job_id: Job ID returned by /extract or /upload
+
+    Returns:
+        Job status, with pdf_url once the report is done
+    """
+    job = await run_in_threadpool(report_jobs.status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return ReportJobResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        pdf_url=f"/reports/{job['pdf_name']}" if job["status"] == DONE else None,
+        error=job["error"]
+    )
+
+
 # PDF download endpoint
 @app.get("/reports/{filename}")
 async def download_report(filename: str):
@@ -0,0 +1,286 @@
+"""
+ROSHN PULSE Module 3: Scribe Benchmark
+=======================================
+Throughput and latency benchmark for the Scribe extractors
+
+Runs a seeded synthetic corpus (see synthetic.py) through:
+- basic_extract: the backend's rule-based tier-1 extractor (_basic_extract)
+- daily_log_extractor: DailyLogExtractor (spaCy + rules)
+
+and reports docs/sec, p50/p99 latency per document and per-stage times
+(pdf_parse, spacy, rules). With --pdf every log is first rendered to a PDF
+and parsed back, so PDF parsing is part of the measured path.
+
+Results are written as JSON. --save-baseline stores them as the baseline;
+--compare checks a run against a stored baseline and exits non-zero when
+throughput or latency regress by more than --tolerance.
+
+Usage:
+    python benchmark.py --docs 200 --size mixed --pdf --out data/benchmarks/scribe.json
+    python benchmark.py --save-baseline data/benchmarks/scribe_baseline.json
+    python benchmark.py --compare data/benchmarks/scribe_baseline.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from synthetic import SyntheticLogGenerator, text_to_pdf
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+TARGETS = ["basic_extract", "daily_log_extractor"]
+
+# Metrics checked by --compare: (name, True if higher is better)
+COMPARED_METRICS = [("docs_per_sec", True), ("p50_ms", False), ("p99_ms", False)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _latency_stats(seconds: List[float]) -> dict:
+    ms = [s * 1000.0 for s in seconds]
+    return {
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def parse_pdf(data: bytes) -> str:
+    """Extract text from PDF bytes, as the Scribe API does"""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "".join((page.extract_text() or "") + "\n" for page in reader.pages)
+
+
+def run_target(stages: Callable[[dict], Dict[str, float]], docs: List[dict], warmup: int) -> dict:
+    """
+    Time one extractor over the corpus
+
+    Args:
+        stages: Processes one document and returns seconds spent per stage
+        docs: Corpus entries ({"text": ..., "pdf": ...})
+        warmup: Documents processed first and left out of the results
+
+    Returns:
+        docs/sec, latency percentiles and per-stage percentiles
+    """
+    for doc in docs[:warmup]:
+        stages(doc)
+
+    totals: List[float] = []
+    per_stage: Dict[str, List[float]] = {}
+    start = time.perf_counter()
+    for doc in docs:
+        timings = stages(doc)
+        totals.append(sum(timings.values()))
+        for name, seconds in timings.items():
+            per_stage.setdefault(name, []).append(seconds)
+    wall = time.perf_counter() - start
+
+    return {
+        "docs": len(docs),
+        "wall_s": round(wall, 3),
+        "docs_per_sec": round(len(docs) / wall, 2) if wall else 0.0,
+        **_latency_stats(totals),
+        "stages": {name: _latency_stats(values) for name, values in per_stage.items()},
+    }
+
+
+def _text_of(doc: dict, timings: Dict[str, float]) -> str:
+    if doc.get("pdf") is None:
+        return doc["text"]
+    t0 = time.perf_counter()
+    text = parse_pdf(doc["pdf"])
+    timings["pdf_parse"] = time.perf_counter() - t0
+    return text
+
+
+def basic_extract_stages() -> Callable[[dict], Dict[str, float]]:
+    """Stage runner for the backend's rule-based extractor"""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    from routers.scribe import _basic_extract
+
+    def stages(doc: dict) -> Dict[str, float]:
+        timings: Dict[str, float] = {}
+        text = _text_of(doc, timings)
+        t0 = time.perf_counter()
+        _basic_extract(text)
+        timings["rules"] = time.perf_counter() - t0
+        return timings
+
+    return stages
+
+
+def daily_log_extractor_stages(model_name: str, fast: bool) -> Callable[[dict], Dict[str, float]]:
+    """Stage runner for DailyLogExtractor, timing spaCy and the rules separately"""
+    from extractor import DailyLogExtractor
+
+    extractor = DailyLogExtractor(model_name, fast=fast)
+
+    def stages(doc: dict) -> Dict[str, float]:
+        timings: Dict[str, float] = {}
+        text = _text_of(doc, timings)
+        t0 = time.perf_counter()
+        parsed = extractor.nlp(text)
+        t1 = time.perf_counter()
+        extractor._extract_from_doc(text, parsed)
+        timings["spacy"] = t1 - t0
+        timings["rules"] = time.perf_counter() - t1
+        return timings
+
+    return stages
+
+
+def build_corpus(n_docs: int, seed: int, size: str, pdf: bool) -> List[dict]:
+    docs = []
+    for log in SyntheticLogGenerator(seed).corpus(n_docs, size):
+        docs.append({"text": log.text, "pdf": text_to_pdf(log.text) if pdf else None})
+    return docs
+
+
+def run_benchmark(n_docs: int = 200, seed: int = 0, size: str = "mixed", pdf: bool = False,
+                  targets: Optional[List[str]] = None, model_name: str = "en_core_web_sm",
+                  fast: bool = False, warmup: int = 5) -> dict:
+    """
+    Run the benchmark
+
+    Returns:
+        Results dictionary ({"meta": ..., "targets": {name: metrics}})
+    """
+    targets = targets or TARGETS
+    docs = build_corpus(n_docs, seed, size, pdf)
+    results = {
+        "meta": {
+            "docs": n_docs,
+            "seed": seed,
+            "size": size,
+            "pdf": pdf,
+            "model": model_name,
+            "fast": fast,
+            "warmup": warmup,
+            "chars": sum(len(d["text"]) for d in docs),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "targets": {},
+    }
+
+    for name in targets:
+        print(f"[RUN] {name} on {n_docs} docs" + (" (PDF)" if pdf else ""))
+        if name == "basic_extract":
+            stages = basic_extract_stages()
+        elif name == "daily_log_extractor":
+            stages = daily_log_extractor_stages(model_name, fast)
+        else:
+            raise ValueError(f"Unknown target '{name}'. Use one of: {', '.join(TARGETS)}")
+        results["targets"][name] = run_target(stages, docs, warmup)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.15) -> List[str]:
+    """
+    Compare results with a baseline
+
+    Args:
+        results: Output of run_benchmark
+        baseline: Stored output of an earlier run
+        tolerance: Allowed relative change before a metric counts as regressed
+
+    Returns:
+        One message per regressed metric (empty when none regressed)
+    """
+    regressions = []
+    for name, current in results["targets"].items():
+        base = baseline.get("targets", {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def print_results(results: dict):
+    print("\n" + "=" * 80)
+    print("SCRIBE BENCHMARK")
+    print("=" * 80)
+    meta = results["meta"]
+    print(f"{meta['docs']} docs, size={meta['size']}, seed={meta['seed']}, pdf={meta['pdf']}, "
+          f"{meta['chars']} chars")
+    for name, r in results["targets"].items():
+        print(f"\n{name}: {r['docs_per_sec']} docs/sec, p50 {r['p50_ms']} ms, p99 {r['p99_ms']} ms")
+        for stage, s in r["stages"].items():
+            print(f"  {stage:<10} mean {s['mean_ms']:>9} ms  p50 {s['p50_ms']:>9} ms  p99 {s['p99_ms']:>9} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scribe extraction benchmark")
+    parser.add_argument("--docs", type=int, default=200, help="Documents in the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", choices=["small", "medium", "large", "mixed"], default="mixed")
+    parser.add_argument("--pdf", action="store_true", help="Parse every log from a generated PDF")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated targets")
+    parser.add_argument("--model", default="en_core_web_sm", help="spaCy model for DailyLogExtractor")
+    parser.add_argument("--fast", action="store_true", help="DailyLogExtractor fast mode")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--save-baseline", help="Write results JSON as the baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        n_docs=args.docs, seed=args.seed, size=args.size, pdf=args.pdf,
+        targets=[t.strip() for t in args.targets.split(",") if t.strip()],
+        model_name=args.model, fast=args.fast, warmup=args.warmup,
+    )
+    print_results(results)
+
+    for path in filter(None, [args.out, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n[OK] Results written to {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        base_meta = baseline.get("meta", {})
+        for key in ("docs", "seed", "size", "pdf", "model", "fast"):
+            if base_meta.get(key) != results["meta"][key]:
+                print(f"[WARN] Baseline {key}={base_meta.get(key)!r} differs from this run ({results['meta'][key]!r})")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[FAIL] Regressions beyond {args.tolerance:.0%} vs {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n[OK] No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
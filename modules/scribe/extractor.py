@@ -11,19 +11,106 @@ Extracts 3 key fields:
 
 import spacy
 import re
+import hashlib
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Iterable, Iterator, List, Dict, Tuple
 from schema import (
     DailyLogExtraction,
     CompletedTask,
     Blocker,
     Incident,
-    TASK_COMPLETION_KEYWORDS,
-    BLOCKER_KEYWORDS,
-    INCIDENT_KEYWORDS,
-    LOCATION_PATTERNS,
     SITE_NAMES
 )
+from lexicon import (
+    SENTENCE_MATCHER,
+    LOCATION_MATCHER,
+    cause_from_hits,
+    severity_from_hits,
+    incident_type_from_hits,
+)
+
+
+def _strip_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Character offsets of text[start:end] with surrounding whitespace removed"""
+    chunk = text[start:end]
+    lead = len(chunk) - len(chunk.lstrip())
+    trail = len(chunk) - len(chunk.rstrip())
+    return start + lead, max(start + lead, end - trail)
+
+
+def _sent_bounds(sent) -> Tuple[int, int]:
+    """Stripped character offsets of a spaCy sentence within its doc"""
+    return _strip_bounds(sent.doc.text, sent.start_char, sent.end_char)
+
+
+class _SpanIndex:
+    """
+    Sorted, merged character intervals with O(log n) containment checks
+    """
+
+    def __init__(self, spans: Iterable[Tuple[int, int]] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in sorted(spans):
+            if self._starts and start <= self._ends[-1]:
+                # Overlaps the previous span: merge
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def contains(self, start: int, end: int) -> bool:
+        """Whether [start, end) lies inside one indexed span"""
+        i = bisect_right(self._starts, start) - 1
+        return i >= 0 and end <= self._ends[i]
+
+
+# === Incremental extraction ===
+# Paragraph separator; blocks never share a sentence across it
+BLOCK_SEPARATOR = re.compile(r"\n\s*\n")
+
+_Ent = namedtuple("_Ent", ["text", "label_"])
+
+
+class _TextDoc:
+    """Stands in for a spaCy Doc when sentences are rebuilt from cached blocks"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Sentence:
+    """Stands in for a spaCy sentence Span rebuilt from a cached block"""
+
+    def __init__(self, doc: _TextDoc, start_char: int, end_char: int, ents):
+        self.doc = doc
+        self.start_char = start_char
+        self.end_char = end_char
+        self.ents = ents
+
+    @property
+    def text(self) -> str:
+        return self.doc.text[self.start_char:self.end_char]
+
+
+def _split_blocks(text: str) -> List[Tuple[int, str]]:
+    """(offset, text) of each non-blank paragraph block"""
+    blocks = []
+    start = 0
+    for sep in BLOCK_SEPARATOR.finditer(text):
+        if text[start:sep.start()].strip():
+            blocks.append((start, text[start:sep.start()]))
+        start = sep.end()
+    if text[start:].strip():
+        blocks.append((start, text[start:]))
+    return blocks
+
+
+# Components the extractor never reads in fast mode (sentences come from senter,
+# entities from a lazily loaded NER pipeline)
+FAST_MODE_DISABLED = ["tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
 
 
 class DailyLogExtractor:
@@ -32,11 +119,36 @@ class DailyLogExtractor:
     using spaCy NLP and rule-based patterns
     """
 
-    def __init__(self, model_name: str = "en_core_web_sm"):
-        """Initialize the extractor with spaCy model"""
+    def __init__(self, model_name: str = "en_core_web_sm", fast: bool = False,
+                 block_cache_size: int = 4096):
+        """
+        Initialize the extractor with spaCy model
+
+        Args:
+            model_name: spaCy pipeline to load
+            fast: Trimmed pipeline for throughput: sentence boundaries come from
+                the lightweight `senter` instead of the dependency parser, and NER
+                only runs on the sentences whose location the regex patterns miss.
+                Off by default: NER sees such a sentence without the rest of the
+                log, so an entity-only task location can differ from full mode
+                (tests/test_fast_mode.py checks every other field agrees)
+            block_cache_size: Paragraph blocks remembered by extract_incremental
+        """
+        self.model_name = model_name
+        self.fast = fast
+        self._ner_nlp = None
+        self._block_cache = OrderedDict()  # sha256 of block text -> cached sentences
+        self._block_cache_size = block_cache_size
         try:
-            self.nlp = spacy.load(model_name)
-            print(f"[OK] Loaded spaCy model: {model_name}")
+            if fast:
+                self.nlp = spacy.load(model_name, disable=FAST_MODE_DISABLED)
+                if "senter" in self.nlp.component_names and "senter" in self.nlp.disabled:
+                    self.nlp.enable_pipe("senter")
+                elif not self.nlp.has_pipe("senter"):
+                    self.nlp.add_pipe("sentencizer")
+            else:
+                self.nlp = spacy.load(model_name)
+            print(f"[OK] Loaded spaCy model: {model_name}" + (" (fast mode)" if fast else ""))
         except OSError:
             print(f"[ERROR] Model '{model_name}' not found.")
             print("Please run: python -m spacy download en_core_web_sm")
@@ -52,6 +164,85 @@ class DailyLogExtractor:
         Returns:
             DailyLogExtraction object with all extracted fields
         """
+        return self._extract_from_doc(text, self.nlp(text))
+
+    def extract_many(self, texts: Iterable[str], batch_size: int = 32,
+                     n_process: int = 1) -> Iterator[DailyLogExtraction]:
+        """
+        Bulk extraction - streams texts through nlp.pipe
+
+        Args:
+            texts: Raw daily log texts
+            batch_size: Texts per spaCy batch
+            n_process: spaCy worker processes (1 = in-process)
+
+        Yields:
+            DailyLogExtraction objects, in input order
+        """
+        # spaCy docs keep the exact input text, so doc.text is the raw log
+        for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+            yield self._extract_from_doc(doc.text, doc)
+
+    def extract_incremental(self, text: str) -> DailyLogExtraction:
+        """
+        Extraction for logs that are re-submitted with edits or appended paragraphs
+
+        The log is split into paragraph blocks. spaCy and the keyword scan only
+        run on blocks not seen before (cached by content hash); the document-level
+        rules (header incidents, de-duplication, blocker filtering) then run over
+        the sentences of all blocks, so results are merged across blocks.
+
+        Args:
+            text: Raw daily log text
+
+        Returns:
+            DailyLogExtraction object with all extracted fields
+        """
+        blocks = _split_blocks(text)
+        keys = [hashlib.sha256(block.encode("utf-8")).hexdigest() for _, block in blocks]
+
+        missing = OrderedDict()
+        for key, (_, block) in zip(keys, blocks):
+            if key in self._block_cache:
+                self._block_cache.move_to_end(key)
+            else:
+                missing[key] = block
+        for key, block_doc in zip(missing, self.nlp.pipe(missing.values())):
+            self._block_cache[key] = [
+                (sent.start_char, sent.end_char,
+                 None if self.fast else tuple(_Ent(e.text, e.label_) for e in sent.ents),
+                 SENTENCE_MATCHER.scan(sent.text.lower()))
+                for sent in block_doc.sents
+            ]
+        while len(self._block_cache) > max(self._block_cache_size, len(blocks)):
+            self._block_cache.popitem(last=False)
+
+        # Rebuild the document's sentences at their offsets in the full text
+        doc = _TextDoc(text)
+        sentences, hits = [], []
+        for key, (offset, _) in zip(keys, blocks):
+            for start, end, ents, sent_hits in self._block_cache[key]:
+                sentences.append(_Sentence(doc, offset + start, offset + end, ents))
+                hits.append(sent_hits)
+
+        return self._extract_fields(text, doc, sentences, hits)
+
+    def clear_block_cache(self):
+        self._block_cache.clear()
+
+    def _extract_from_doc(self, text: str, doc) -> DailyLogExtraction:
+        """Run the field extractors over an already processed doc"""
+
+        # Split into sentences for analysis
+        sentences = list(doc.sents)
+
+        # Scan every sentence once for all keyword categories
+        hits = [SENTENCE_MATCHER.scan(sent.text.lower()) for sent in sentences]
+
+        return self._extract_fields(text, doc, sentences, hits)
+
+    def _extract_fields(self, text: str, doc, sentences, hits) -> DailyLogExtraction:
+        """Run the field extractors over sentences and their keyword hits"""
 
         # Initialize extraction result
         extraction = DailyLogExtraction(raw_text=text)
@@ -61,21 +252,12 @@ class DailyLogExtractor:
         extraction.site_name = self._extract_site_name(text)
         extraction.submitted_by = self._extract_manager_name(text)
 
-        # Process text with spaCy
-        doc = self.nlp(text)
-
-        # Split into sentences for analysis
-        sentences = list(doc.sents)
-
         # Extract the 3 core fields
         # IMPORTANT: Extract incidents FIRST to prevent misclassification as blockers
-        extraction.incidents = self._extract_incidents(sentences, doc)
+        extraction.incidents, incident_spans = self._extract_incidents(sentences, doc, hits)
 
-        # Get sentence indices that are already classified as incidents
-        incident_sentences = set(inc.description for inc in extraction.incidents)
-
-        extraction.completed_tasks = self._extract_tasks(sentences, doc)
-        extraction.blockers = self._extract_blockers(sentences, doc, incident_sentences)
+        extraction.completed_tasks = self._extract_tasks(sentences, doc, hits)
+        extraction.blockers = self._extract_blockers(sentences, doc, incident_spans, hits)
 
         # Calculate statistics
         extraction.calculate_stats()
@@ -139,11 +321,13 @@ class DailyLogExtractor:
                 return match.group(1).strip()
         return None
 
-    def _extract_tasks(self, sentences, doc) -> List[CompletedTask]:
+    def _extract_tasks(self, sentences, doc, hits=None) -> List[CompletedTask]:
         """Extract completed tasks from text"""
         tasks = []
+        if hits is None:
+            hits = [SENTENCE_MATCHER.scan(sent.text.lower()) for sent in sentences]
 
-        for sent in sentences:
+        for sent, sent_hits in zip(sentences, hits):
             sent_text = sent.text.lower()
 
             # Skip very short sentences that are likely continuations
@@ -155,7 +339,7 @@ class DailyLogExtractor:
                 continue
 
             # Check if sentence contains task completion keywords
-            has_completion_keyword = any(kw in sent_text for kw in TASK_COMPLETION_KEYWORDS)
+            has_completion_keyword = "task" in sent_hits
 
             if has_completion_keyword:
                 # Skip sentences that are just measurements/summaries
@@ -167,7 +351,7 @@ class DailyLogExtractor:
                     continue
 
                 # Skip crew count metadata
-                if "crew count" in sent_text:
+                if "crew_count" in sent_hits:
                     continue
 
                 # Extract task details
@@ -192,55 +376,51 @@ class DailyLogExtractor:
 
         return tasks
 
-    def _extract_blockers(self, sentences, doc, incident_sentences=None) -> List[Blocker]:
+    def _extract_blockers(self, sentences, doc, incident_spans=None, hits=None) -> List[Blocker]:
         """Extract blocking issues from text"""
         blockers = []
-        if incident_sentences is None:
-            incident_sentences = set()
-
-        for sent in sentences:
-            sent_text = sent.text.lower()
-
-            # Skip if this sentence is already classified as an incident
-            if sent.text.strip() in incident_sentences:
+        if incident_spans is None:
+            incident_spans = _SpanIndex()
+        if hits is None:
+            hits = [SENTENCE_MATCHER.scan(sent.text.lower()) for sent in sentences]
+
+        for sent, sent_hits in zip(sentences, hits):
+            # Skip if this sentence lies inside a detected incident
+            if incident_spans.contains(*_sent_bounds(sent)):
                 continue
 
             # Skip if sentence contains strong incident indicators
-            if any(indicator in sent_text for indicator in ["incident", "safety incident", "accident", "injury", "injured", "tipped over", "fall", "fell"]):
+            if "incident_indicator" in sent_hits:
                 continue
 
             # Skip incident-related investigation/inspection sentences
-            if ("inspected" in sent_text or "inspection" in sent_text) and any(word in sent_text for word in ["lift", "platform", "failed", "ground"]):
+            if "inspection" in sent_hits and "inspection_subject" in sent_hits:
                 continue
 
             # Check for blocker keywords
-            has_blocker_keyword = any(kw in sent_text for kw in BLOCKER_KEYWORDS)
+            has_blocker_keyword = "blocker" in sent_hits
 
             if has_blocker_keyword:
-                # Determine the cause category
-                cause = None
-                if any(word in sent_text for word in ['material', 'supply', 'delivery', 'shortage', 'steel', 'concrete', 'rebar']):
-                    cause = "material_delay"
-                elif any(word in sent_text for word in ['equipment', 'crane', 'machine']):
-                    cause = "equipment_failure"
-                elif any(word in sent_text for word in ['weather', 'rain', 'wind', 'storm']):
-                    cause = "weather"
-                elif any(word in sent_text for word in ['approval', 'permit']):
-                    cause = "approval_delay"
-
                 blocker = Blocker(
                     issue=sent.text.strip(),
                     affected_task=None,  # Could be enhanced to extract this
-                    cause=cause
+                    cause=cause_from_hits(sent_hits)  # Determine the cause category
                 )
                 blockers.append(blocker)
 
         return blockers
 
-    def _extract_incidents(self, sentences, doc) -> List[Incident]:
-        """Extract incidents from text"""
+    def _extract_incidents(self, sentences, doc, hits=None) -> Tuple[List[Incident], _SpanIndex]:
+        """
+        Extract incidents from text
+
+        Returns:
+            The incidents, and an index of their character spans in the doc
+        """
         incidents = []
         text = doc.text
+        if hits is None:
+            hits = [SENTENCE_MATCHER.scan(sent.text.lower()) for sent in sentences]
 
         # Look for incident header patterns (like "SAFETY INCIDENT - MAJOR:")
         # Match from "SAFETY INCIDENT" until we hit a paragraph break or blocker section
@@ -248,25 +428,26 @@ class DailyLogExtractor:
         matches = list(re.finditer(incident_header_pattern, text, re.IGNORECASE | re.DOTALL))
 
         # De-duplicate: Remove matches that are just section headers without content
-        final_matches = []
+        candidates = []
         for match in matches:
-            match_text = match.group(0).strip()
+            start, end = _strip_bounds(text, match.start(), match.end())
 
             # Skip if it's just the header line with minimal description
             # A real incident should have at least 80 characters
-            if len(match_text) < 80:
+            if end - start < 80:
                 continue
+            candidates.append((start, -end, match))
 
-            # Check if this match is a substring of another match
-            is_duplicate = False
-            for other_match in matches:
-                if match != other_match:
-                    if match_text in other_match.group(0) and len(match_text) < len(other_match.group(0)):
-                        is_duplicate = True
-                        break
-
-            if not is_duplicate:
-                final_matches.append(match)
+        # Sweep by start (longest first): drop blocks that lie inside an earlier, longer block
+        final_matches = []
+        block_spans = []
+        covered_to = -1
+        for start, neg_end, match in sorted(candidates, key=lambda c: (c[0], c[1])):
+            if -neg_end <= covered_to:
+                continue
+            covered_to = -neg_end
+            final_matches.append(match)
+            block_spans.append((start, -neg_end))
 
         for match in final_matches:
             incident_block = match.group(0)
@@ -276,10 +457,8 @@ class DailyLogExtractor:
             severity = "minor"
             if severity_match and severity_match.lower() == "major":
                 severity = "major"
-            elif any(word in incident_block.lower() for word in ['major', 'serious', 'severe', 'critical']):
-                severity = "major"
-            elif any(word in incident_block.lower() for word in ['moderate', 'significant']):
-                severity = "moderate"
+            else:
+                severity = severity_from_hits(SENTENCE_MATCHER.scan(incident_block.lower()))
 
             # Extract action taken
             action_taken = self._extract_action_taken(incident_block)
@@ -293,62 +472,69 @@ class DailyLogExtractor:
             incidents.append(incident)
 
         # Also check sentence-by-sentence for incidents not caught by headers
-        for sent in sentences:
+        block_index = _SpanIndex(block_spans)
+        sentence_spans = []
+        for sent, sent_hits in zip(sentences, hits):
             sent_text = sent.text.lower()
+            bounds = _sent_bounds(sent)
 
             # Skip if already part of a detected incident block
-            if any(sent.text.strip() in inc.description for inc in incidents):
+            if block_index.contains(*bounds):
                 continue
 
             # Skip generic headers or metadata
             if sent_text.strip() in ["incidents and issues:", "incidents:", "incident and issues"]:
                 continue
-            if "crew count" in sent_text or "operations continue" in sent_text:
+            if "crew_count" in sent_hits or "operations_continue" in sent_hits:
                 continue
 
             # Skip if sentence contains "SAFETY INCIDENT" (these should be caught by block detection)
-            if "safety incident" in sent_text or "incident -" in sent_text:
+            if "safety_incident_header" in sent_hits:
                 continue
 
-            # Check each incident category
-            for incident_type, keywords in INCIDENT_KEYWORDS.items():
-                if any(kw in sent_text for kw in keywords):
-
-                    # Determine severity
-                    severity = "minor"
-                    if any(word in sent_text for word in ['major', 'serious', 'severe', 'critical']):
-                        severity = "major"
-                    elif any(word in sent_text for word in ['moderate', 'significant']):
-                        severity = "moderate"
-
-                    incident = Incident(
-                        incident_type=incident_type,
-                        description=sent.text.strip(),
-                        severity=severity,
-                        action_taken=self._extract_action_taken(sent.text)
-                    )
-                    incidents.append(incident)
-                    break  # Only classify as one type
+            # Only classify as one type (the first category in INCIDENT_KEYWORDS order)
+            incident_type = incident_type_from_hits(sent_hits)
+            if incident_type:
+                incident = Incident(
+                    incident_type=incident_type,
+                    description=sent.text.strip(),
+                    severity=severity_from_hits(sent_hits),
+                    action_taken=self._extract_action_taken(sent.text)
+                )
+                incidents.append(incident)
+                sentence_spans.append(bounds)
 
-        return incidents
+        incident_spans = _SpanIndex(block_spans + sentence_spans)
+        return incidents, incident_spans
 
     def _extract_location_from_span(self, span) -> str:
         """Extract location mentions from a text span"""
         text = span.text
 
-        # Try to find location patterns
-        for pattern in LOCATION_PATTERNS:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
+        # Try to find location patterns (first pattern in LOCATION_PATTERNS order wins)
+        location = LOCATION_MATCHER.first(text)
+        if location:
+            return location
 
         # Also check for named entities that might be locations
-        for ent in span.ents:
+        for ent in self._span_ents(span):
             if ent.label_ in ['GPE', 'LOC', 'FAC']:  # Geopolitical, Location, Facility
                 return ent.text
 
         return None
 
+    def _span_ents(self, span):
+        """Named entities of a span; in fast mode NER is run on demand for just this span"""
+        if not self.fast:
+            return span.ents
+        if self._ner_nlp is None:
+            # Keep tok2vec in case NER listens to the shared embedding layer
+            self._ner_nlp = spacy.load(
+                self.model_name,
+                exclude=[name for name in self.nlp.component_names if name not in ("tok2vec", "ner")],
+            )
+        return self._ner_nlp(span.text).ents
+
     def _extract_crew_name(self, text: str) -> str:
         """Extract contractor/crew name from text"""
         # Common crew name patterns
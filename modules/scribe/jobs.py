@@ -0,0 +1,330 @@
+"""
+ROSHN PULSE Module 3: Report Job Queue
+=======================================
+Background PDF report generation for the Scribe service
+
+Jobs are kept in SQLite, so their state survives restarts and is shared by
+the API process and the worker processes. Workers claim queued jobs
+atomically, render with ReportGenerator, and write the PDF under a
+content-addressed name (SHA-256 of the extraction), so identical reports are
+rendered once and concurrent jobs never collide on a filename.
+
+A supervisor thread restarts workers that exit. A job whose worker crashed
+while rendering it is marked failed. A worker that cannot start (e.g.
+ReportGenerator fails to import) is retried with exponential backoff; while
+no worker is running, queued and newly submitted jobs fail with its error
+instead of waiting forever.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    pdf_name TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    worker INTEGER
+);
+CREATE INDEX IF NOT EXISTS report_jobs_status ON report_jobs (status, created);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# Worker states; a worker that could not start is FAILED as well
+STARTING, READY, STOPPED = "starting", "ready", "stopped"
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _claim(conn: sqlite3.Connection, pid: int) -> Optional[tuple]:
+    """Atomically move the oldest queued job to running, owned by worker pid"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id, digest, payload FROM report_jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE report_jobs SET status = ?, started = ?, worker = ? WHERE id = ?",
+                (RUNNING, time.time(), pid, row[0]),
+            )
+        conn.execute("COMMIT")
+        return row
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _finish(conn: sqlite3.Connection, job_id: str, status: str, pdf_name: str = None, error: str = None):
+    conn.execute(
+        "UPDATE report_jobs SET status = ?, pdf_name = ?, error = ?, finished = ? WHERE id = ?",
+        (status, pdf_name, error, time.time(), job_id),
+    )
+
+
+def report_name(digest: str) -> str:
+    return f"report_{digest[:32]}.pdf"
+
+
+def _worker_main(index: int, db_path: str, reports_dir: str, wake, stop, events):
+    """Worker process: render queued jobs until stop is set"""
+    try:
+        from report_generator import ReportGenerator
+        from schema import DailyLogExtraction
+
+        generator = ReportGenerator()
+        conn = _connect(db_path)
+    except Exception as e:
+        events.put(("failed", index, f"{e.__class__.__name__}: {e}"))
+        return
+    events.put(("ready", index, os.getpid()))
+
+    reports = Path(reports_dir)
+    while not stop.is_set():
+        # Cleared before claiming, so a submit() racing with an empty claim still wakes us
+        wake.clear()
+        job = _claim(conn, os.getpid())
+        if job is None:
+            wake.wait(timeout=1.0)
+            continue
+
+        job_id, digest, payload = job
+        pdf_name = report_name(digest)
+        target = reports / pdf_name
+        try:
+            if not target.exists():
+                # Render to a private temp name, then publish atomically
+                tmp = reports / f".{pdf_name}.{os.getpid()}.tmp"
+                result = DailyLogExtraction.model_validate_json(payload)
+                generator.generate_pdf(result, str(tmp))
+                os.replace(tmp, target)
+            _finish(conn, job_id, DONE, pdf_name=pdf_name)
+        except Exception as e:
+            _finish(conn, job_id, FAILED, error=str(e) or e.__class__.__name__)
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, index: int, wake):
+        self.index = index
+        self.wake = wake
+        self.process = None
+        self.pid: Optional[int] = None
+        self.state = STARTING
+        self.restarts = 0
+        self.start_failures = 0
+        self.next_start = 0.0
+        self.last_error: Optional[str] = None
+
+
+class ReportJobQueue:
+    """SQLite-backed PDF report queue served by local worker processes"""
+
+    def __init__(self, db_path: str = "data/report_jobs.sqlite3", reports_dir: str = "data/reports",
+                 workers: int = 2, max_backoff: float = 60.0):
+        """
+        Args:
+            db_path: SQLite file holding job state
+            reports_dir: Where finished PDFs are written
+            workers: Number of rendering processes
+            max_backoff: Longest wait, in seconds, between restarts of a worker that fails to start
+        """
+        self.db_path = str(db_path)
+        self.reports_dir = Path(reports_dir)
+        self.workers = max(1, workers)
+        self.max_backoff = max_backoff
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = _connect(self.db_path)
+        self._lock = threading.Lock()
+        self._conn.executescript(_SCHEMA)
+        # Jobs that were running when the service last stopped are retried
+        self._conn.execute("UPDATE report_jobs SET status = ?, started = NULL WHERE status = ?", (QUEUED, RUNNING))
+
+        self._ctx = mp.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._events = self._ctx.Queue()
+        # One wake event per worker: a shared one is cleared by whichever worker sees it first
+        self._workers = [_Worker(i, self._ctx.Event()) for i in range(self.workers)]
+        self._supervisor = None
+
+    # --- Worker lifecycle (supervisor thread only) ---
+    def _spawn(self, worker: _Worker):
+        worker.state = STARTING
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.index, self.db_path, str(self.reports_dir), worker.wake, self._stop, self._events),
+            name=f"report-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        worker.pid = worker.process.pid
+
+    def _fail_jobs(self, where: str, params: tuple, error: str):
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE report_jobs SET status = ?, error = ?, finished = ? WHERE {where}",
+                (FAILED, error, time.time(), *params),
+            )
+
+    def _start_failed(self, worker: _Worker, error: str):
+        worker.state, worker.last_error = FAILED, error
+        worker.start_failures += 1
+        worker.next_start = time.monotonic() + min(self.max_backoff, 2.0 ** (worker.start_failures - 1))
+        # Nobody can render: fail what is waiting instead of leaving it queued
+        if not any(w.state == READY for w in self._workers):
+            self._fail_jobs("status = ?", (QUEUED,), f"report worker failed to start: {error}")
+
+    def _handle_events(self):
+        while True:
+            try:
+                kind, index, value = self._events.get_nowait()
+            except queue.Empty:
+                return
+            worker = self._workers[index]
+            if kind == "ready":
+                worker.state, worker.start_failures = READY, 0
+            else:
+                self._start_failed(worker, value)
+
+    def _reap(self, worker: _Worker):
+        """Account for a worker process that has exited"""
+        self._handle_events()  # a start-up failure is reported just before exiting
+        code = worker.process.exitcode
+        worker.process = None
+        if worker.state == STARTING:
+            self._start_failed(worker, f"worker exited with code {code} during start-up")
+        elif worker.state == READY:
+            worker.last_error = f"worker exited with code {code}"
+            worker.restarts += 1
+            worker.state = STARTING
+            # Its job may be what killed it: fail that one rather than retry it forever
+            self._fail_jobs(
+                "status = ? AND worker = ?", (RUNNING, worker.pid), f"report worker crashed: {worker.last_error}"
+            )
+
+    def _supervise(self):
+        for worker in self._workers:
+            self._spawn(worker)
+        while not self._stop.wait(0.5):
+            self._handle_events()
+            for worker in self._workers:
+                if worker.process is not None and not worker.process.is_alive():
+                    self._reap(worker)
+                if worker.process is None and time.monotonic() >= worker.next_start:
+                    self._spawn(worker)
+        self._handle_events()
+
+    # --- Public API ---
+    def start(self):
+        self._supervisor = threading.Thread(target=self._supervise, name="report-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for worker in self._workers:
+            worker.wake.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=timeout)
+            self._supervisor = None
+        for worker in self._workers:
+            proc = worker.process
+            if proc is not None:
+                proc.join(timeout=timeout)
+                if proc.is_alive():
+                    proc.terminate()
+            worker.process = None
+            worker.state = STOPPED
+
+    def submit(self, extraction) -> dict:
+        """
+        Queue a report for a DailyLogExtraction
+
+        Returns:
+            Job status dictionary (see status())
+        """
+        payload = extraction.model_dump_json()
+        digest = hashlib.sha256(
+            json.dumps(json.loads(payload), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._lock:
+            # The same extraction was already rendered: nothing to do
+            if (self.reports_dir / report_name(digest)).exists():
+                self._conn.execute(
+                    "INSERT INTO report_jobs (id, status, digest, payload, pdf_name, created, started, finished) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, DONE, digest, payload, report_name(digest), now, now, now),
+                )
+            elif all(w.state == FAILED for w in self._workers):
+                # No worker could start: fail now rather than queue a job nobody will render
+                self._conn.execute(
+                    "INSERT INTO report_jobs (id, status, digest, payload, error, created, finished) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, FAILED, digest, payload,
+                     f"report worker failed to start: {self._workers[0].last_error}", now, now),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT INTO report_jobs (id, status, digest, payload, created) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, digest, payload, now),
+                )
+                for worker in self._workers:
+                    worker.wake.set()
+        return self.status(job_id)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, pdf_name, error, created, started, finished FROM report_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ["job_id", "status", "pdf_name", "error", "created", "started", "finished"]
+        return dict(zip(keys, row))
+
+    def health(self) -> dict:
+        """Worker status with one entry per worker, plus queue depth"""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM report_jobs WHERE status IN (?, ?) GROUP BY status", (QUEUED, RUNNING)
+            ).fetchall())
+        workers = [{
+            "index": w.index,
+            "pid": w.pid,
+            "state": w.state,
+            "alive": w.process is not None and w.process.is_alive(),
+            "restarts": w.restarts,
+            "start_failures": w.start_failures,
+            "last_error": w.last_error,
+        } for w in self._workers]
+        return {
+            "workers": workers,
+            "ready": sum(w["state"] == READY for w in workers),
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+        }
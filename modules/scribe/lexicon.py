@@ -0,0 +1,197 @@
+"""
+ROSHN PULSE Module 3: Compiled Lexical Matchers
+================================================
+Single-pass keyword and pattern matching for the Scribe extractors
+
+Keyword sets are compiled once at import into one automaton, so a single scan
+of a sentence reports every category it hits (tasks, blockers, incident types,
+causes, severities, ...) instead of one `kw in text` scan per keyword.
+Matching keeps the substring semantics of the original `any(kw in text ...)`
+checks.
+
+Uses pyahocorasick when it is installed (optional, see backend/requirements.txt);
+otherwise falls back to a trie-shaped regular expression that the `re` engine
+scans in a single pass. tests/test_lexicon.py checks both against the naive
+keyword and pattern checks.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # pragma: no cover
+    ahocorasick = None
+
+from schema import (
+    TASK_COMPLETION_KEYWORDS,
+    BLOCKER_KEYWORDS,
+    INCIDENT_KEYWORDS,
+    LOCATION_PATTERNS,
+)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie; it matches the longest word at a position"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: the longer word wins, the shorter one still matches
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Matches many keyword groups in one pass over a text"""
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """
+        Args:
+            groups: Mapping of group name to keywords (matched case-sensitively,
+                so pass lowercase keywords and scan lowercased text)
+        """
+        keyword_groups: Dict[str, set] = {}
+        for group, words in groups.items():
+            for word in words:
+                keyword_groups.setdefault(word, set()).add(group)
+        self.groups = frozenset(groups)
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word, word_groups in keyword_groups.items():
+                self._automaton.add_word(word, frozenset(word_groups))
+            self._automaton.make_automaton()
+            self._regex = None
+        else:
+            self._automaton = None
+            # At each position the trie regex reports only the longest keyword,
+            # so every keyword carries the groups of the keywords it starts with
+            self._closure = {
+                word: frozenset().union(*(
+                    keyword_groups[word[:i]] for i in range(1, len(word) + 1) if word[:i] in keyword_groups
+                ))
+                for word in keyword_groups
+            }
+            self._regex = re.compile(_trie_pattern(keyword_groups))
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """
+        Return the names of all groups with at least one keyword in text
+        """
+        hits = set()
+        if self._automaton is not None:
+            for _, word_groups in self._automaton.iter(text):
+                hits |= word_groups
+        else:
+            # Resume one character after each match start so overlapping
+            # keywords are still seen; positions in between are skipped in C
+            search = self._regex.search
+            match = search(text)
+            while match is not None:
+                hits |= self._closure[match.group()]
+                match = search(text, match.start() + 1)
+        return frozenset(hits)
+
+
+def _scoped(pattern: str) -> str:
+    """Turn a leading global inline flag like (?i) into a scoped group, so patterns can be fused"""
+    match = re.match(r"^\(\?([aiLmsux]+)\)", pattern)
+    if match:
+        return f"(?{match.group(1)}:{pattern[match.end():]})"
+    return f"(?:{pattern})"
+
+
+class PatternMatcher:
+    """Fused alternation over an ordered list of regex patterns"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        alternation = "|".join(f"(?P<p{i}>{_scoped(p)})" for i, p in enumerate(self.patterns))
+        # Lookahead so that overlapping matches of different patterns are all seen
+        self._regex = re.compile(f"(?=(?:{alternation}))")
+
+    def first(self, text: str) -> Optional[str]:
+        """
+        Same result as trying re.search with each pattern in order and
+        returning the first hit, but in a single pass over the text
+        """
+        best_index = None
+        best_text = None
+        for match in self._regex.finditer(text):
+            index = int(match.lastgroup[1:])
+            if best_index is None or index < best_index:
+                best_index = index
+                best_text = match.group(match.lastgroup)
+                if index == 0:
+                    break
+        return best_text
+
+
+# === Sentence-level categories used by DailyLogExtractor ===
+
+# Incident types in priority order (a sentence is classified as the first type it hits)
+INCIDENT_TYPES = list(INCIDENT_KEYWORDS)
+
+# Blocker causes in priority order
+CAUSES = ["material_delay", "equipment_failure", "weather", "approval_delay"]
+
+SENTENCE_GROUPS = {
+    "task": TASK_COMPLETION_KEYWORDS,
+    "blocker": BLOCKER_KEYWORDS,
+    **{f"incident:{t}": kws for t, kws in INCIDENT_KEYWORDS.items()},
+    # Strong incident wording that keeps a sentence out of the blockers
+    "incident_indicator": ["incident", "safety incident", "accident", "injury", "injured",
+                           "tipped over", "fall", "fell"],
+    "safety_incident_header": ["safety incident", "incident -"],
+    "inspection": ["inspected", "inspection"],
+    "inspection_subject": ["lift", "platform", "failed", "ground"],
+    "cause:material_delay": ["material", "supply", "delivery", "shortage", "steel", "concrete", "rebar"],
+    "cause:equipment_failure": ["equipment", "crane", "machine"],
+    "cause:weather": ["weather", "rain", "wind", "storm"],
+    "cause:approval_delay": ["approval", "permit"],
+    "severity:major": ["major", "serious", "severe", "critical"],
+    "severity:moderate": ["moderate", "significant"],
+    "crew_count": ["crew count"],
+    "operations_continue": ["operations continue"],
+}
+
+SENTENCE_MATCHER = KeywordMatcher(SENTENCE_GROUPS)
+LOCATION_MATCHER = PatternMatcher(LOCATION_PATTERNS)
+
+
+def cause_from_hits(hits: FrozenSet[str]) -> Optional[str]:
+    """First blocker cause present in a scan result"""
+    for cause in CAUSES:
+        if f"cause:{cause}" in hits:
+            return cause
+    return None
+
+
+def severity_from_hits(hits: FrozenSet[str]) -> str:
+    """Incident severity from a scan result"""
+    if "severity:major" in hits:
+        return "major"
+    if "severity:moderate" in hits:
+        return "moderate"
+    return "minor"
+
+
+def incident_type_from_hits(hits: FrozenSet[str]) -> Optional[str]:
+    """First incident type present in a scan result"""
+    for incident_type in INCIDENT_TYPES:
+        if f"incident:{incident_type}" in hits:
+            return incident_type
+    return None
@@ -0,0 +1,295 @@
+"""
+ROSHN PULSE Module 3: Extractor Worker Pool
+============================================
+Pre-warmed DailyLogExtractor processes for serving extraction
+
+spaCy is loaded once per worker process, when the pool starts, so requests
+never pay model start-up and NLP work runs on as many cores as there are
+workers instead of inside the caller's event loop.
+
+Requests wait in one bounded queue; submit() fails fast with PoolFull when it
+is at capacity instead of letting a backlog build up. Each worker process is
+driven by its own dispatcher thread, which tracks the worker's health and
+starts a fresh process if it crashes or overruns the task timeout. Failed
+starts are retried with exponential backoff; a slot is only given up after
+start_attempts failures in a row.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+STARTING, IDLE, BUSY, FAILED, STOPPED = "starting", "idle", "busy", "failed", "stopped"
+
+
+class PoolFull(RuntimeError):
+    """Raised by submit() when the pending queue is at capacity"""
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised for a request whose worker process died or timed out while serving it"""
+
+
+def _worker_main(conn, model_name: str, fast: bool):
+    """Worker process: load the model once, then serve texts until told to stop"""
+    try:
+        from extractor import DailyLogExtractor
+
+        extractor = DailyLogExtractor(model_name, fast=fast)
+    except Exception as e:
+        conn.send(("failed", f"{e.__class__.__name__}: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            text = conn.recv()
+        except EOFError:
+            return
+        if text is None:
+            return
+        try:
+            conn.send(("ok", extractor.extract_from_text(text)))
+        except Exception as e:
+            conn.send(("error", f"{e.__class__.__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.pid: Optional[int] = None
+        self.state = STARTING
+        self.served = 0
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.busy_since: Optional[float] = None
+        self.ready = threading.Event()
+
+
+class ExtractorPool:
+    """Pool of pre-warmed DailyLogExtractor worker processes"""
+
+    def __init__(self, workers: int = 2, model_name: str = "en_core_web_sm", fast: bool = False,
+                 max_pending: int = 64, task_timeout: float = 120.0, start_timeout: float = 120.0,
+                 start_attempts: int = 5, max_backoff: float = 30.0):
+        """
+        Args:
+            workers: Number of worker processes
+            model_name: spaCy pipeline each worker loads
+            fast: Run workers in the trimmed fast mode (see DailyLogExtractor)
+            max_pending: Requests allowed to wait for a free worker
+            task_timeout: Seconds one extraction may take before its worker is restarted
+            start_timeout: Seconds a worker may take to load its model
+            start_attempts: Consecutive failed starts before a worker slot is given up
+            max_backoff: Longest wait, in seconds, between start attempts
+        """
+        self.workers = max(1, workers)
+        self.model_name = model_name
+        self.fast = fast
+        self.max_pending = max(1, max_pending)
+        self.task_timeout = task_timeout
+        self.start_timeout = start_timeout
+        self.start_attempts = max(1, start_attempts)
+        self.max_backoff = max_backoff
+        # spawn: forking a threaded server process is not safe
+        self._ctx = mp.get_context("spawn")
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        self._closed = threading.Event()
+        self._workers = [_Worker(i) for i in range(self.workers)]
+        self._threads = []
+        for worker in self._workers:
+            thread = threading.Thread(
+                target=self._run, args=(worker,), name=f"extractor-dispatch-{worker.index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    # --- Worker lifecycle (dispatcher thread only) ---
+    def _start(self, worker: _Worker) -> bool:
+        worker.state = STARTING
+        worker.ready.clear()
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(child, self.model_name, self.fast),
+            name=f"extractor-worker-{worker.index}",
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        worker.process, worker.conn, worker.pid = proc, parent, proc.pid
+
+        try:
+            if not parent.poll(self.start_timeout):
+                raise WorkerCrashed(f"model not loaded after {self.start_timeout}s")
+            status, value = parent.recv()
+        except (EOFError, OSError, WorkerCrashed) as e:
+            status, value = "failed", str(e) or "worker exited during start-up"
+        if status != "ready":
+            worker.last_error = value
+            self._stop_process(worker)
+            worker.state = FAILED
+            return False
+
+        worker.state = IDLE
+        worker.ready.set()
+        return True
+
+    def _start_with_retry(self, worker: _Worker) -> bool:
+        """Start the worker, backing off between failed attempts while the pool is open"""
+        for attempt in range(self.start_attempts):
+            if self._closed.is_set():
+                break
+            if self._start(worker):
+                return True
+            if attempt + 1 == self.start_attempts:
+                break
+            # FAILED until the next attempt; submit() fails fast meanwhile
+            if self._closed.wait(min(self.max_backoff, 2.0 ** attempt)):
+                break
+        worker.ready.set()  # warm() stops waiting once a slot is given up
+        return False
+
+    def _stop_process(self, worker: _Worker):
+        proc, conn = worker.process, worker.conn
+        if conn is not None:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        if proc is not None:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.kill()
+                proc.join()
+        if conn is not None:
+            conn.close()
+        worker.process = worker.conn = None
+
+    def _serve(self, worker: _Worker, text: str):
+        """Run one text on the worker; raises WorkerCrashed if it dies or hangs"""
+        try:
+            worker.conn.send(text)
+            deadline = time.monotonic() + self.task_timeout
+            while not worker.conn.poll(0.5):
+                if not worker.process.is_alive():
+                    raise WorkerCrashed(f"worker exited with code {worker.process.exitcode}")
+                if time.monotonic() > deadline:
+                    raise WorkerCrashed(f"extraction exceeded {self.task_timeout}s")
+            return worker.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerCrashed(f"worker connection lost: {e.__class__.__name__}")
+
+    def _run(self, worker: _Worker):
+        if not self._start_with_retry(worker):
+            return
+        while not self._closed.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            future, text = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            worker.state, worker.busy_since = BUSY, time.time()
+            try:
+                status, value = self._serve(worker, text)
+            except WorkerCrashed as e:
+                future.set_exception(e)
+                worker.last_error = str(e)
+                worker.restarts += 1
+                worker.state = STARTING
+                self._stop_process(worker)
+                if not self._start_with_retry(worker):
+                    break
+                continue
+            finally:
+                worker.busy_since = None
+            worker.served += 1
+            worker.state = IDLE
+            if status == "ok":
+                future.set_result(value)
+            else:
+                worker.last_error = value
+                future.set_exception(RuntimeError(value))
+
+        self._stop_process(worker)
+        if worker.state != FAILED:
+            worker.state = STOPPED
+
+    # --- Public API ---
+    def warm(self, timeout: Optional[float] = None) -> List[int]:
+        """
+        Wait until every worker has loaded its model (or failed to)
+
+        Returns:
+            PIDs of the workers that are ready
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            worker.ready.wait(remaining)
+        return [w.pid for w in self._workers if w.state in (IDLE, BUSY)]
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue one text for extraction, without blocking
+
+        Returns:
+            Future resolving to a DailyLogExtraction
+
+        Raises:
+            PoolFull: max_pending requests are already waiting
+        """
+        if self._closed.is_set():
+            raise RuntimeError("ExtractorPool is shut down")
+        if all(w.state in (FAILED, STOPPED) for w in self._workers):
+            raise RuntimeError(f"No extractor workers available: {self._workers[0].last_error}")
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((future, text))
+        except queue.Full:
+            raise PoolFull(f"{self.max_pending} extractions already pending")
+        return future
+
+    def health(self) -> dict:
+        """Pool status with one entry per worker"""
+        now = time.time()
+        workers = []
+        for w in self._workers:
+            workers.append({
+                "index": w.index,
+                "pid": w.pid,
+                "state": w.state,
+                "alive": w.process is not None and w.process.is_alive(),
+                "served": w.served,
+                "restarts": w.restarts,
+                "busy_seconds": round(now - w.busy_since, 3) if w.busy_since else None,
+                "last_error": w.last_error,
+            })
+        return {
+            "workers": workers,
+            "ready": sum(w["state"] in (IDLE, BUSY) for w in workers),
+            "pending": self._queue.qsize(),
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Cancel pending requests and stop the workers once in-flight ones finish"""
+        self._closed.set()
+        while True:
+            try:
+                future, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+        if wait:
+            for thread in self._threads:
+                thread.join()
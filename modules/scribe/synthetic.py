@@ -0,0 +1,264 @@
+"""
+ROSHN PULSE Module 3: Synthetic Daily Log Generator
+====================================================
+Seeded generator of realistic construction daily logs for benchmarking
+
+Logs follow the layout of the sample logs: a header with one of SITE_NAMES,
+the date and the site manager, then progress, issue and incident sections
+built from templates that use the extractor vocabularies. Size and
+composition (tasks, blockers, incidents, filler notes) are controllable, and
+the same seed always produces the same corpus. Logs can also be rendered as
+minimal text PDFs to exercise PDF parsing.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from schema import SITE_NAMES
+
+MANAGERS = ["Ahmed Al-Harbi", "Fahad Al-Qahtani", "Sara Al-Otaibi", "Omar Al-Zahrani",
+            "Khalid Al-Dossary", "Noura Al-Shehri", "Yousef Al-Mutairi", "Reem Al-Ghamdi"]
+CREWS = ["Al Rashid", "Nesma", "Saudi Binladin", "El Seif", "Al Bawani", "Almabani", "Nesma Partners"]
+LOCATIONS = ["Tower A Level 3", "Tower B Level 4", "Block C2", "Zone E-1", "Building 7",
+             "Section N-4", "CS-12", "BD-02", "Floor 9", "Station W-3"]
+WORK_ITEMS = ["slab formwork", "column rebar", "blockwork walls", "MEP first fix", "façade panels",
+              "waterproofing membrane", "ductwork", "screed", "precast stairs", "curtain wall brackets"]
+
+TASK_TEMPLATES = [
+    "{crew} crew completed the {item} at {location} ahead of schedule.",
+    "Concrete for the {item} was poured at {location} by the {crew} team.",
+    "Installation of {item} finished at {location}; {crew} contractor signed off the checklist.",
+    "- {item} installed at {location} ({crew} crew)",
+    "The {crew} team erected the {item} at {location} and the work was approved by the consultant.",
+]
+BLOCKER_TEMPLATES = [
+    "{item} at {location} is delayed because the rebar delivery is still pending from the supplier.",
+    "Work on the {item} is on hold: the tower crane at {location} failed its morning check and is unavailable.",
+    "Crews were unable to continue the {item} at {location} due to high wind and a sand storm warning.",
+    "The {item} at {location} is blocked waiting for the municipality permit approval.",
+    "Shortage of {item} materials at {location} is causing an issue for the {crew} crew.",
+]
+INCIDENT_TEMPLATES = [
+    "A worker suffered a minor injury at {location} and received first aid on site.",
+    "Near miss reported at {location} when a pallet of {item} tipped over during lifting.",
+    "Hydraulic oil spill at {location}; contamination was contained and the waste removed.",
+    "Quality issue: {item} at {location} failed inspection and rework was ordered.",
+    "PPE violation observed at {location}; the safety officer notified the {crew} supervisor.",
+]
+HEADER_INCIDENT_TEMPLATE = (
+    "SAFETY INCIDENT - {severity}: A worker from the {crew} crew fell from a scaffold platform at "
+    "{location} while installing {item}. Ambulance arrived within 15 minutes and the worker was "
+    "transported to King Fahad Hospital. All work at height suspended the {item} activities pending "
+    "investigation; the safety manager notified the client."
+)
+FILLER_TEMPLATES = [
+    "Weather was clear with temperatures around {temp} degrees in the afternoon.",
+    "The consultant walked {location} with the {crew} supervisor to review the look-ahead programme.",
+    "Housekeeping at {location} was reviewed during the toolbox talk.",
+    "Material stock for the {item} was counted and recorded in the site register.",
+]
+
+# (tasks, blockers, incidents, filler) ranges per size profile
+SIZE_PROFILES = {
+    "small": ((2, 5), (0, 1), (0, 1), (0, 2)),
+    "medium": ((6, 15), (1, 4), (0, 2), (2, 6)),
+    "large": ((40, 80), (8, 20), (2, 6), (20, 40)),
+}
+
+
+@dataclass
+class SyntheticLog:
+    """One generated log with the composition it was built from"""
+    text: str
+    site_name: str
+    log_date: date
+    n_tasks: int
+    n_blockers: int
+    n_incidents: int
+    header_incident: bool
+
+
+class SyntheticLogGenerator:
+    """Seeded generator of construction daily logs"""
+
+    def __init__(self, seed: int = 0):
+        """
+        Args:
+            seed: Random seed; the same seed gives the same sequence of logs
+        """
+        self.rng = random.Random(seed)
+
+    def _fill(self, template: str, **extra) -> str:
+        rng = self.rng
+        return template.format(
+            crew=rng.choice(CREWS),
+            item=rng.choice(WORK_ITEMS),
+            location=rng.choice(LOCATIONS),
+            temp=rng.randint(24, 46),
+            **extra,
+        )
+
+    def generate(self, n_tasks: int = 8, n_blockers: int = 2, n_incidents: int = 1,
+                 header_incident: bool = False, filler: int = 2, site_name: Optional[str] = None,
+                 log_date: Optional[date] = None) -> SyntheticLog:
+        """
+        Generate one daily log
+
+        Args:
+            n_tasks: Completed task sentences
+            n_blockers: Blocker sentences
+            n_incidents: Sentence-level incidents
+            header_incident: Add a "SAFETY INCIDENT - <SEVERITY>:" block
+            filler: Neutral notes mixed into the sections
+            site_name: Site in the header (random from SITE_NAMES by default)
+            log_date: Date in the header (random in 2025 by default)
+
+        Returns:
+            SyntheticLog with the text and its composition
+        """
+        rng = self.rng
+        site_name = site_name or rng.choice(SITE_NAMES)
+        log_date = log_date or date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        fillers = [self._fill(rng.choice(FILLER_TEMPLATES)) for _ in range(filler)]
+
+        lines = [
+            f"{site_name} Daily Site Report",
+            f"Date: {log_date.strftime('%d/%m/%Y')}",
+            f"Site Manager: {rng.choice(MANAGERS)}",
+            "",
+            "PROGRESS ACHIEVED:",
+        ]
+        tasks = [self._fill(rng.choice(TASK_TEMPLATES)) for _ in range(n_tasks)]
+        lines.extend(tasks + fillers[: len(fillers) // 2])
+
+        lines += ["", "ISSUES AND BLOCKERS:"]
+        lines.extend(self._fill(rng.choice(BLOCKER_TEMPLATES)) for _ in range(n_blockers))
+        lines.extend(fillers[len(fillers) // 2:])
+
+        if n_incidents or header_incident:
+            lines += ["", "INCIDENTS:"]
+            lines.extend(self._fill(rng.choice(INCIDENT_TEMPLATES)) for _ in range(n_incidents))
+        if header_incident:
+            severity = rng.choice(["MAJOR", "MODERATE", "MINOR"])
+            lines += ["", self._fill(HEADER_INCIDENT_TEMPLATE, severity=severity)]
+
+        lines += ["", f"Crew count: {rng.randint(40, 400)} workers on site. Operations continue tomorrow."]
+        return SyntheticLog(
+            text="\n".join(lines) + "\n",
+            site_name=site_name,
+            log_date=log_date,
+            n_tasks=n_tasks,
+            n_blockers=n_blockers,
+            n_incidents=n_incidents,
+            header_incident=header_incident,
+        )
+
+    def corpus(self, n_docs: int, size: str = "medium") -> Iterator[SyntheticLog]:
+        """
+        Generate a corpus of logs with randomised composition
+
+        Args:
+            n_docs: Number of logs
+            size: "small", "medium", "large" or "mixed" (one of the three per log)
+
+        Yields:
+            SyntheticLog objects
+        """
+        for _ in range(n_docs):
+            profile = self.rng.choice(list(SIZE_PROFILES)) if size == "mixed" else size
+            tasks, blockers, incidents, filler = SIZE_PROFILES[profile]
+            yield self.generate(
+                n_tasks=self.rng.randint(*tasks),
+                n_blockers=self.rng.randint(*blockers),
+                n_incidents=self.rng.randint(*incidents),
+                header_incident=self.rng.random() < 0.2,
+                filler=self.rng.randint(*filler),
+            )
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_to_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """
+    Render text as a minimal PDF (Helvetica, one text line per log line)
+
+    Args:
+        text: Log text
+        lines_per_page: Lines before a page break
+
+    Returns:
+        PDF file bytes
+    """
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # Objects: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        ops += [f"({_pdf_escape(line)}) '" for line in page_lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        page_num = len(objects) + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_num + 1} 0 R >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(f"{page_num} 0 R")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write_corpus(out_dir: str, n_docs: int, seed: int = 0, size: str = "medium", pdf: bool = False) -> List[str]:
+    """
+    Write a corpus as log_XXXX.txt (and log_XXXX.pdf) files
+
+    Returns:
+        Paths of the written files
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i, log in enumerate(SyntheticLogGenerator(seed).corpus(n_docs, size)):
+        path = out / f"log_{i:04d}.txt"
+        path.write_text(log.text, encoding="utf-8")
+        paths.append(str(path))
+        if pdf:
+            path = out / f"log_{i:04d}.pdf"
+            path.write_bytes(text_to_pdf(log.text))
+            paths.append(str(path))
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic daily logs")
+    parser.add_argument("--out", default="data/synthetic_logs", help="Output directory")
+    parser.add_argument("-n", "--docs", type=int, default=100, help="Number of logs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", choices=[*SIZE_PROFILES, "mixed"], default="mixed")
+    parser.add_argument("--pdf", action="store_true", help="Also write a PDF of every log")
+    args = parser.parse_args()
+
+    written = write_corpus(args.out, args.docs, seed=args.seed, size=args.size, pdf=args.pdf)
+    print(f"[OK] Wrote {len(written)} files to {args.out}")
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The scribe modules import each other flat (from schema import ...), as when run from their directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def fake_modules(tmp_path, monkeypatch):
+    """
+    Write stand-in modules that shadow the real ones in spawned workers.
+
+    Spawned children start with the parent's sys.path, so the directory goes
+    there as well as on PYTHONPATH.
+    """
+    module_dir = tmp_path / "fake_modules"
+    module_dir.mkdir()
+    monkeypatch.setenv("PYTHONPATH", str(module_dir))
+    monkeypatch.syspath_prepend(str(module_dir))
+
+    def write(name: str, source: str) -> Path:
+        path = module_dir / f"{name}.py"
+        path.write_text(source, encoding="utf-8")
+        return path
+
+    write.dir = module_dir
+    return write
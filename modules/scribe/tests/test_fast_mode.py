@@ -0,0 +1,42 @@
+import pytest
+
+spacy = pytest.importorskip("spacy")
+if not spacy.util.is_package("en_core_web_sm"):
+    pytest.skip("en_core_web_sm is not installed", allow_module_level=True)
+
+from extractor import DailyLogExtractor
+from lexicon import LOCATION_MATCHER
+from synthetic import SyntheticLogGenerator
+
+
+@pytest.fixture(scope="module")
+def extractors():
+    return DailyLogExtractor(fast=False), DailyLogExtractor(fast=True)
+
+
+def _comparable(extraction):
+    """
+    Extraction as a dict, minus the one field fast mode is allowed to change
+
+    Fast mode runs NER on a task sentence on its own rather than in the
+    context of the whole log, so a location that only NER found (no
+    LOCATION_PATTERNS match) can come out differently. Pattern locations must
+    still agree.
+    """
+    data = extraction.model_dump(exclude={"raw_text"})
+    for task in data["completed_tasks"]:
+        if not LOCATION_MATCHER.first(task["task_name"]):
+            task["location"] = None
+    return data
+
+
+def test_fast_mode_matches_full_pipeline(extractors):
+    full, fast = extractors
+    for i, log in enumerate(SyntheticLogGenerator(seed=7).corpus(60, size="mixed")):
+        assert _comparable(fast.extract_from_text(log.text)) == _comparable(full.extract_from_text(log.text)), i
+
+
+def test_fast_mode_incremental_matches_full_pipeline(extractors):
+    full, fast = extractors
+    for i, log in enumerate(SyntheticLogGenerator(seed=11).corpus(20, size="medium")):
+        assert _comparable(fast.extract_incremental(log.text)) == _comparable(full.extract_from_text(log.text)), i
@@ -0,0 +1,37 @@
+import time
+
+from jobs import FAILED, QUEUED, ReportJobQueue
+from schema import DailyLogExtraction
+
+
+def _wait_for(predicate, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.1)
+
+
+def test_jobs_fail_when_no_worker_can_start(tmp_path, fake_modules):
+    fake_modules("report_generator", 'raise ImportError("reportlab is not installed")\n')
+    jobs = ReportJobQueue(tmp_path / "jobs.sqlite3", tmp_path / "reports", workers=1, max_backoff=0.2)
+    # Queued before any worker has tried to start
+    early = jobs.submit(DailyLogExtraction(site_name="Sedra"))
+    assert early["status"] == QUEUED
+
+    jobs.start()
+    try:
+        _wait_for(lambda: jobs.status(early["job_id"])["status"] != QUEUED)
+        failed = jobs.status(early["job_id"])
+        assert failed["status"] == FAILED
+        assert "reportlab is not installed" in failed["error"]
+
+        # Once no worker is running, new jobs fail straight away instead of queueing
+        late = jobs.submit(DailyLogExtraction(site_name="Warefa"))
+        assert late["status"] == FAILED and "reportlab is not installed" in late["error"]
+
+        # The worker keeps being retried, with backoff
+        _wait_for(lambda: jobs.health()["workers"][0]["start_failures"] >= 2)
+        assert jobs.health()["ready"] == 0
+    finally:
+        jobs.stop()
+
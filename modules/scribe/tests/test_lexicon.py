@@ -0,0 +1,51 @@
+import re
+
+import pytest
+
+import lexicon
+from lexicon import LOCATION_MATCHER, SENTENCE_GROUPS, KeywordMatcher
+from schema import LOCATION_PATTERNS
+from synthetic import SyntheticLogGenerator
+
+EDGE_CASES = [
+    "",
+    "fellow workers inspected the platform",  # "fell" inside a longer word still counts
+    "the crane fell; a serious injury, operations continue",
+    "safety incident - major: worker fell from scaffold",
+    "concrete pour completed at tower b level 4 despite rain",
+    "incident -incident -incident",
+    "crew count: 120 workers",
+]
+
+
+def _sentences():
+    for log in SyntheticLogGenerator(seed=3).corpus(40, size="mixed"):
+        yield from (line for line in log.text.splitlines() if line.strip())
+    yield from EDGE_CASES
+
+
+@pytest.fixture(params=["regex", "ahocorasick"])
+def matcher(request, monkeypatch):
+    if request.param == "ahocorasick":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(lexicon, "ahocorasick", None)
+    return KeywordMatcher(SENTENCE_GROUPS)
+
+
+def test_keyword_scan_matches_substring_checks(matcher):
+    for sentence in _sentences():
+        text = sentence.lower()
+        expected = {group for group, words in SENTENCE_GROUPS.items() if any(kw in text for kw in words)}
+        assert matcher.scan(text) == expected, sentence
+
+
+def test_location_first_matches_sequential_search():
+    for sentence in _sentences():
+        expected = None
+        for pattern in LOCATION_PATTERNS:
+            match = re.search(pattern, sentence)
+            if match:
+                expected = match.group(0)
+                break
+        assert LOCATION_MATCHER.first(sentence) == expected, sentence
@@ -0,0 +1,54 @@
+import textwrap
+
+import pytest
+
+from pool import FAILED, ExtractorPool
+
+# Fails its first FAILURES model loads (counted in a file next to it), then extracts by upper-casing
+FAKE_EXTRACTOR = textwrap.dedent("""
+    from pathlib import Path
+
+    FAILURES = {failures}
+    ATTEMPTS = Path(__file__).with_name("attempts")
+
+
+    class DailyLogExtractor:
+        def __init__(self, model_name, fast=False):
+            attempt = int(ATTEMPTS.read_text()) if ATTEMPTS.exists() else 0
+            ATTEMPTS.write_text(str(attempt + 1))
+            if attempt < FAILURES:
+                raise OSError("model not installed")
+
+        def extract_from_text(self, text):
+            return text.upper()
+""")
+
+
+def _attempts(fake_modules) -> int:
+    return int((fake_modules.dir / "attempts").read_text())
+
+
+def test_failed_starts_are_retried_with_backoff(fake_modules):
+    fake_modules("extractor", FAKE_EXTRACTOR.format(failures=2))
+    pool = ExtractorPool(workers=1, start_attempts=3, max_backoff=0.1, start_timeout=30)
+    try:
+        assert len(pool.warm(timeout=60)) == 1
+        assert _attempts(fake_modules) == 3
+        assert pool.submit("blockwork done").result(timeout=30) == "BLOCKWORK DONE"
+        assert pool.health()["workers"][0]["last_error"] == "OSError: model not installed"
+    finally:
+        pool.shutdown()
+
+
+def test_slot_is_given_up_after_start_attempts(fake_modules):
+    fake_modules("extractor", FAKE_EXTRACTOR.format(failures=100))
+    pool = ExtractorPool(workers=1, start_attempts=2, max_backoff=0.1, start_timeout=30)
+    try:
+        assert pool.warm(timeout=60) == []
+        assert _attempts(fake_modules) == 2
+        health = pool.health()
+        assert health["ready"] == 0 and health["workers"][0]["state"] == FAILED
+        with pytest.raises(RuntimeError, match="model not installed"):
+            pool.submit("blockwork done")
+    finally:
+        pool.shutdown()
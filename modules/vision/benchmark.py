@@ -0,0 +1,435 @@
+"""
+Throughput/latency benchmark for the safety detection pipeline
+
+Sweeps batch size, inference size, thread budget and runtime backend over a
+fixed image set (synthetic frames or a directory of stored images) and
+reports, per configuration, images/sec, p50/p99 batch latency, peak RSS and
+the mean time per image of each stage:
+
+    decode          JPEG bytes -> array (cv2 for the module path, Pillow for the backend path)
+    preprocess      Ultralytics letterbox + tensor conversion
+    forward         model forward pass
+    nms             Ultralytics postprocess (NMS and box rescaling)
+    postprocess     compliance counts and detection records
+    overlay_encode  result.plot() + JPEG encode
+
+Two pipelines can be measured: "module" is SafetyDetector.infer_frames
+(batched), "backend" is the per-request path of backend/routers/vision.py.
+Backends other than "torch" are Ultralytics exports (onnx, openvino,
+torchscript, ...) created once per inference size next to the weights.
+
+Every configuration runs in a fresh spawned process, so thread settings take
+effect before torch/OpenMP initialize and peak RSS belongs to that
+configuration alone. Results are written as JSON; --compare checks them
+against a stored baseline and exits non-zero on regressions.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / 'backend'
+
+# Environment knobs read by torch / OpenCV / BLAS at import time
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+STAGES = ('decode', 'preprocess', 'forward', 'nms', 'postprocess', 'overlay_encode')
+
+# Metrics checked by --compare: (name, True if higher is better)
+COMPARED_METRICS = (('images_per_sec', True), ('p50_ms', False), ('p99_ms', False), ('peak_rss_mb', False))
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile (q in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def synthetic_images(count: int, width: int = 1280, height: int = 720, seed: int = 0):
+    """
+    Generate JPEG-encoded construction-like frames
+
+    Each frame is a noisy background with random rectangles, so decode and
+    encode costs resemble real photos more than flat images would.
+
+    Returns:
+        List of JPEG bytes
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        frame = rng.integers(60, 200, size=(height, width, 3), dtype=np.uint8)
+        frame = cv2.GaussianBlur(frame, (9, 9), 0)
+        for _ in range(int(rng.integers(4, 12))):
+            x, y = int(rng.integers(0, width - 40)), int(rng.integers(0, height - 80))
+            w, h = int(rng.integers(20, 120)), int(rng.integers(40, 240))
+            color = tuple(int(c) for c in rng.integers(0, 255, size=3))
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, -1)
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        images.append(buf.tobytes())
+    return images
+
+
+def stored_images(input_dir: str, limit: int = None):
+    """Read the encoded bytes of the images in a directory"""
+    from inference import list_images
+
+    files = sorted(list_images(input_dir))[:limit]
+    return [Path(f).read_bytes() for f in files]
+
+
+def export_model(model_path: str, backend: str, imgsz: int) -> str:
+    """
+    Weights for a backend: the .pt itself for torch, otherwise an Ultralytics
+    export for this inference size (reused when it already exists)
+
+    Returns:
+        Path to load with YOLO()
+    """
+    if backend == 'torch':
+        return model_path
+    from ultralytics import YOLO
+
+    export_dir = Path(model_path).with_name(f'{Path(model_path).stem}_{backend}_{imgsz}')
+    if export_dir.exists():
+        found = [p for p in export_dir.iterdir() if p.suffix != '.yaml']
+        if found:
+            return str(found[0])
+
+    exported = YOLO(model_path).export(format=backend, imgsz=imgsz, dynamic=backend in ('onnx', 'openvino'))
+    export_dir.mkdir(parents=True, exist_ok=True)
+    target = export_dir / Path(exported).name
+    Path(exported).replace(target)
+    return str(target)
+
+
+def _speed_ms(result, key: str) -> float:
+    return float((getattr(result, 'speed', None) or {}).get(key) or 0.0)
+
+
+def _module_runner(weights: str, imgsz: int, conf: float, iou: float, overlay: bool):
+    """Per-batch runner for SafetyDetector.infer_frames"""
+    import cv2
+    import numpy as np
+    from inference import SafetyDetector, compliance_summary
+
+    detector = SafetyDetector(weights, conf, iou, imgsz=imgsz)
+
+    def run(batch):
+        stages = dict.fromkeys(STAGES, 0.0)
+        t0 = time.perf_counter()
+        frames = [cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) for data in batch]
+        stages['decode'] = (time.perf_counter() - t0) * 1000
+
+        results = detector.infer_frames(frames)
+        for result in results:
+            stages['preprocess'] += _speed_ms(result, 'preprocess')
+            stages['forward'] += _speed_ms(result, 'inference')
+            stages['nms'] += _speed_ms(result, 'postprocess')
+
+        t0 = time.perf_counter()
+        for result in results:
+            compliance_summary(result)
+            detector.get_detailed_detections([result])
+        stages['postprocess'] = (time.perf_counter() - t0) * 1000
+
+        if overlay:
+            t0 = time.perf_counter()
+            for result in results:
+                cv2.imencode('.jpg', result.plot())
+            stages['overlay_encode'] = (time.perf_counter() - t0) * 1000
+        return stages
+
+    return run
+
+
+def _backend_runner(weights: str, overlay: bool):
+    """Per-image runner for the backend's /analyze-image path"""
+    os.environ['VISION_WEIGHTS'] = str(Path(weights).resolve())
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    from routers import vision
+
+    vision._lazy_yolo()
+
+    def run(batch):
+        import io
+
+        stages = dict.fromkeys(STAGES, 0.0)
+        for data in batch:
+            t0 = time.perf_counter()
+            img_np = vision._decode_image(data)
+            stages['decode'] += (time.perf_counter() - t0) * 1000
+
+            result = vision._predict_array(img_np)[0]
+            stages['preprocess'] += _speed_ms(result, 'preprocess')
+            stages['forward'] += _speed_ms(result, 'inference')
+            stages['nms'] += _speed_ms(result, 'postprocess')
+
+            t0 = time.perf_counter()
+            vision._vision_out(result, save_overlay=False)
+            stages['postprocess'] += (time.perf_counter() - t0) * 1000
+
+            if overlay:
+                # Same work as _save_overlay_image, encoded in memory
+                from PIL import Image
+
+                t0 = time.perf_counter()
+                Image.fromarray(result.plot()[..., ::-1]).save(io.BytesIO(), format='JPEG', quality=90)
+                stages['overlay_encode'] += (time.perf_counter() - t0) * 1000
+        return stages
+
+    return run
+
+
+def _run_config(config: dict, images, warmup: int, conf: float, iou: float, overlay: bool, out_queue):
+    """Worker process: measure one configuration and put its metrics on out_queue"""
+    try:
+        import cv2
+        import torch
+
+        threads = config['threads']
+        torch.set_num_threads(threads)
+        cv2.setNumThreads(threads)
+
+        weights = config['weights']
+        if config['pipeline'] == 'backend':
+            run = _backend_runner(weights, overlay)
+        else:
+            run = _module_runner(weights, config['imgsz'], conf, iou, overlay)
+
+        batch_size = config['batch_size']
+        batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+        for batch in itertools.islice(itertools.cycle(batches), warmup):
+            run(batch)
+
+        latencies = []
+        totals = dict.fromkeys(STAGES, 0.0)
+        start = time.perf_counter()
+        for batch in batches:
+            t0 = time.perf_counter()
+            stages = run(batch)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            for name, ms in stages.items():
+                totals[name] += ms
+        wall = time.perf_counter() - start
+
+        out_queue.put({
+            'images': len(images),
+            'images_per_sec': round(len(images) / wall, 2) if wall else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages_ms_per_image': {name: round(ms / len(images), 3) for name, ms in totals.items()},
+        })
+    except Exception as e:
+        out_queue.put({'error': f'{e.__class__.__name__}: {e}'})
+
+
+def config_key(config: dict) -> str:
+    """Stable identifier of a configuration, used to match baseline entries"""
+    return (f"pipeline={config['pipeline']},backend={config['backend']},batch={config['batch_size']},"
+            f"imgsz={config['imgsz']},threads={config['threads']}")
+
+
+def run_sweep(model_path: str, images, pipelines=('module',), backends=('torch',), batch_sizes=(1, 8),
+              imgszs=(640,), threads=(1, 4), warmup: int = 2, conf: float = 0.25, iou: float = 0.7,
+              overlay: bool = True, timeout: float = 1800.0):
+    """
+    Run every configuration of the sweep, each in its own process
+
+    Returns:
+        List of result dictionaries (configuration + metrics, or an error)
+    """
+    ctx = mp.get_context('spawn')
+    results = []
+    for pipeline, backend, imgsz, batch_size, n_threads in itertools.product(
+            pipelines, backends, imgszs, batch_sizes, threads):
+        # The backend path serves one image per request at the model's own size
+        if pipeline == 'backend' and (batch_size != batch_sizes[0] or imgsz != imgszs[0]):
+            continue
+        config = {
+            'pipeline': pipeline,
+            'backend': backend,
+            'batch_size': 1 if pipeline == 'backend' else batch_size,
+            'imgsz': None if pipeline == 'backend' else imgsz,
+            'threads': n_threads,
+        }
+        print(f"[RUN] {config_key(config)}")
+        try:
+            config['weights'] = export_model(model_path, backend, imgsz)
+        except Exception as e:
+            results.append({**config, 'key': config_key(config), 'error': f'export failed: {e}'})
+            print(f"  export failed: {e}")
+            continue
+
+        # Spawned workers inherit these before torch and OpenMP initialize
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(n_threads)
+        out_queue = ctx.Queue()
+        proc = ctx.Process(target=_run_config, args=(config, images, warmup, conf, iou, overlay, out_queue),
+                           name=f'vision-bench-{len(results)}')
+        proc.start()
+        try:
+            metrics = out_queue.get(timeout=timeout)
+        except Exception:
+            metrics = {'error': f'no result within {timeout}s (exit code {proc.exitcode})'}
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.terminate()
+
+        entry = {**config, 'key': config_key(config), **metrics}
+        results.append(entry)
+        if 'error' in metrics:
+            print(f"  failed: {metrics['error']}")
+        else:
+            print(f"  {metrics['images_per_sec']} img/s, p50 {metrics['p50_ms']} ms, "
+                  f"p99 {metrics['p99_ms']} ms, peak RSS {metrics['peak_rss_mb']} MB")
+    return results
+
+
+def compare(results, baseline, tolerance: float = 0.15):
+    """
+    Compare sweep results with a stored baseline
+
+    Args:
+        results: Output document of this run
+        baseline: Output document of an earlier run
+        tolerance: Allowed relative change before a metric counts as regressed
+
+    Returns:
+        One message per regressed metric (empty when none regressed)
+    """
+    base_by_key = {r['key']: r for r in baseline.get('results', []) if 'error' not in r}
+    regressions = []
+    for current in results['results']:
+        base = base_by_key.get(current['key'])
+        if base is None or 'error' in current:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{current['key']} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def _str_list(value: str):
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Safety detection throughput/latency benchmark')
+    parser.add_argument('--model', type=str,
+                        default='yolo12_training/yolo_runs/yolo12_run_3/weights/best.pt',
+                        help='Path to model weights (.pt)')
+    parser.add_argument('--images', type=str, default=None,
+                        help='Directory of stored images (default: synthetic frames)')
+    parser.add_argument('--count', type=int, default=64,
+                        help='Number of images')
+    parser.add_argument('--frame-size', type=str, default='1280x720',
+                        help='Synthetic frame size WIDTHxHEIGHT')
+    parser.add_argument('--pipelines', type=_str_list, default=['module'],
+                        help='Comma-separated: module, backend')
+    parser.add_argument('--backends', type=_str_list, default=['torch'],
+                        help='Comma-separated: torch or any Ultralytics export format (onnx, openvino, ...)')
+    parser.add_argument('--batch-sizes', type=_int_list, default=[1, 8],
+                        help='Comma-separated batch sizes')
+    parser.add_argument('--imgsz', type=_int_list, default=[640],
+                        help='Comma-separated inference sizes')
+    parser.add_argument('--threads', type=_int_list, default=[1, 4],
+                        help='Comma-separated thread budgets')
+    parser.add_argument('--warmup', type=int, default=2,
+                        help='Warm-up batches per configuration')
+    parser.add_argument('--conf', type=float, default=0.25)
+    parser.add_argument('--iou', type=float, default=0.7)
+    parser.add_argument('--no-overlay', action='store_true',
+                        help='Skip the overlay encode stage')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=str, default=None,
+                        help='Write results JSON here')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative regression')
+    args = parser.parse_args(argv)
+
+    if args.images:
+        images = stored_images(args.images, args.count)
+        source = args.images
+    else:
+        width, height = (int(v) for v in args.frame_size.lower().split('x'))
+        images = synthetic_images(args.count, width, height, seed=args.seed)
+        source = f'synthetic {width}x{height} seed={args.seed}'
+    if not images:
+        print('No images to benchmark')
+        return 1
+    print(f"Benchmarking {len(images)} images from {source}")
+
+    results = {
+        'meta': {
+            'model': args.model,
+            'source': source,
+            'images': len(images),
+            'overlay': not args.no_overlay,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': run_sweep(args.model, images, pipelines=args.pipelines, backends=args.backends,
+                             batch_sizes=args.batch_sizes, imgszs=args.imgsz, threads=args.threads,
+                             warmup=args.warmup, conf=args.conf, iou=args.iou,
+                             overlay=not args.no_overlay),
+    }
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results written to: {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        if baseline.get('meta', {}).get('source') != source:
+            print(f"Warning: baseline images ({baseline.get('meta', {}).get('source')}) differ from this run")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%} vs {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Cascaded detection: cheap low-resolution people screen before full-resolution inference
+
+Most patrol-camera frames contain nobody. The screen runs the safety model (or
+a smaller model) at a low input size, restricted to person / head-gear
+classes, and only frames where it finds something are escalated to the full
+resolution safety model.
+"""
+from pathlib import Path
+
+import cv2
+from ultralytics import YOLO
+
+from inference import HARDHAT_LABELS, NO_HARDHAT_LABELS, PERSON_LABELS, SafetyDetector
+
+# Labels that count towards PPE compliance; a frame without any of them cannot
+# change the compliance numbers, so it does not need the full model
+SCREEN_LABELS = PERSON_LABELS | HARDHAT_LABELS | NO_HARDHAT_LABELS
+
+
+class CascadeDetector(SafetyDetector):
+    """SafetyDetector that only runs full-resolution inference on frames with people"""
+
+    def __init__(self, model_path: str, conf_threshold: float = 0.25, iou_threshold: float = 0.7,
+                 imgsz: int = 768, roi_config: str = None, screen_model_path: str = None,
+                 screen_imgsz: int = 320, screen_conf: float = 0.15, screen_labels=SCREEN_LABELS):
+        """
+        Initialize the cascade
+
+        Args:
+            model_path: Path to the full safety model weights
+            conf_threshold: Confidence threshold for full-resolution detections
+            iou_threshold: IOU threshold for NMS
+            imgsz: Full-resolution inference size
+            roi_config: Path to the per-camera ROI config (optional)
+            screen_model_path: Weights for the screening pass (optional, defaults
+                to a second copy of the safety model)
+            screen_imgsz: Screening inference size
+            screen_conf: Confidence a screening detection needs to escalate the frame
+            screen_labels: Class names the screen looks for
+        """
+        super().__init__(model_path, conf_threshold, iou_threshold, imgsz, roi_config)
+
+        # Separate instance even for the same weights: Ultralytics keeps
+        # predictor arguments between calls, so sharing one would leak the
+        # screen's class filter and size into full-resolution calls
+        self.screen_model = YOLO(screen_model_path or model_path)
+        self.screen_imgsz = screen_imgsz
+        self.screen_conf = screen_conf
+        self.screen_classes = [
+            idx for idx, name in self.screen_model.names.items() if name.lower() in screen_labels
+        ]
+        if not self.screen_classes:
+            raise ValueError(f"Screening model has none of the classes: {', '.join(sorted(screen_labels))}")
+
+        self.frames_seen = 0
+        self.frames_escalated = 0
+
+    def screen(self, frames):
+        """
+        Run the low-resolution screen on a batch of frames
+
+        Args:
+            frames: List of BGR numpy arrays
+
+        Returns:
+            (screen Results list, list of booleans telling which frames to escalate)
+        """
+        results = self.screen_model.predict(
+            source=frames,
+            conf=self.screen_conf,
+            imgsz=self.screen_imgsz,
+            classes=self.screen_classes,
+            verbose=False,
+        )
+        positive = [r.boxes is not None and len(r.boxes) > 0 for r in results]
+        return results, positive
+
+    def _infer(self, frames):
+        """
+        Screen a batch and run the full model on the positive frames only
+
+        Frames that are screened out keep their (empty) screening result, so
+        callers still get exactly one Results object per frame.
+        """
+        screened, positive = self.screen(frames)
+        escalated = [frame for frame, hit in zip(frames, positive) if hit]
+
+        self.frames_seen += len(frames)
+        self.frames_escalated += len(escalated)
+
+        full = iter(super()._infer(escalated) if escalated else [])
+        return [next(full) if hit else result for result, hit in zip(screened, positive)]
+
+    def predict_image(self, image_path: str, save_path: str = None, show: bool = False,
+                      camera_id: str = None):
+        """
+        Run cascaded inference on a single image
+
+        Args:
+            image_path: Path to input image
+            save_path: Path to save annotated image (optional)
+            show: Whether to display the result
+            camera_id: Camera whose ROI should be applied (optional)
+
+        Returns:
+            Results list with one entry, or an empty list if the image is unreadable
+        """
+        frame = cv2.imread(str(image_path))
+        if frame is None:
+            return []
+
+        results = self.infer_frames([frame], camera_id=camera_id)
+        if save_path:
+            cv2.imwrite(save_path, results[0].plot())
+        if show:
+            results[0].show()
+        return results
+
+    def predict_video(self, video_path: str, output_path: str = None, show: bool = False,
+                      batch_size: int = 8):
+        """
+        Run cascaded inference on a video
+
+        Args:
+            video_path: Path to input video
+            output_path: Path to save annotated video (optional)
+            show: Whether to display annotated frames; press q to stop
+            batch_size: Frames per screening call
+
+        Yields:
+            One Results object per frame
+        """
+        cap = cv2.VideoCapture(str(video_path))
+        writer = None
+        if output_path:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        try:
+            batch = []
+            stopped = False
+            while not stopped:
+                ok, frame = cap.read()
+                if ok:
+                    batch.append(frame)
+                if batch and (not ok or len(batch) >= batch_size):
+                    for result in self._infer(batch):
+                        if writer is not None or show:
+                            annotated = result.plot()
+                            if writer is not None:
+                                writer.write(annotated)
+                            if show:
+                                cv2.imshow(Path(video_path).name, annotated)
+                                if cv2.waitKey(1) & 0xFF == ord('q'):
+                                    stopped = True
+                        yield result
+                        if stopped:
+                            break
+                    batch = []
+                if not ok:
+                    break
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+            if show:
+                cv2.destroyAllWindows()
+
+    def predict_webcam(self, camera_id: int = 0):
+        """
+        Run cascaded inference on a webcam stream, showing annotated frames
+
+        Args:
+            camera_id: Camera device ID (default: 0)
+        """
+        cap = cv2.VideoCapture(camera_id)
+        try:
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                result = self._infer([frame])[0]
+                cv2.imshow(f"camera {camera_id}", result.plot())
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+        finally:
+            cap.release()
+            cv2.destroyAllWindows()
+
+    def report(self):
+        """
+        Escalation statistics since the detector was created
+
+        Returns:
+            Dictionary with frames seen, frames escalated and escalation rate
+        """
+        return {
+            'frames': self.frames_seen,
+            'escalated': self.frames_escalated,
+            'escalation_rate': self.frames_escalated / self.frames_seen if self.frames_seen else 0.0,
+        }
+
+    def print_report(self):
+        """Print escalation statistics"""
+        stats = self.report()
+        print(f"\nCascade: {stats['escalated']}/{stats['frames']} frames escalated "
+              f"({stats['escalation_rate']:.1%})")
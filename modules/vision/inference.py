@@ -2,16 +2,111 @@
 YOLO Inference Pipeline for Construction Site Safety Detection
 """
 import argparse
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from ultralytics import YOLO
 import cv2
 import numpy as np
 
+from roi import load_roi_config
+
+DEFAULT_ROI_CONFIG = Path(__file__).with_name('camera_roi.yaml')
+
+# Class names used for PPE compliance (same naming as backend/routers/vision.py)
+PERSON_LABELS = {'person'}
+HARDHAT_LABELS = {'hardhat', 'helmet', 'helmet-on', 'helmet_on'}
+NO_HARDHAT_LABELS = {'no-hardhat', 'no_helmet', 'no-helmet'}
+
+
+def compliance_summary(result):
+    """
+    Count people and head-gear detections in one result
+
+    Args:
+        result: Results object from YOLO
+
+    Returns:
+        Dictionary with persons, helmeted_persons, no_helmet_persons and
+        compliance_rate (0.0 when there is no head-gear detection to rate)
+    """
+    persons = hardhat = no_hardhat = 0
+    if result.boxes is not None and len(result.boxes) > 0:
+        for cls_id in result.boxes.cls.cpu().numpy().astype(int):
+            name = str(result.names.get(int(cls_id), cls_id)).lower()
+            if name in PERSON_LABELS:
+                persons += 1
+            elif name in HARDHAT_LABELS:
+                hardhat += 1
+            elif name in NO_HARDHAT_LABELS:
+                no_hardhat += 1
+
+    return {
+        'persons': persons,
+        'helmeted_persons': hardhat,
+        'no_helmet_persons': no_hardhat,
+        'compliance_rate': round(hardhat / max(1, hardhat + no_hardhat), 4),
+    }
+
+
+def list_images(input_dir: str):
+    """
+    List the images in a directory, in the order batch inference visits them
+
+    Args:
+        input_dir: Directory containing input images
+
+    Returns:
+        List of image paths
+    """
+    input_path = Path(input_dir)
+    return list(input_path.glob('*.jpg')) + list(input_path.glob('*.png')) + \
+        list(input_path.glob('*.jpeg')) + list(input_path.glob('*.JPG'))
+
+
+class OverlayWriter:
+    """Background thread that plots and writes annotated images"""
+
+    def __init__(self, max_pending: int = 32):
+        """
+        Start the writer thread
+
+        Args:
+            max_pending: Maximum number of results waiting to be written;
+                submit() blocks when the queue is full
+        """
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="overlay-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, save_path: str, result):
+        """Queue a result for plotting and writing to save_path"""
+        self._queue.put((save_path, result))
+
+    def close(self):
+        """Flush pending writes and stop the thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            save_path, result = item
+            try:
+                cv2.imwrite(save_path, result.plot())
+            except Exception as e:
+                print(f"Failed to write {save_path}: {e}")
+
 
 class SafetyDetector:
     """YOLO-based safety detection for construction sites"""
     
-    def __init__(self, model_path: str, conf_threshold: float = 0.25, iou_threshold: float = 0.7):
+    def __init__(self, model_path: str, conf_threshold: float = 0.25, iou_threshold: float = 0.7,
+                 imgsz: int = None, roi_config: str = None):
         """
         Initialize the safety detector
         
@@ -19,10 +114,14 @@ class SafetyDetector:
             model_path: Path to the YOLO model weights (.pt file)
             conf_threshold: Confidence threshold for detections
             iou_threshold: IOU threshold for NMS
+            imgsz: Inference image size (optional, defaults to the training size)
+            roi_config: Path to the per-camera ROI config (optional)
         """
         self.model = YOLO(model_path)
         self.conf_threshold = conf_threshold
         self.iou_threshold = iou_threshold
+        self.imgsz = imgsz
+        self.rois = load_roi_config(roi_config) if roi_config else {}
         
         # Get class names from the model
         self.class_names = self.model.names
@@ -30,7 +129,8 @@ class SafetyDetector:
         for idx, name in self.class_names.items():
             print(f"  {idx}: {name}")
         
-    def predict_image(self, image_path: str, save_path: str = None, show: bool = False):
+    def predict_image(self, image_path: str, save_path: str = None, show: bool = False,
+                      camera_id: str = None):
         """
         Run inference on a single image
         
@@ -38,14 +138,27 @@ class SafetyDetector:
             image_path: Path to input image
             save_path: Path to save annotated image (optional)
             show: Whether to display the result
+            camera_id: Camera whose ROI should be applied (optional)
             
         Returns:
             Results object from YOLO
         """
+        if camera_id in self.rois:
+            frame = cv2.imread(str(image_path))
+            if frame is None:
+                return []
+            results = self.infer_frames([frame], camera_id=camera_id)
+            if save_path:
+                cv2.imwrite(save_path, results[0].plot())
+            if show:
+                results[0].show()
+            return results
+
         results = self.model.predict(
             source=image_path,
             conf=self.conf_threshold,
             iou=self.iou_threshold,
+            **self._size_kwargs(),
             save=False,  # We'll save manually with better control
             show=show,
             save_txt=False,
@@ -76,6 +189,7 @@ class SafetyDetector:
             source=video_path,
             conf=self.conf_threshold,
             iou=self.iou_threshold,
+            **self._size_kwargs(),
             save=output_path is not None,
             show=show,
             stream=True,
@@ -95,6 +209,7 @@ class SafetyDetector:
             source=camera_id,
             conf=self.conf_threshold,
             iou=self.iou_threshold,
+            **self._size_kwargs(),
             show=True,
             stream=True,
         )
@@ -102,35 +217,159 @@ class SafetyDetector:
         for r in results:
             pass  # Streaming will show results automatically
     
-    def predict_batch(self, input_dir: str, output_dir: str = None):
+    def predict_batch(self, input_dir: str, output_dir: str = None, batch_size: int = 8,
+                      prefetch: int = 4, decode_workers: int = 4, camera_id: str = None):
         """
-        Run inference on a directory of images
-        
+        Run pipelined inference on a directory of images
+
+        Images are decoded by a thread pool ahead of the model, inference runs
+        on batches of frames, and annotated images are written by a background
+        writer, so the loop is bounded by model throughput rather than disk I/O.
+
         Args:
             input_dir: Directory containing input images
             output_dir: Directory to save annotated images (optional)
-            
-        Returns:
-            List of Results objects
+            batch_size: Number of frames per model call
+            prefetch: Number of batches decoded ahead of inference
+            decode_workers: Number of decode threads
+            camera_id: Camera whose ROI should be applied (optional)
+
+        Yields:
+            (image path, Results list) tuples, in directory order
         """
-        input_path = Path(input_dir)
-        image_files = list(input_path.glob('*.jpg')) + list(input_path.glob('*.png')) + \
-                     list(input_path.glob('*.jpeg')) + list(input_path.glob('*.JPG'))
-        
+        return self.predict_files(list_images(input_dir), output_dir, batch_size=batch_size,
+                                  prefetch=prefetch, decode_workers=decode_workers,
+                                  camera_id=camera_id)
+
+    def predict_files(self, image_files, output_dir: str = None, batch_size: int = 8,
+                      prefetch: int = 4, decode_workers: int = 4, camera_id: str = None):
+        """
+        Run pipelined inference on an explicit list of image files
+
+        Args:
+            image_files: Paths of the images to process
+            output_dir: Directory to save annotated images (optional)
+            batch_size: Number of frames per model call
+            prefetch: Number of batches decoded ahead of inference
+            decode_workers: Number of decode threads
+            camera_id: Camera whose ROI should be applied (optional)
+
+        Yields:
+            (image path, Results list) tuples, in input order
+        """
+        image_files = [Path(f) for f in image_files]
+
+        writer = None
         if output_dir:
             Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
-        all_results = []
-        for img_file in image_files:
-            save_path = None
-            if output_dir:
-                save_path = str(Path(output_dir) / img_file.name)
-            
-            results = self.predict_image(str(img_file), save_path=save_path)
-            all_results.append(results)
-            print(f"Processed: {img_file.name}")
-        
-        return all_results
+            writer = OverlayWriter(max_pending=batch_size * prefetch)
+
+        try:
+            with ThreadPoolExecutor(max_workers=decode_workers) as pool:
+                decoded = self._decode_ahead(pool, image_files, batch_size * prefetch)
+                for batch in self._batched(decoded, batch_size):
+                    files = [f for f, _ in batch]
+                    frames = [frame for _, frame in batch]
+                    results = self.infer_frames(frames, camera_id=camera_id)
+                    for img_file, result in zip(files, results):
+                        if writer:
+                            writer.submit(str(Path(output_dir) / img_file.name), result)
+                        print(f"Processed: {img_file.name}")
+                        yield img_file, [result]
+        finally:
+            if writer:
+                writer.close()
+
+    def infer_frames(self, frames, camera_id: str = None):
+        """
+        Run inference on decoded frames, applying the camera's ROI if it has one
+
+        With an ROI, each frame is cropped to the ROI bounding box before the
+        model letterboxes it, and the results are mapped back to full-frame
+        coordinates with detections outside the ROI polygons removed.
+
+        Args:
+            frames: List of BGR numpy arrays
+            camera_id: Camera whose ROI should be applied (optional), or a
+                list with one camera id per frame for mixed batches
+
+        Returns:
+            One Results object per frame
+        """
+        if isinstance(camera_id, (list, tuple)):
+            rois = [self.rois.get(cam) if cam else None for cam in camera_id]
+        else:
+            rois = [self.rois.get(camera_id) if camera_id else None] * len(frames)
+        if not any(rois):
+            return self._infer(frames)
+
+        crops = [roi.crop(frame) if roi else (frame, None) for roi, frame in zip(rois, frames)]
+        results = self._infer([crop for crop, _ in crops])
+        return [
+            roi.remap_result(result, offset, frame) if roi else result
+            for roi, result, (_, offset), frame in zip(rois, results, crops, frames)
+        ]
+
+    def _infer(self, frames):
+        """
+        Run the safety model on a batch of decoded frames
+
+        Args:
+            frames: List of BGR numpy arrays
+
+        Returns:
+            One Results object per frame
+        """
+        return self.model.predict(
+            source=frames,
+            conf=self.conf_threshold,
+            iou=self.iou_threshold,
+            verbose=False,
+            **self._size_kwargs(),
+        )
+
+    def _size_kwargs(self):
+        """Inference size override for model.predict, if one was configured"""
+        return {'imgsz': self.imgsz} if self.imgsz else {}
+
+    @staticmethod
+    def _decode_ahead(pool, image_files, depth: int):
+        """
+        Decode images on the pool, keeping up to depth reads in flight
+
+        Yields:
+            (image path, BGR frame) tuples in input order; unreadable files are skipped
+        """
+        files = iter(image_files)
+        pending = deque()
+        for img_file in files:
+            pending.append((img_file, pool.submit(cv2.imread, str(img_file))))
+            if len(pending) >= depth:
+                break
+
+        while pending:
+            img_file, future = pending.popleft()
+            next_file = next(files, None)
+            if next_file is not None:
+                pending.append((next_file, pool.submit(cv2.imread, str(next_file))))
+
+            frame = future.result()
+            if frame is None:
+                print(f"Skipped unreadable image: {img_file.name}")
+                continue
+            yield img_file, frame
+
+    @staticmethod
+    def _batched(items, batch_size: int):
+        """Group an iterable into lists of at most batch_size items"""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
     
     def get_detection_summary(self, results):
         """
@@ -233,11 +472,60 @@ def main():
                        help='Display results')
     parser.add_argument('--imgsz', type=int, default=768,
                        help='Inference image size')
+    parser.add_argument('--batch-size', type=int, default=8,
+                       help='Frames per model call in directory mode')
+    parser.add_argument('--prefetch', type=int, default=4,
+                       help='Batches decoded ahead of inference in directory mode')
+    parser.add_argument('--decode-workers', type=int, default=4,
+                       help='Image decode threads in directory mode')
+    
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for sharded, resumable directory mode')
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                       help='Thread budget of each worker in sharded mode')
+    
+    parser.add_argument('--camera-id', type=str, default=None,
+                       help='Camera id whose region of interest should be applied')
+    parser.add_argument('--roi-config', type=str, default=str(DEFAULT_ROI_CONFIG),
+                       help='Per-camera ROI config file')
+    parser.add_argument('--cascade', action='store_true',
+                       help='Screen frames at low resolution and run the full model only on frames with people')
+    parser.add_argument('--screen-model', type=str, default=None,
+                       help='Weights for the cascade screen (defaults to --model)')
+    parser.add_argument('--screen-imgsz', type=int, default=320,
+                       help='Cascade screen image size')
+    parser.add_argument('--screen-conf', type=float, default=0.15,
+                       help='Confidence a screen detection needs to escalate a frame')
     
     args = parser.parse_args()
     
+    cascade_options = None
+    if args.cascade:
+        cascade_options = {'screen_model_path': args.screen_model, 'screen_imgsz': args.screen_imgsz,
+                           'screen_conf': args.screen_conf}
+    
+    if args.camera_id and args.camera_id not in load_roi_config(args.roi_config):
+        print(f"Warning: no ROI configured for camera '{args.camera_id}', using full frames")
+    
+    if args.workers > 1 and Path(args.source).is_dir():
+        # Sharded directory mode: workers load their own model copies
+        from shards import run_sharded
+        print(f"Running sharded inference on directory: {args.source} ({args.workers} workers)")
+        run_sharded(args.model, args.source, args.output, args.workers,
+                    threads_per_worker=args.threads_per_worker, conf=args.conf, iou=args.iou,
+                    imgsz=args.imgsz, batch_size=args.batch_size, save_images=True,
+                    cascade=cascade_options, roi_config=args.roi_config,
+                    camera_id=args.camera_id)
+        return
+    
     # Initialize detector
-    detector = SafetyDetector(args.model, args.conf, args.iou)
+    if args.cascade:
+        from cascade import CascadeDetector
+        detector = CascadeDetector(args.model, args.conf, args.iou, imgsz=args.imgsz,
+                                   roi_config=args.roi_config, **cascade_options)
+    else:
+        detector = SafetyDetector(args.model, args.conf, args.iou, imgsz=args.imgsz,
+                                  roi_config=args.roi_config)
     
     # Determine source type
     source = args.source
@@ -257,7 +545,8 @@ def main():
             # Image
             print(f"Running inference on image: {source}")
             save_path = str(output_path / f"result_{Path(source).name}")
-            results = detector.predict_image(source, save_path=save_path, show=args.show)
+            results = detector.predict_image(source, save_path=save_path, show=args.show,
+                                             camera_id=args.camera_id)
             
             # Print detailed detections with class names
             detector.print_detections(results)
@@ -278,12 +567,20 @@ def main():
         # Directory of images
         print(f"Running batch inference on directory: {source}")
         output_path = Path(args.output)
-        results = detector.predict_batch(source, str(output_path))
-        print(f"\nProcessed {len(results)} images")
+        processed = 0
+        for _ in detector.predict_batch(source, str(output_path), batch_size=args.batch_size,
+                                        prefetch=args.prefetch, decode_workers=args.decode_workers,
+                                        camera_id=args.camera_id):
+            processed += 1
+        print(f"\nProcessed {processed} images")
         print(f"Results saved to: {output_path}")
     
     else:
         print(f"Error: Source '{source}' not found or invalid")
+        return
+    
+    if args.cascade:
+        detector.print_report()
 
 
 if __name__ == '__main__':
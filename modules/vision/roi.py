@@ -0,0 +1,164 @@
+"""
+Per-camera regions of interest
+
+Fixed cameras often see mostly sky, roads or neighbouring plots. A camera's
+ROI is a set of polygons (rectangles are accepted as shorthand); frames are
+cropped to the ROI bounding box before inference so the model input is spent
+on the relevant pixels, and detections whose centre falls outside every
+polygon are dropped. Boxes are mapped back to full-frame coordinates.
+
+Config format (YAML, pixel coordinates):
+
+    cameras:
+      sedra-gate-01:
+        polygons:
+          - [[0, 300], [1280, 260], [1280, 720], [0, 720]]
+        rects:
+          - [900, 0, 1280, 260]
+"""
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Vectorized even-odd point-in-polygon test
+
+    Args:
+        points: (N, 2) array of x, y coordinates
+        polygon: (M, 2) array of polygon vertices
+
+    Returns:
+        (N,) boolean array, True where the point lies inside the polygon
+    """
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    x1 = polygon[None, :, 0]
+    y1 = polygon[None, :, 1]
+    x2 = np.roll(polygon[:, 0], -1)[None, :]
+    y2 = np.roll(polygon[:, 1], -1)[None, :]
+
+    # Edges whose y-range straddles the point; horizontal edges never do,
+    # so the division below only matters where it is well defined
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    crossings = np.count_nonzero(straddles & (x < x_cross), axis=1)
+    return crossings % 2 == 1
+
+
+class CameraROI:
+    """Region of interest of one camera"""
+
+    def __init__(self, polygons):
+        """
+        Args:
+            polygons: List of (M, 2) vertex arrays in full-frame pixel coordinates
+        """
+        if not polygons:
+            raise ValueError("A camera ROI needs at least one polygon or rect")
+        self.polygons = [np.asarray(p, dtype=np.float32).reshape(-1, 2) for p in polygons]
+        for polygon in self.polygons:
+            if len(polygon) < 3:
+                raise ValueError("ROI polygons need at least 3 vertices")
+
+    @classmethod
+    def from_config(cls, entry: dict):
+        """Build an ROI from a config entry with 'polygons' and/or 'rects'"""
+        polygons = list(entry.get("polygons") or [])
+        for x1, y1, x2, y2 in entry.get("rects") or []:
+            polygons.append([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
+        return cls(polygons)
+
+    def bounds(self, width: int, height: int):
+        """
+        Bounding box of all polygons, clipped to the frame
+
+        Returns:
+            (x1, y1, x2, y2) integer pixel bounds
+        """
+        stacked = np.concatenate(self.polygons)
+        x1, y1 = np.floor(stacked.min(axis=0)).astype(int)
+        x2, y2 = np.ceil(stacked.max(axis=0)).astype(int)
+        return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+    def crop(self, frame: np.ndarray):
+        """
+        Crop a frame to the ROI bounding box
+
+        Returns:
+            (cropped frame, (x offset, y offset))
+        """
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = self.bounds(width, height)
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError("ROI does not overlap the frame")
+        return np.ascontiguousarray(frame[y1:y2, x1:x2]), (x1, y1)
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """True for points inside any of the ROI polygons"""
+        inside = np.zeros(len(points), dtype=bool)
+        for polygon in self.polygons:
+            inside |= points_in_polygon(points, polygon)
+        return inside
+
+    def map_boxes(self, xyxy: np.ndarray, offset):
+        """
+        Shift crop-space boxes to full-frame coordinates and mask them by ROI
+
+        Args:
+            xyxy: (N, 4) boxes in crop coordinates
+            offset: (x, y) offset returned by crop()
+
+        Returns:
+            (full-frame boxes, boolean keep mask) where the mask keeps boxes
+            whose centre lies inside the ROI
+        """
+        boxes = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4).copy()
+        boxes[:, [0, 2]] += offset[0]
+        boxes[:, [1, 3]] += offset[1]
+        centers = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1)
+        return boxes, self.contains(centers)
+
+    def remap_result(self, result, offset, frame: np.ndarray):
+        """
+        Turn an Ultralytics result for the cropped frame into one for the full frame
+
+        Args:
+            result: Results object produced on the crop
+            offset: (x, y) offset returned by crop()
+            frame: The full, uncropped frame
+
+        Returns:
+            Results object with full-frame boxes, filtered to the ROI
+        """
+        import torch
+        from ultralytics.engine.results import Results
+
+        data = result.boxes.data.cpu().numpy() if result.boxes is not None else np.zeros((0, 6), np.float32)
+        boxes, keep = self.map_boxes(data[:, :4], offset)
+        data = np.concatenate([boxes, data[:, 4:]], axis=1)[keep]
+        return Results(frame, path=result.path, names=result.names, boxes=torch.from_numpy(data))
+
+
+def load_roi_config(path) -> dict:
+    """
+    Load per-camera ROIs from a YAML file
+
+    Args:
+        path: Path to the ROI config file
+
+    Returns:
+        Dictionary mapping camera id to CameraROI; empty if the file is missing or empty
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return {
+        str(camera_id): CameraROI.from_config(entry)
+        for camera_id, entry in (config.get("cameras") or {}).items()
+    }
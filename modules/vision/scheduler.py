@@ -0,0 +1,311 @@
+"""
+Multi-stream camera scheduler sharing one SafetyDetector across many feeds
+
+Each video source (file or RTSP URL) is decoded by its own reader thread,
+which only keeps the newest frame. The scheduler interleaves due frames from
+all streams into shared batched inference: every stream has a target FPS,
+and when more streams are due than fit in a batch the most overdue ones go
+first, so no camera starves. Per-stream compliance is published after every
+processed frame.
+"""
+import argparse
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import yaml
+
+from inference import DEFAULT_ROI_CONFIG, SafetyDetector, compliance_summary
+
+
+class StreamReader(threading.Thread):
+    """Decodes one video source in the background, keeping only the latest frame"""
+
+    def __init__(self, stream_id: str, source, realtime: bool = None, loop: bool = False):
+        """
+        Args:
+            stream_id: Name of the stream
+            source: Video file path, RTSP/HTTP URL or webcam index
+            realtime: Pace file sources at their native FPS, like a live feed
+                (defaults to True for local files)
+            loop: Restart file sources when they end
+        """
+        super().__init__(name=f"stream-{stream_id}", daemon=True)
+        self.stream_id = stream_id
+        self.source = int(source) if str(source).isdigit() else str(source)
+        self.is_file = isinstance(self.source, str) and Path(self.source).is_file()
+        self.realtime = self.is_file if realtime is None else realtime
+        self.loop = loop
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+        self._stop = threading.Event()
+        self.finished = False
+        self.error = None
+
+    def latest(self):
+        """Return (sequence number, frame) of the newest decoded frame"""
+        with self._lock:
+            return self._seq, self._frame
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            self.error = f"Cannot open source {self.source}"
+            self.finished = True
+            return
+
+        native_fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        frame_interval = 1.0 / native_fps
+        next_frame_at = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    if self.is_file and self.loop:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                with self._lock:
+                    self._frame = frame
+                    self._seq += 1
+                if self.realtime:
+                    next_frame_at += frame_interval
+                    delay = next_frame_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            cap.release()
+            self.finished = True
+
+
+class StreamState:
+    """Scheduling and compliance state of one stream"""
+
+    def __init__(self, reader: StreamReader, camera_id: str = None, target_fps: float = 2.0,
+                 window: int = 30):
+        self.reader = reader
+        self.camera_id = camera_id
+        self.interval = 1.0 / target_fps if target_fps > 0 else 0.0
+        self.next_due = time.monotonic()
+        self.last_seq = 0
+        self.frames = 0
+        self.latest = None
+        self.recent = deque(maxlen=window)  # (helmeted, no_helmet) counts of recent frames
+        self.processed_at = deque(maxlen=window)
+
+    def ready(self, now: float):
+        """Whether the stream is due and has a frame it has not processed yet"""
+        seq, frame = self.reader.latest()
+        return now >= self.next_due and frame is not None and seq > self.last_seq
+
+    def mean_compliance(self):
+        """
+        Compliance over the window from summed counts, so frames without any
+        head-gear detection (empty scenes) do not count as violations.
+        None until a frame could be rated.
+        """
+        helmeted = sum(h for h, _ in self.recent)
+        rated = helmeted + sum(n for _, n in self.recent)
+        return round(helmeted / rated, 4) if rated else None
+
+    def status(self):
+        span = self.processed_at[-1] - self.processed_at[0] if len(self.processed_at) > 1 else 0.0
+        return {
+            'camera_id': self.camera_id,
+            'frames': self.frames,
+            'fps': round((len(self.processed_at) - 1) / span, 2) if span > 0 else 0.0,
+            'latest': self.latest,
+            'mean_compliance': self.mean_compliance(),
+            'finished': self.reader.finished,
+            'error': self.reader.error,
+        }
+
+
+class StreamScheduler:
+    """Serves many video streams with one detector"""
+
+    def __init__(self, detector: SafetyDetector, batch_size: int = 8, on_result=None):
+        """
+        Args:
+            detector: Shared detector (a CascadeDetector works too)
+            batch_size: Maximum frames per model call
+            on_result: Optional callback(stream_id, result, summary) called
+                for every processed frame
+        """
+        self.detector = detector
+        self.batch_size = batch_size
+        self.on_result = on_result
+        self.streams = {}
+        self._stop = threading.Event()
+
+    def add_stream(self, stream_id: str, source, camera_id: str = None, target_fps: float = 2.0,
+                   realtime: bool = None, loop: bool = False):
+        """
+        Register a video source
+
+        Args:
+            stream_id: Unique name of the stream
+            source: Video file path, RTSP/HTTP URL or webcam index
+            camera_id: Camera id for ROI lookup (defaults to stream_id)
+            target_fps: Frames per second to analyse from this stream
+            realtime: Pace file sources at their native FPS
+            loop: Restart file sources when they end
+        """
+        if stream_id in self.streams:
+            raise ValueError(f"Stream '{stream_id}' already registered")
+        reader = StreamReader(stream_id, source, realtime=realtime, loop=loop)
+        self.streams[stream_id] = StreamState(reader, camera_id or stream_id, target_fps)
+
+    def snapshot(self):
+        """Per-stream compliance and throughput"""
+        return {stream_id: state.status() for stream_id, state in self.streams.items()}
+
+    def stop(self):
+        self._stop.set()
+
+    def _pick_batch(self, now: float):
+        """Due streams with fresh frames, most overdue first"""
+        ready = [(state.next_due, stream_id) for stream_id, state in self.streams.items() if state.ready(now)]
+        ready.sort()
+        return [stream_id for _, stream_id in ready[:self.batch_size]]
+
+    def run(self, duration: float = None):
+        """
+        Run until every stream has ended, stop() is called or duration elapses
+
+        Args:
+            duration: Maximum run time in seconds (optional)
+        """
+        for state in self.streams.values():
+            state.reader.start()
+
+        deadline = time.monotonic() + duration if duration else None
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if deadline and now >= deadline:
+                    break
+
+                batch = self._pick_batch(now)
+                if not batch:
+                    if all(state.reader.finished for state in self.streams.values()):
+                        break
+                    time.sleep(0.005)
+                    continue
+
+                frames, camera_ids = [], []
+                for stream_id in batch:
+                    state = self.streams[stream_id]
+                    seq, frame = state.reader.latest()
+                    state.last_seq = seq
+                    # Keep the cadence, but never build up a backlog of missed slots
+                    state.next_due = max(state.next_due + state.interval, now)
+                    frames.append(frame)
+                    camera_ids.append(state.camera_id)
+
+                results = self.detector.infer_frames(frames, camera_id=camera_ids)
+
+                done_at = time.monotonic()
+                for stream_id, result in zip(batch, results):
+                    state = self.streams[stream_id]
+                    summary = compliance_summary(result)
+                    state.frames += 1
+                    state.latest = summary
+                    state.recent.append((summary['helmeted_persons'], summary['no_helmet_persons']))
+                    state.processed_at.append(done_at)
+                    if self.on_result:
+                        self.on_result(stream_id, result, summary)
+        finally:
+            for state in self.streams.values():
+                state.reader.stop()
+            for state in self.streams.values():
+                if state.reader.is_alive():
+                    state.reader.join(timeout=2.0)
+
+
+def load_streams(path: str):
+    """
+    Load stream definitions from YAML
+
+    Format:
+        streams:
+          - id: sedra-gate-01
+            source: rtsp://10.0.0.12/stream1
+            fps: 2
+          - id: alfulwa-crane-03
+            source: recordings/crane.mp4
+            camera_id: alfulwa-crane-03
+            loop: true
+
+    Returns:
+        List of stream definition dictionaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return config.get("streams") or []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-stream PPE compliance monitoring')
+    parser.add_argument('--model', type=str,
+                       default='yolo12_training/yolo_runs/yolo12_run_3/weights/best.pt',
+                       help='Path to model weights')
+    parser.add_argument('--streams', type=str, required=True,
+                       help='YAML file listing the streams')
+    parser.add_argument('--conf', type=float, default=0.2,
+                       help='Confidence threshold')
+    parser.add_argument('--iou', type=float, default=0.7,
+                       help='IOU threshold for NMS')
+    parser.add_argument('--imgsz', type=int, default=768,
+                       help='Inference image size')
+    parser.add_argument('--roi-config', type=str, default=str(DEFAULT_ROI_CONFIG),
+                       help='Per-camera ROI config file')
+    parser.add_argument('--batch-size', type=int, default=8,
+                       help='Maximum frames per model call')
+    parser.add_argument('--duration', type=float, default=None,
+                       help='Stop after this many seconds')
+    parser.add_argument('--report-every', type=float, default=10.0,
+                       help='Seconds between compliance reports')
+
+    args = parser.parse_args()
+
+    detector = SafetyDetector(args.model, args.conf, args.iou, imgsz=args.imgsz,
+                              roi_config=args.roi_config)
+    scheduler = StreamScheduler(detector, batch_size=args.batch_size)
+    for stream in load_streams(args.streams):
+        scheduler.add_stream(
+            str(stream['id']),
+            stream['source'],
+            camera_id=stream.get('camera_id'),
+            target_fps=float(stream.get('fps', 2.0)),
+            loop=bool(stream.get('loop', False)),
+        )
+    print(f"Scheduling {len(scheduler.streams)} stream(s)")
+
+    def report():
+        while True:
+            time.sleep(args.report_every)
+            for stream_id, status in scheduler.snapshot().items():
+                latest = status['latest'] or {}
+                print(f"{stream_id}: {status['frames']} frames @ {status['fps']} fps, "
+                      f"persons={latest.get('persons', 0)}, "
+                      f"compliance={latest.get('compliance_rate', 0.0):.0%}")
+
+    threading.Thread(target=report, daemon=True).start()
+    try:
+        scheduler.run(duration=args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Sharded, resumable directory inference for large photo backfills
+
+The image list is split across N worker processes. Each worker loads the
+model once, runs on a fixed thread budget and appends one JSON line per
+finished image to its own manifest, so a re-run skips work that already
+completed. Images that cannot be decoded are recorded as failed, so they
+are not retried either. When every shard is done the manifests are merged into a single
+columnar detections file.
+"""
+import json
+import multiprocessing as mp
+import os
+from pathlib import Path
+
+from inference import list_images
+
+MANIFEST_DIR = "manifests"
+DETECTIONS_STEM = "detections"
+
+# Environment knobs read by torch / OpenCV / BLAS at import time
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def read_manifests(manifest_dir: Path):
+    """
+    Read every shard manifest in a directory
+
+    Lines left truncated by a crash are ignored, so their images are redone.
+
+    Args:
+        manifest_dir: Directory containing shard_*.jsonl files
+
+    Returns:
+        Dictionary mapping image path to its manifest record
+    """
+    records = {}
+    for manifest in sorted(Path(manifest_dir).glob("shard_*.jsonl")):
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record["file"]] = record
+    return records
+
+
+def _pin_worker(shard_id: int, threads: int):
+    """Pin a worker to its own cores where the platform supports it"""
+    if hasattr(os, "sched_setaffinity"):
+        cpus = os.cpu_count() or 1
+        cores = {(shard_id * threads + i) % cpus for i in range(threads)}
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            pass
+
+
+def _run_shard(shard_id: int, image_files, manifest_path: str, model_path: str,
+               conf: float, iou: float, imgsz: int, threads: int, batch_size: int,
+               output_dir: str = None, cascade: dict = None, roi_config: str = None,
+               camera_id: str = None):
+    """Worker entry point: process one shard and append results to its manifest"""
+    _pin_worker(shard_id, threads)
+
+    import cv2
+    import torch
+    from inference import SafetyDetector
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+
+    if cascade is not None:
+        from cascade import CascadeDetector
+        detector = CascadeDetector(model_path, conf, iou, imgsz=imgsz, roi_config=roi_config,
+                                   **cascade)
+    else:
+        detector = SafetyDetector(model_path, conf, iou, imgsz=imgsz, roi_config=roi_config)
+
+    processed = set()
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        for img_file, results in detector.predict_files(image_files, output_dir=output_dir,
+                                                        batch_size=batch_size,
+                                                        decode_workers=threads,
+                                                        camera_id=camera_id):
+            record = {
+                "file": str(img_file),
+                "detections": detector.get_detailed_detections(results),
+            }
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            processed.add(str(img_file))
+
+        # predict_files skips images that fail to decode; record them so resumed runs do not retry them
+        for img_file in image_files:
+            if str(img_file) not in processed:
+                record = {"file": str(img_file), "detections": [], "error": "unreadable image"}
+                manifest.write(json.dumps(record) + "\n")
+        manifest.flush()
+
+    if cascade is not None:
+        stats = detector.report()
+        print(f"Shard {shard_id} cascade: {stats['escalated']}/{stats['frames']} frames escalated "
+              f"({stats['escalation_rate']:.1%})")
+
+
+def write_detections(records, output_dir: Path):
+    """
+    Write manifest records as one columnar file
+
+    Uses Parquet when pyarrow is installed, otherwise a NumPy .npz archive
+    with one array per column.
+
+    Args:
+        records: Manifest records, as returned by read_manifests
+        output_dir: Directory to write the detections file into
+
+    Returns:
+        Path of the written file
+    """
+    columns = {name: [] for name in ("file", "class_id", "class_name", "confidence", "x1", "y1", "x2", "y2")}
+    for record in records:
+        for det in record["detections"]:
+            columns["file"].append(record["file"])
+            columns["class_id"].append(det["class_id"])
+            columns["class_name"].append(det["class_name"])
+            columns["confidence"].append(det["confidence"])
+            for name, value in zip(("x1", "y1", "x2", "y2"), det["bbox"]):
+                columns[name].append(value)
+
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError:
+        import numpy as np
+
+        out_path = Path(output_dir) / f"{DETECTIONS_STEM}.npz"
+        np.savez_compressed(out_path, **{name: np.asarray(values) for name, values in columns.items()})
+        return out_path
+
+    out_path = Path(output_dir) / f"{DETECTIONS_STEM}.parquet"
+    pq.write_table(pa.table(columns), out_path)
+    return out_path
+
+
+def run_sharded(model_path: str, input_dir: str, output_dir: str, workers: int,
+                threads_per_worker: int = 1, conf: float = 0.25, iou: float = 0.7,
+                imgsz: int = None, batch_size: int = 8, save_images: bool = False,
+                cascade: dict = None, roi_config: str = None, camera_id: str = None):
+    """
+    Process a directory of images across worker processes
+
+    Args:
+        model_path: Path to the YOLO model weights
+        input_dir: Directory containing input images
+        output_dir: Directory for manifests, detections and annotated images
+        workers: Number of worker processes
+        threads_per_worker: Thread budget of each worker
+        conf: Confidence threshold
+        iou: IOU threshold for NMS
+        imgsz: Inference image size (optional)
+        batch_size: Frames per model call
+        save_images: Whether to write annotated images
+        cascade: CascadeDetector options (screen_model_path, screen_imgsz,
+            screen_conf) to screen frames before the full model (optional)
+        roi_config: Per-camera ROI config file (optional)
+        camera_id: Camera whose ROI should be applied (optional)
+
+    Returns:
+        Path of the merged detections file
+    """
+    output_path = Path(output_dir)
+    manifest_dir = output_path / MANIFEST_DIR
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+
+    done = read_manifests(manifest_dir)
+    todo = [str(f) for f in sorted(list_images(input_dir)) if str(f) not in done]
+    print(f"{len(done)} images already in manifests, {len(todo)} to process")
+
+    if todo:
+        # Each run appends to fresh manifest files so earlier shards stay untouched
+        run_id = len(list(manifest_dir.glob("shard_*.jsonl")))
+        # Spawned workers inherit these before torch and OpenMP initialize
+        for var in _THREAD_ENV_VARS:
+            os.environ[var] = str(threads_per_worker)
+
+        ctx = mp.get_context("spawn")
+        procs = []
+        for shard_id in range(workers):
+            shard_files = todo[shard_id::workers]
+            if not shard_files:
+                continue
+            manifest_path = manifest_dir / f"shard_{run_id + shard_id:04d}.jsonl"
+            proc = ctx.Process(
+                target=_run_shard,
+                args=(shard_id, shard_files, str(manifest_path), model_path, conf, iou, imgsz,
+                      threads_per_worker, batch_size, output_dir if save_images else None, cascade,
+                      roi_config, camera_id),
+                name=f"vision-shard-{shard_id}",
+            )
+            proc.start()
+            procs.append(proc)
+
+        failed = 0
+        for proc in procs:
+            proc.join()
+            if proc.exitcode != 0:
+                failed += 1
+                print(f"Shard {proc.name} exited with code {proc.exitcode}; re-run to resume it")
+        if failed:
+            print(f"{failed} shard(s) failed")
+
+    records = read_manifests(manifest_dir)
+    unreadable = [f for f, record in records.items() if record.get("error")]
+    if unreadable:
+        print(f"{len(unreadable)} image(s) could not be decoded and are marked failed in the manifests")
+    out_path = write_detections(records.values(), output_path)
+    print(f"Wrote detections for {len(records) - len(unreadable)} images to: {out_path}")
+    return out_path